@@ -0,0 +1,101 @@
+"""
+Benchmark: event-loop latency with blocking vs. asyncio storage.
+
+Runs N concurrent workflows, one step each per round (read the ancestor
+chain as get_context does, then insert a child), while a heartbeat task
+measures how late the event loop wakes it up. With the blocking
+SQLiteConnector every disk hit stalls the loop; AsyncSQLiteConnector moves
+the I/O onto its own threads.
+
+Wall time and throughput show the total cost. Sync steps run one after
+another, so their latency is just their own I/O; async step latency also
+includes queueing behind the other steps of the round on the I/O threads.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_async_storage [--steps 50] [--rounds 20]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from neuracollab.models import CacheEntry
+from neuracollab.storage import SQLiteConnector, AsyncSQLiteConnector
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def heartbeat(lags: List[float], stop: asyncio.Event, interval: float = 0.001):
+    """Record how late the loop resumes a short sleep."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+async def run(storage, is_async: bool, steps: int, rounds: int, payload: str):
+    roots = [CacheEntry(content=payload, prompt=payload, author="User:bench") for _ in range(steps)]
+    if is_async:
+        await storage.insert_many(roots)
+    else:
+        storage.insert_many(roots)
+    heads = [root.entry_id for root in roots]
+
+    async def step(index: int):
+        started = time.perf_counter()
+        parent_id = heads[index]
+        entry = CacheEntry(parent_id=parent_id, content=payload, prompt=payload, author="AI:bench")
+        if is_async:
+            await storage.get_ancestors(parent_id)
+            await storage.insert(entry)
+        else:
+            storage.get_ancestors(parent_id)
+            storage.insert(entry)
+        heads[index] = entry.entry_id
+        return time.perf_counter() - started
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(heartbeat(lags, stop))
+    step_times: List[float] = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        step_times.extend(await asyncio.gather(*(step(i) for i in range(steps))))
+        await asyncio.sleep(0)
+    wall = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return step_times, lags, wall
+
+def report(name: str, step_times: List[float], lags: List[float], wall: float):
+    print(
+        f"{name:>6}: wall={wall:6.2f}s ({len(step_times) / wall:6.0f} steps/s) | "
+        f"step p50={statistics.median(step_times) * 1000:7.2f}ms "
+        f"p99={percentile(step_times, 99) * 1000:7.2f}ms | "
+        f"loop lag p50={statistics.median(lags) * 1000:6.2f}ms "
+        f"p99={percentile(lags, 99) * 1000:6.2f}ms"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=50, help="concurrent steps per round")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--payload", type=int, default=4000, help="characters per entry")
+    args = parser.parse_args()
+    payload = "x" * args.payload
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_storage = SQLiteConnector(str(Path(tmp) / "sync.db"))
+        report("sync", *await run(sync_storage, False, args.steps, args.rounds, payload))
+        sync_storage.close()
+
+        async_storage = AsyncSQLiteConnector(str(Path(tmp) / "async.db"))
+        report("async", *await run(async_storage, True, args.steps, args.rounds, payload))
+        await async_storage.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
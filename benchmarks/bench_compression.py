@@ -0,0 +1,121 @@
+"""
+Benchmark: database size and read cost of compressed entry text.
+
+Builds the same synthetic relay workflows (each prompt repeats the step
+template and the last few contents, as relay prompts do) with plain text,
+zlib, zlib with a trained dictionary and, if zstandard is installed, zstd
+with a dictionary. Reports the vacuumed file size and the time to read a
+branch and a whole workflow tree.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_compression [--workflows 40] [--steps 50] [--reads 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from neuracollab.models import CacheEntry
+from neuracollab.storage import SQLiteConnector
+from neuracollab.text_codec import available_codecs
+
+WORDS = (
+    "the keeper lamp stairs letter sea rocks storm tide harbour light night "
+    "door window ship rope salt wind gull boat shore stone glass oil wick"
+).split()
+TEMPLATE = (
+    "You are continuing a collaborative writing process.\n\n"
+    "Previous content:\n{context}\n\n"
+    "Continue in the same style and tone, adding meaningful progress "
+    "while maintaining consistency with the established narrative."
+)
+
+def build_workflows(workflows: int, steps: int, seed: int = 7) -> List[CacheEntry]:
+    """Relay chains of the given length, with a side branch every tenth step."""
+    rng = random.Random(seed)
+    entries: List[CacheEntry] = []
+    for _ in range(workflows):
+        contents: List[str] = []
+        parent = None
+        for i in range(steps):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(60, 160))]
+            content = " ".join(words).capitalize() + "."
+            prompt = TEMPLATE.format(context="\n\n".join(contents[-3:]) or "(none)")
+            entry = CacheEntry(parent_id=parent, content=content, prompt=prompt,
+                               author=f"AI:model-{i % 3}", metadata={"step": i})
+            entries.append(entry)
+            contents.append(content)
+            if i % 10 != 9:
+                parent = entry.entry_id  # every tenth entry is left as a side branch
+    return entries
+
+def timed(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+def run(name: str, path: Path, entries: List[CacheEntry], codec, dictionary: bool, reads: int):
+    connector = SQLiteConnector(str(path), pool_size=2, compression=codec)
+    started = time.perf_counter()
+    if dictionary:
+        # Train on the first tenth, as maintenance would once enough rows exist
+        warmup = len(entries) // 10
+        connector.insert_many(entries[:warmup])
+        connector.train_dictionary()
+        connector.insert_many(entries[warmup:])
+        cursor = 0
+        while True:
+            examined, cursor = connector.recompress(1000, cursor)
+            if not examined:
+                break
+    else:
+        connector.insert_many(entries)
+    write_time = time.perf_counter() - started
+    connector.vacuum()
+    size = os.path.getsize(path)
+    text = sum(codec["bytes"] for codec in connector.compression_stats()["by_codec"].values())
+
+    leaf, root = entries[-2].entry_id, entries[0].entry_id
+    branch = timed(lambda: connector.get_ancestors(leaf), reads)
+    tree = timed(lambda: connector.get_subtree(root), max(1, reads // 10))
+    connector.close()
+    return name, size, text, write_time, branch, tree
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workflows", type=int, default=40)
+    parser.add_argument("--steps", type=int, default=50, help="entries per workflow")
+    parser.add_argument("--reads", type=int, default=50, help="timed reads per query")
+    args = parser.parse_args()
+    entries = build_workflows(args.workflows, args.steps)
+
+    variants = [("plain", None, False), ("zlib", "zlib", False), ("zlib+dict", "zlib", True)]
+    if "zstd" in available_codecs():
+        variants += [("zstd", "zstd", False), ("zstd+dict", "zstd", True)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            run(name, Path(tmp) / f"{name}.db", entries, codec, dictionary, args.reads)
+            for name, codec, dictionary in variants
+        ]
+
+    baseline = results[0]
+    print(f"{len(entries)} entries in {args.workflows} workflows")
+    for name, size, text, write_time, branch, tree in results:
+        print(
+            f"{name:>10}: file {size / 1024:6.0f} KiB ({size / baseline[1]:4.0%}) | "
+            f"text {text / 1024:6.0f} KiB ({text / baseline[2]:4.0%}) | "
+            f"write {write_time * 1000:6.1f}ms | "
+            f"branch {branch * 1000:5.2f}ms ({branch / baseline[4]:4.2f}x) | "
+            f"tree {tree * 1000:6.2f}ms ({tree / baseline[5]:4.2f}x)"
+        )
+
+if __name__ == "__main__":
+    main()
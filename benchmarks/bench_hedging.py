@@ -0,0 +1,105 @@
+"""
+Benchmark: tail latency with and without hedged dispatch.
+
+Two fake adapters draw latencies from the same distribution: a lognormal
+body with a small fraction of slow outliers. The same request stream is run
+through the dispatcher with hedging off and on, and latency percentiles and
+the share of duplicated requests are reported.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_hedging [--requests 1000] [--concurrency 20]
+                                       [--median 0.02] [--tail 0.05]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from neuracollab.adapters.llm_adapters import LLMAdapter
+from neuracollab.dispatcher import LLMDispatcher
+
+class LatencyAdapter(LLMAdapter):
+    """Fake adapter sleeping for a latency drawn from a long-tailed distribution."""
+    def __init__(
+        self,
+        name: str,
+        median: float,
+        tail: float,
+        tail_factor: float,
+        rng: random.Random
+    ):
+        self.name = name
+        self.median = median
+        self.tail = tail
+        self.tail_factor = tail_factor
+        self.rng = rng
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def probe(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        latency = self.median * self.rng.lognormvariate(0, 0.3)
+        if self.rng.random() < self.tail:
+            latency *= self.tail_factor
+        await asyncio.sleep(latency)
+        return self.name
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run(args, hedge: bool):
+    dispatcher = LLMDispatcher()
+    adapters = []
+    for i, name in enumerate(("primary", "secondary")):
+        rng = random.Random(args.seed + i)
+        adapter = LatencyAdapter(name, args.median, args.tail, args.tail_factor, rng)
+        dispatcher.register_adapter(name, adapter, rate_limit=10 ** 9, max_concurrency=10 ** 6)
+        adapters.append(adapter)
+
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def request(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await dispatcher.dispatch(f"prompt {i}", "primary", workflow_id=i % 10, hedge=hedge)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(request(i) for i in range(args.requests)))
+    calls = sum(adapter.calls for adapter in adapters)
+    stats = dispatcher.get_hedging_stats()
+    await dispatcher.aclose()
+    return latencies, calls, stats
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--median", type=float, default=0.02, help="median latency in seconds")
+    parser.add_argument("--tail", type=float, default=0.05, help="fraction of slow outliers")
+    parser.add_argument("--tail-factor", type=float, default=10.0, help="slowdown of an outlier")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} "
+          f"median={args.median * 1000:.0f}ms "
+          f"tail={args.tail:.0%} x{args.tail_factor:g}")
+    for hedge in (False, True):
+        latencies, calls, stats = await run(args, hedge)
+        print(f"hedging={'on ' if hedge else 'off'} "
+              f"p50={percentile(latencies, 0.50) * 1000:6.1f}ms "
+              f"p95={percentile(latencies, 0.95) * 1000:6.1f}ms "
+              f"p99={percentile(latencies, 0.99) * 1000:6.1f}ms "
+              f"mean={statistics.mean(latencies) * 1000:6.1f}ms "
+              f"extra requests={(calls - args.requests) / args.requests:5.1%} "
+              f"hedge wins={stats['hedge_wins']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
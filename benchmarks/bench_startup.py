@@ -0,0 +1,60 @@
+"""
+Benchmark: server startup cost.
+
+Measures, each in a fresh interpreter, the time to import the cache pool,
+build the components created in the server lifespan, and run the first
+context compression (which loads the sentence tokenizer lazily).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import asyncio, json, tempfile, time
+from pathlib import Path
+started = time.perf_counter()
+from neuracollab.cache_pool import NeuralCachePool
+imported = time.perf_counter()
+
+async def lifespan():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = NeuralCachePool(db_path=str(Path(tmp) / "startup.db"))
+        ready = time.perf_counter()
+        pool.compressor.compress("First sentence. " * 20 + "Dr. Who said so. Done.", 100)
+        compressed = time.perf_counter()
+        await pool.close()
+        return ready, compressed
+
+ready, compressed = asyncio.run(lifespan())
+print(json.dumps({
+    "import": imported - started,
+    "lifespan": ready - imported,
+    "first_compress": compressed - ready,
+    "nltk_loaded": "nltk" in __import__("sys").modules,
+}))
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    for phase in ("import", "lifespan", "first_compress"):
+        times = [sample[phase] * 1000 for sample in samples]
+        print(f"{phase:>15}: median={statistics.median(times):8.2f}ms max={max(times):8.2f}ms")
+    print(f"{'nltk loaded':>15}: {samples[-1]['nltk_loaded']}")
+
+if __name__ == "__main__":
+    main()
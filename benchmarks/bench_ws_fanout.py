@@ -0,0 +1,111 @@
+"""
+Load test: WebSocket hub fan-out with thousands of subscribers.
+
+Connects in-memory sockets (10k subscribers over 1k workflows by default),
+with a fraction of them stalled, broadcasts a burst of step_delta frames and
+a step_complete per workflow, and reports throughput, delivery time, peak
+memory and how slow consumers were handled.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_ws_fanout [--workflows 1000] [--subscribers 10000] [--messages 20]
+        [--encoding json|msgpack|cbor]
+"""
+import argparse
+import asyncio
+import resource
+import time
+from uuid import uuid4
+
+from neuracollab.websocket_controller import WebSocketManager
+
+class BenchSocket:
+    """In-memory socket; stalled sockets never finish a send."""
+    def __init__(self, stalled: bool = False, encoding: str = "json"):
+        self.stalled = stalled
+        self.scope = {}
+        self.query_params = {"encoding": encoding}
+        self.received = 0
+        self.bytes = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data):
+        if self.stalled:
+            await asyncio.Event().wait()
+        await asyncio.sleep(0)  # yield like a real socket write
+        self.received += 1
+        self.bytes += len(data)
+
+    send_bytes = send_text
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workflows", type=int, default=1000)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=20, help="step_delta frames per workflow")
+    parser.add_argument("--stalled", type=float, default=0.01, help="fraction of stalled consumers")
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--policy", choices=("coalesce", "drop"), default="coalesce")
+    parser.add_argument("--encoding", choices=("json", "msgpack", "cbor"), default="json")
+    args = parser.parse_args()
+
+    manager = WebSocketManager(
+        cache_pool=None, engine=None, queue_size=args.queue_size, policy=args.policy
+    )
+    workflows = [uuid4() for _ in range(args.workflows)]
+    stall_every = int(1 / args.stalled) if args.stalled else 0
+    sockets = []
+    started = time.perf_counter()
+    for i in range(args.subscribers):
+        stalled = bool(stall_every) and i % stall_every == 0
+        socket = BenchSocket(stalled=stalled, encoding=args.encoding)
+        await manager.connect(socket, workflows[i % len(workflows)])
+        sockets.append(socket)
+    connected = time.perf_counter()
+
+    for seq in range(args.messages):
+        for workflow_id in workflows:
+            await manager.broadcast(workflow_id, {
+                "type": "step_delta",
+                "data": {"entry_id": str(workflow_id), "seq": seq, "delta": "token "}
+            })
+        await asyncio.sleep(0)
+    for workflow_id in workflows:
+        await manager.broadcast(
+            workflow_id, {"type": "step_complete", "data": {"entry_id": str(workflow_id)}}
+        )
+    published = time.perf_counter()
+
+    healthy = [s for s in sockets if not s.stalled]
+
+    def backlog() -> int:
+        live = (s for group in manager.topics.values() for s in group if not s.websocket.stalled)
+        return sum(len(s.queue) for s in live)
+
+    while backlog():
+        await asyncio.sleep(0.001)
+    delivered = time.perf_counter()
+
+    frames = sum(s.received for s in healthy)
+    stats = manager.stats()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"subscribers={args.subscribers} workflows={args.workflows} "
+        f"stalled={len(sockets) - len(healthy)}"
+    )
+    print(f"connect:   {(connected - started) * 1000:8.1f}ms")
+    print(f"publish:   {(published - connected) * 1000:8.1f}ms for {stats['messages']} broadcasts")
+    print(f"delivered: {(delivered - connected) * 1000:8.1f}ms, {frames} frames "
+          f"({frames / (delivered - connected):,.0f} frames/s)")
+    print(f"encoding:  {args.encoding}, {sum(s.bytes for s in healthy) / 1024:,.0f}KB on the wire")
+    print(f"slow consumers: coalesced={stats['coalesced']} dropped={stats['dropped']} "
+          f"still queued={stats['queued']}")
+    print(f"peak RSS:  {peak_mb:8.1f}MB")
+    await manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,40 +2,62 @@
 LLM adapters for different AI model providers.
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any
 import logging
 import importlib
+import json
 
 logger = logging.getLogger(__name__)
 
 class LLMAdapter(ABC):
     """Base class for LLM adapters."""
-    
+    http_pool = None  # HTTPClientPool shared by the dispatcher
+
+    def bind_http_pool(self, http_pool) -> None:
+        """Use a shared HTTP client pool for outgoing requests."""
+        self.http_pool = http_pool
+
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate text from prompt."""
         pass
 
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Generate text as an async iterator of chunks; defaults to one chunk."""
+        yield await self.generate(prompt, **kwargs)
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the model is available."""
         pass
 
+    async def probe(self) -> bool:
+        """Check the model backend asynchronously; defaults to is_available()."""
+        return self.is_available()
+
 class OpenAIGPT4Adapter(LLMAdapter):
     """Adapter for OpenAI's GPT-4 model."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4",
+        base_url: Optional[str] = None
+    ):
         self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
         self._openai = None
+        self._http_client = None
         self._available = False
         self._initialize()
 
     def _initialize(self) -> None:
-        """Initialize OpenAI client."""
+        """Initialize the asyncio OpenAI client."""
         try:
             openai = importlib.import_module('openai')
             if self.api_key:
-                self._openai = openai.OpenAI(api_key=self.api_key)
+                self._openai = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
                 self._available = True
                 logger.info("OpenAI GPT-4 adapter initialized successfully")
             else:
@@ -48,14 +70,21 @@ class OpenAIGPT4Adapter(LLMAdapter):
     def is_available(self) -> bool:
         return self._available and self._openai is not None
 
+    def _client(self):
+        """Get the OpenAI client, routed through the shared HTTP pool when bound."""
+        if self.http_pool is not None and self._http_client is not self.http_pool.client:
+            self._http_client = self.http_pool.client
+            self._openai = self._openai.with_options(http_client=self._http_client)
+        return self._openai
+
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate text using GPT-4."""
         if not self.is_available():
             raise RuntimeError("OpenAI GPT-4 adapter is not available")
 
         try:
-            response = await self._openai.chat.completions.create(
-                model="gpt-4",
+            response = await self._client().chat.completions.create(
+                model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 **kwargs
             )
@@ -64,29 +93,52 @@ class OpenAIGPT4Adapter(LLMAdapter):
             logger.error(f"OpenAI generation error: {e}")
             raise
 
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Stream GPT-4 output as content deltas arrive."""
+        if not self.is_available():
+            raise RuntimeError("OpenAI GPT-4 adapter is not available")
+
+        try:
+            stream = await self._client().chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **kwargs
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"OpenAI streaming error: {e}")
+            raise
+
 class OllamaAdapter(LLMAdapter):
     """Adapter for local Ollama models."""
     
-    def __init__(self, model: str = "llama3"):
+    def __init__(self, model: str = "llama3", base_url: str = "http://localhost:11434"):
         self.model = model
-        self._available = False
-        self._initialize()
+        self.base_url = base_url.rstrip("/")
+        # Unknown until the first probe; the health prober checks the service
+        # in the background instead of blocking the constructor.
+        self._available: Optional[bool] = None
 
-    def _initialize(self) -> None:
-        """Initialize Ollama client."""
+    def is_available(self) -> bool:
+        return self._available is not False
+
+    def _client(self):
+        if self.http_pool is None:
+            from ..http_pool import HTTPClientPool
+            self.http_pool = HTTPClientPool()
+        return self.http_pool.client
+
+    async def probe(self) -> bool:
+        """Check that the Ollama service is running."""
         try:
-            # Check if Ollama service is running
-            import requests
-            response = requests.get("http://localhost:11434/api/version")
-            if response.status_code == 200:
-                self._available = True
-                logger.info(f"Ollama adapter initialized successfully with model {self.model}")
-            else:
-                logger.warning("Ollama service is not running")
+            response = await self._client().get(f"{self.base_url}/api/version")
+            self._available = response.status_code == 200
         except Exception as e:
-            logger.warning(f"Failed to initialize Ollama adapter: {e}")
-
-    def is_available(self) -> bool:
+            logger.debug(f"Ollama service is unreachable: {e}")
+            self._available = False
         return self._available
 
     async def generate(self, prompt: str, **kwargs) -> str:
@@ -95,22 +147,45 @@ class OllamaAdapter(LLMAdapter):
             raise RuntimeError("Ollama adapter is not available")
 
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "http://localhost:11434/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        **kwargs
-                    }
-                )
-                response.raise_for_status()
-                return response.json()["response"]
+            response = await self._client().post(
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    **kwargs
+                }
+            )
+            response.raise_for_status()
+            return response.json()["response"]
         except Exception as e:
             logger.error(f"Ollama generation error: {e}")
             raise
 
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Stream Ollama output from its newline-delimited JSON responses."""
+        if not self.is_available():
+            raise RuntimeError("Ollama adapter is not available")
+
+        try:
+            async with self._client().stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "prompt": prompt, "stream": True, **kwargs}
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+        except Exception as e:
+            logger.error(f"Ollama streaming error: {e}")
+            raise
+
 class FallbackAdapter(LLMAdapter):
     """Simple fallback adapter for testing."""
     
@@ -127,9 +202,16 @@ class FallbackAdapter(LLMAdapter):
 def create_adapter(provider: str, config: Dict[str, Any]) -> LLMAdapter:
     """Create an adapter instance based on provider and config."""
     if provider == "openai":
-        return OpenAIGPT4Adapter(config.get("api_key"))
+        return OpenAIGPT4Adapter(
+            config.get("api_key"),
+            config.get("model", "gpt-4"),
+            config.get("base_url")
+        )
     elif provider == "ollama":
-        return OllamaAdapter(config.get("model", "llama3"))
+        return OllamaAdapter(
+            config.get("model", "llama3"),
+            config.get("base_url", "http://localhost:11434")
+        )
     else:
         logger.warning(f"Unknown provider {provider}, using fallback adapter")
         return FallbackAdapter()
@@ -34,7 +34,9 @@ def get_ai_config_controller(config_manager: AIConfigManager, dispatcher: LLMDis
             # If active, register the adapter
             if config.is_active:
                 adapter = create_adapter(config.provider, config.credentials)
-                dispatcher.register_adapter(config.name, adapter)
+                dispatcher.register_adapter(
+                    config.name, adapter, rate_limit=config.rate_limit, priority=config.priority
+                )
 
             return config
         except Exception as e:
@@ -57,10 +59,15 @@ def get_ai_config_controller(config_manager: AIConfigManager, dispatcher: LLMDis
                 # Reset and reload adapters
                 dispatcher.reset()
                 # Reload active configurations
-                for config in config_manager.list_configs():
+                for config in config_manager.get_active_configs():
                     if config.is_active:
                         adapter = create_adapter(config.provider, config.credentials)
-                        dispatcher.register_adapter(config.name, adapter)
+                        dispatcher.register_adapter(
+                            config.name,
+                            adapter,
+                            rate_limit=config.rate_limit,
+                            priority=config.priority
+                        )
                 return {"status": "success", "message": f"Configuration {name} deleted"}
             raise HTTPException(status_code=404, detail="Configuration not found")
         except Exception as e:
@@ -73,7 +80,8 @@ def get_ai_config_controller(config_manager: AIConfigManager, dispatcher: LLMDis
         try:
             # Create adapter without registering
             adapter = create_adapter(config.provider, config.credentials)
-            is_available = adapter.is_available()
+            adapter.bind_http_pool(dispatcher.http_pool)
+            is_available = await adapter.probe()
 
             # Try a basic generation if available
             test_details = None
@@ -118,7 +126,9 @@ def get_ai_config_controller(config_manager: AIConfigManager, dispatcher: LLMDis
 
             if active:
                 adapter = create_adapter(config.provider, config.credentials)
-                dispatcher.register_adapter(config.name, adapter)
+                dispatcher.register_adapter(
+                    config.name, adapter, rate_limit=config.rate_limit, priority=config.priority
+                )
             else:
                 dispatcher.remove_adapter(config.name)
 
@@ -113,13 +113,13 @@ class NeuraCollab:
         """
         return await self.engine.handle_user_input(workflow_id, content, prompt)
 
-    def get_workflow_history(self, workflow_id: UUID) -> List[CacheEntry]:
+    async def get_workflow_history(self, workflow_id: UUID) -> List[CacheEntry]:
         """
         Retrieve the complete history of a workflow.
         """
-        return self.cache_pool.storage.get_branch(workflow_id)
+        return await self.cache_pool.get_subtree(workflow_id)
 
-    def create_branch(
+    async def create_branch(
         self,
         base_id: UUID,
         new_prompt: str
@@ -127,7 +127,7 @@ class NeuraCollab:
         """
         Create a new branch from an existing entry for parallel exploration.
         """
-        return self.cache_pool.create_branch(base_id, new_prompt)
+        return await self.cache_pool.create_branch(base_id, new_prompt)
 
     async def role_step(
         self,
@@ -179,7 +179,7 @@ class NeuraCollab:
                     "role_invoked": role
                 }
             )
-            self.cache_pool.add_entry(new_entry)
+            await self.cache_pool.add_entry(new_entry)
             return new_entry
 
         except HTTPException:
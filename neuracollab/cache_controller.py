@@ -22,6 +22,7 @@ def get_cache_controller(cache_pool: NeuralCachePool):
                 "max_size_mb": cache_pool.max_size_mb,
                 "compression_enabled": cache_pool.compression_enabled,
                 "compression_threshold": cache_pool.compression_threshold,
+                "eviction_policy": cache_pool.eviction_policy,
                 "current_size": cache_pool.current_size,
                 "entry_count": len(cache_pool.entries)
             }
@@ -34,15 +35,19 @@ def get_cache_controller(cache_pool: NeuralCachePool):
         """Update cache settings."""
         try:
             # Update settings
-            cache_pool.max_size_mb = settings.max_size_mb
+            if settings.eviction_policy:
+                cache_pool.eviction_policy = settings.eviction_policy
             cache_pool.compression_enabled = settings.compression_enabled
             cache_pool.compression_threshold = settings.compression_threshold
+            cache_pool.max_size_mb = settings.max_size_mb
             
             # Apply compression if enabled
             if settings.compression_enabled:
                 await cache_pool.compress_entries()
 
             return {"status": "Settings updated successfully"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to update cache settings: {e}")
             raise HTTPException(status_code=500, detail="Failed to update cache settings")
@@ -66,7 +71,9 @@ def get_cache_controller(cache_pool: NeuralCachePool):
                 "size_mb": cache_pool.current_size,
                 "compression_ratio": cache_pool.get_compression_ratio(),
                 "hit_rate": cache_pool.get_hit_rate(),
-                "miss_rate": cache_pool.get_miss_rate()
+                "miss_rate": cache_pool.get_miss_rate(),
+                "hot_tier": cache_pool.get_hot_tier_stats(),
+                "context_cache": cache_pool.get_context_cache_stats()
             }
             return stats
         except Exception as e:
@@ -1,93 +1,1002 @@
 """
 Neural Cache Pool - Core implementation for the NeuraCollab system.
 """
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, List, Optional, Dict, Any, Tuple
 from uuid import UUID
+import asyncio
+import heapq
+import json
+import logging
 import re
-import nltk
-from nltk.tokenize import sent_tokenize
+import zlib
 from datetime import datetime
 
 from .models import CacheEntry, WorkflowConfig
-from .storage import SQLiteConnector
+from .storage import AsyncSQLiteConnector
+from .sentences import get_sentence_tokenizer
+from .tokenizer import TokenCounter, get_token_counter
+from .config.defaults import CACHE_DEFAULTS, MODEL_DEFAULTS, STORAGE_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is part of the optional "compression" extra
+    np = None
+
+# Sentence density features, compiled once instead of on every re.search call
+_NUMBER_PATTERN = re.compile(r'\d+')
+_CONCLUSION_WORDS = ("therefore", "thus", "hence", "conclude")
+_IMPORTANCE_WORDS = ("important", "significant", "key", "critical")
+_CONCLUSION_PATTERN = re.compile("|".join(_CONCLUSION_WORDS), re.I)
+_IMPORTANCE_PATTERN = re.compile("|".join(_IMPORTANCE_WORDS), re.I)
+
+# str.isspace() lookup by code point; every whitespace character is <= U+3000
+_SPACE_LIMIT = 0x3001
+_SPACE_TABLE = (
+    np.array([chr(c).isspace() for c in range(_SPACE_LIMIT)] + [False], dtype=bool)
+    if np is not None else None
+)
+
+def _score_sentences_python(sentences: List[str]) -> List[int]:
+    """Reference per-sentence density scoring."""
+    return [
+        (2 if _NUMBER_PATTERN.search(sentence) else 0)
+        + (3 if _CONCLUSION_PATTERN.search(sentence) else 0)
+        + (2 if _IMPORTANCE_PATTERN.search(sentence) else 0)
+        + (1 if len(sentence.split()) > 5 else 0)
+        for sentence in sentences
+    ]
+
+def _score_sentences_numpy(sentences: List[str]) -> "np.ndarray":
+    """
+    Score every sentence in one pass over the joined text.
+
+    Sentences are joined with newlines, which no feature can span, and every
+    feature hit is attributed to the sentence containing its offset. Word
+    counts and digits come from a code point array; keyword hits use plain
+    substring search on ASCII text (where lower() is exact for re.I) and the
+    compiled patterns otherwise. The result is identical to scoring each
+    sentence separately.
+    """
+    count = len(sentences)
+    joined = "\n".join(sentences)
+    lengths = np.fromiter((len(sentence) for sentence in sentences), dtype=np.int64, count=count)
+    starts = np.zeros(count, dtype=np.int64)
+    np.cumsum(lengths[:-1] + 1, out=starts[1:])
+    ends = starts + lengths
+
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    space = _SPACE_TABLE[np.minimum(codes, _SPACE_LIMIT)]
+
+    def per_sentence(mask: "np.ndarray") -> "np.ndarray":
+        totals = np.zeros(len(mask) + 1, dtype=np.int64)
+        np.cumsum(mask, out=totals[1:])
+        return totals[ends] - totals[starts]
+
+    def hits(offsets: List[int]) -> "np.ndarray":
+        hit = np.zeros(count, dtype=np.int64)
+        if offsets:
+            hit[np.searchsorted(starts, np.asarray(offsets, dtype=np.int64), side="right") - 1] = 1
+        return hit
+
+    word_starts = ~space
+    word_starts[1:] &= space[:-1]
+
+    if joined.isascii():
+        digits = per_sentence((codes - 48) < 10) > 0
+        lowered = joined.lower()
+
+        def keyword_hits(words) -> "np.ndarray":
+            offsets = []
+            for word in words:
+                position = lowered.find(word)
+                while position != -1:
+                    offsets.append(position)
+                    position = lowered.find(word, position + 1)
+            return hits(offsets)
+
+        conclusion = keyword_hits(_CONCLUSION_WORDS)
+        importance = keyword_hits(_IMPORTANCE_WORDS)
+    else:
+        digits = hits([m.start() for m in _NUMBER_PATTERN.finditer(joined)])
+        conclusion = hits([m.start() for m in _CONCLUSION_PATTERN.finditer(joined)])
+        importance = hits([m.start() for m in _IMPORTANCE_PATTERN.finditer(joined)])
+
+    return (
+        2 * digits
+        + 3 * conclusion
+        + 2 * importance
+        + (per_sentence(word_starts) > 5)
+    )
 
 class ContextCompressor:
     """Intelligent context compression for managing token limits."""
     def __init__(self):
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
         self.enabled = True
         self.threshold = 0.8
 
-    def compress(self, text: str, target_length: int = 2000) -> str:
-        """Compress text while preserving key information."""
-        sentences = sent_tokenize(text)
+    def split(self, text: str) -> List[str]:
+        """Split text into sentences, loading the tokenizer on first use."""
+        return get_sentence_tokenizer()(text)
+
+    def compress(
+        self,
+        text: str,
+        target_length: int = 2000,
+        counter: Optional[TokenCounter] = None
+    ) -> str:
+        """
+        Compress text while preserving key information.
+
+        target_length is measured in characters, or in tokens when a counter is given.
+        """
+        sentences = self.split(text)
         if len(sentences) <= 3:
             return text
+        lengths = [counter.count(sentence) for sentence in sentences] if counter else None
+        return self.select_sentences(sentences, target_length, lengths)
+
+    def select_sentences(
+        self,
+        sentences: List[str],
+        target_length: int,
+        lengths: Optional[List[int]] = None
+    ) -> str:
+        """Keep the first sentence, the densest middle sentences and, if it fits, the last."""
+        if lengths is None:
+            lengths = [len(sentence) for sentence in sentences]
+        if np is None:
+            return self._select_python(sentences, target_length, lengths)
+
+        densities = _score_sentences_numpy(sentences)
+        lengths = np.asarray(lengths, dtype=np.int64)
+
+        # Stable descending sort keeps document order among equal densities,
+        # matching list.sort(reverse=True) on the middle sentences
+        order = np.argsort(-densities[1:-1], kind="stable") + 1
+        current_length = int(lengths[0])
+        cumulative = current_length + np.cumsum(lengths[order])
+        # Sentences are taken greedily until the first one that would overflow
+        taken = int(np.searchsorted(cumulative, target_length, side="right"))
+        if taken:
+            current_length = int(cumulative[taken - 1])
+
+        selected = [sentences[0]] + [sentences[i] for i in order[:taken]]
+        if current_length + lengths[-1] <= target_length:
+            selected.append(sentences[-1])
+
+        return " ".join(selected)
 
-        densities = []
-        for sentence in sentences:
-            density = sum([
-                2 if re.search(r'\d+', sentence) else 0,
-                3 if re.search(r'therefore|thus|hence|conclude', sentence, re.I) else 0,
-                2 if re.search(r'important|significant|key|critical', sentence, re.I) else 0,
-                1 if len(sentence.split()) > 5 else 0
-            ])
-            densities.append(density)
+    def _select_python(self, sentences: List[str], target_length: int, lengths: List[int]) -> str:
+        """Pure Python selection used when numpy is unavailable."""
+        densities = _score_sentences_python(sentences)
 
         selected = [sentences[0]]
-        middle_sentences = list(zip(sentences[1:-1], densities[1:-1]))
+        middle_sentences = list(zip(sentences[1:-1], densities[1:-1], lengths[1:-1]))
         middle_sentences.sort(key=lambda x: x[1], reverse=True)
-        
-        current_length = len(selected[0])
-        for sentence, _ in middle_sentences:
-            if current_length + len(sentence) > target_length:
+
+        current_length = lengths[0]
+        for sentence, _, length in middle_sentences:
+            if current_length + length > target_length:
                 break
             selected.append(sentence)
-            current_length += len(sentence)
+            current_length += length
 
-        if current_length + len(sentences[-1]) <= target_length:
+        if current_length + lengths[-1] <= target_length:
             selected.append(sentences[-1])
 
         return " ".join(selected)
 
+# Joiner between context blocks, and the text a prompt_chain block wraps around its prompt
+_SEPARATOR = "\n\n"
+_PROMPT_LABEL = "[Prompt: ]\n\n"
+
+@lru_cache(maxsize=None)
+def _label_tokens(counter: TokenCounter, label: str) -> int:
+    """Tokens a fixed separator or label costs, counted once per counter."""
+    return counter.count(label)
+
+class ContextRecord:
+    """A built context: the per-entry blocks and their token counts, and the final text."""
+    __slots__ = ("blocks", "tokens", "text", "size")
+
+    def __init__(self, blocks: Tuple[str, ...], text: str, tokens: Tuple[int, ...] = ()):
+        self.blocks = blocks
+        self.tokens = tokens
+        self.text = text
+        self.size = sum(len(block.encode("utf-8")) for block in blocks) + len(text.encode("utf-8"))
+
+class ContextCache:
+    """LRU cache of built contexts bounded by a byte budget."""
+    def __init__(self, max_bytes: int = CACHE_DEFAULTS["context_cache_bytes"]):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._records: "OrderedDict[Hashable, ContextRecord]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.derived = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[ContextRecord]:
+        """Look up a context, counting the hit or miss."""
+        record = self._records.get(key)
+        if record is None:
+            self.misses += 1
+            return None
+        self._records.move_to_end(key)
+        self.hits += 1
+        return record
+
+    def peek(self, key: Hashable) -> Optional[ContextRecord]:
+        """Look up a context without touching counters or recency."""
+        return self._records.get(key)
+
+    def put(self, key: Hashable, record: ContextRecord) -> None:
+        """Store a context, evicting least recently used records over budget."""
+        if record.size > self.max_bytes:
+            return
+        if key in self._records:
+            self.current_bytes -= self._records.pop(key).size
+        self._records[key] = record
+        self.current_bytes += record.size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._records.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached context."""
+        self._records.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and memory usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "derived": self.derived,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._records),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+def entry_size(entry: CacheEntry) -> int:
+    """Bytes an entry occupies as a storage row: its text columns, ids and timestamp."""
+    return (
+        len(entry.content.encode("utf-8"))
+        + len(entry.prompt.encode("utf-8"))
+        + len(entry.author.encode("utf-8"))
+        + len(json.dumps(entry.metadata).encode("utf-8"))
+        + (72 if entry.parent_id else 36)   # UUID strings
+        + len(entry.timestamp.isoformat())
+    )
+
+class HotEntry:
+    """A hot-tier slot holding an entry either as an object or zlib-compressed JSON."""
+    __slots__ = ("entry", "blob", "size", "raw_size", "frequency", "tick")
+
+    def __init__(self, entry: CacheEntry, raw_size: int):
+        self.entry: Optional[CacheEntry] = entry
+        self.blob: Optional[bytes] = None
+        self.size = raw_size
+        self.raw_size = raw_size
+        self.frequency = 1
+        self.tick = 0
+
+class HotEntryCache:
+    """
+    In-memory tier of cache entries in front of SQLite, bounded by a byte budget.
+
+    Once the tier fills past compression_threshold, the least recently used
+    entries are kept zlib-compressed; past the budget, entries are evicted by
+    policy: "lru", "lfu" (fewest hits, then oldest) or "size" (GreedyDual-Size-
+    Frequency: fewest hits per byte, aged so that stale entries still leave).
+    """
+    POLICIES = ("lru", "lfu", "size")
+
+    def __init__(
+        self,
+        max_bytes: int = CACHE_DEFAULTS["max_size_mb"] * 1024 * 1024,
+        policy: str = CACHE_DEFAULTS["eviction_policy"],
+        compression_enabled: bool = CACHE_DEFAULTS["compression_enabled"],
+        compression_threshold: float = CACHE_DEFAULTS["compression_threshold"],
+        compress_min_bytes: int = CACHE_DEFAULTS["compress_min_bytes"]
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_bytes = max_bytes
+        self._policy = policy
+        self.compression_enabled = compression_enabled
+        self.compression_threshold = compression_threshold
+        self.compress_min_bytes = compress_min_bytes
+        self.entries: "OrderedDict[UUID, HotEntry]" = OrderedDict()  # least recently used first
+        # Uncompressed candidates, in the same order
+        self._plain: "OrderedDict[UUID, None]" = OrderedDict()
+        self._heap: List[Tuple[float, int, UUID]] = []  # (priority, tick, id), stale items skipped
+        self._tick = 0
+        self._aging = 0.0
+        self.current_bytes = 0
+        self.raw_bytes = 0
+        self.compressed_entries = 0
+        self.evictions = 0
+        self.compressions = 0
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @policy.setter
+    def policy(self, policy: str) -> None:
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self._policy = policy
+        self._aging = 0.0
+        self._rebuild_heap()
+
+    def _priority(self, hot: HotEntry) -> float:
+        if self._policy == "lfu":
+            return hot.frequency
+        return self._aging + hot.frequency / max(hot.raw_size, 1)
+
+    def _schedule(self, entry_id: UUID, hot: HotEntry) -> None:
+        """Record a use: new recency tick and, for lfu/size, a fresh heap item."""
+        self._tick += 1
+        hot.tick = self._tick
+        if self._policy != "lru":
+            heapq.heappush(self._heap, (self._priority(hot), hot.tick, entry_id))
+            if len(self._heap) > 2 * len(self.entries) + 64:
+                self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [] if self._policy == "lru" else [
+            (self._priority(hot), hot.tick, entry_id) for entry_id, hot in self.entries.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def get(self, entry_id: UUID) -> Optional[CacheEntry]:
+        """Look up an entry, decompressing it if needed and marking it as used."""
+        hot = self.entries.get(entry_id)
+        if hot is None:
+            return None
+        hot.frequency += 1
+        self.entries.move_to_end(entry_id)
+        if hot.blob is not None:
+            hot.entry = CacheEntry.model_validate_json(zlib.decompress(hot.blob))
+            hot.blob = None
+            self.compressed_entries -= 1
+            self.current_bytes += hot.raw_size - hot.size
+            hot.size = hot.raw_size
+        self._plain[entry_id] = None
+        self._plain.move_to_end(entry_id)
+        self._schedule(entry_id, hot)
+        entry = hot.entry
+        self._enforce_budget(keep=entry_id)
+        return entry
+
+    def __contains__(self, entry_id: UUID) -> bool:
+        return entry_id in self.entries
+
+    def put(self, entry: CacheEntry) -> None:
+        """Admit an entry, compressing or evicting colder ones to stay within budget."""
+        size = entry_size(entry)
+        if size > self.max_bytes:
+            return
+        self.remove(entry.entry_id)
+        hot = HotEntry(entry, size)
+        self.entries[entry.entry_id] = hot
+        self._plain[entry.entry_id] = None
+        self.current_bytes += size
+        self.raw_bytes += size
+        self._schedule(entry.entry_id, hot)
+        self._enforce_budget(keep=entry.entry_id)
+
+    def remove(self, entry_id: UUID) -> bool:
+        hot = self.entries.pop(entry_id, None)
+        if hot is None:
+            return False
+        self._plain.pop(entry_id, None)
+        if hot.blob is not None:
+            self.compressed_entries -= 1
+        self.current_bytes -= hot.size
+        self.raw_bytes -= hot.raw_size
+        return True
+
+    def compress(
+        self,
+        target_bytes: Optional[int] = None,
+        keep: int = 0,
+        limit: Optional[int] = None
+    ) -> int:
+        """
+        Compress least recently used entries until the tier is under
+        target_bytes, leaving the keep most recently used ones alone and
+        looking at no more than limit entries.
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * self.compression_threshold)
+        compressed = 0
+        examined = 0
+        while self.current_bytes > target_bytes and len(self._plain) > keep:
+            if limit is not None and examined >= limit:
+                break
+            examined += 1
+            entry_id, _ = self._plain.popitem(last=False)
+            hot = self.entries[entry_id]
+            if hot.raw_size < self.compress_min_bytes:
+                continue
+            blob = zlib.compress(hot.entry.model_dump_json().encode("utf-8"))
+            if len(blob) >= hot.raw_size:
+                continue
+            hot.blob, hot.entry = blob, None
+            self.current_bytes -= hot.raw_size - len(blob)
+            hot.size = len(blob)
+            compressed += 1
+        self.compressions += compressed
+        self.compressed_entries += compressed
+        return compressed
+
+    def compression_candidates(self) -> int:
+        """Uncompressed entries not yet ruled out as too small to compress."""
+        return len(self._plain)
+
+    def _victim(self) -> Optional[UUID]:
+        if self._policy == "lru":
+            return next(iter(self.entries), None)
+        while self._heap:
+            priority, tick, entry_id = heapq.heappop(self._heap)
+            hot = self.entries.get(entry_id)
+            if hot is not None and hot.tick == tick:
+                if self._policy == "size":
+                    self._aging = priority
+                return entry_id
+        return None
+
+    def _enforce_budget(self, keep: Optional[UUID] = None) -> None:
+        """Compress past the threshold, then evict past the budget (never the entry in hand)."""
+        over_threshold = self.current_bytes > self.max_bytes * self.compression_threshold
+        if self.compression_enabled and over_threshold:
+            self.compress()
+        while self.current_bytes > self.max_bytes:
+            victim = self._victim()
+            if victim is not None and victim == keep:
+                # A new entry has the lowest lfu/size priority; take the next one instead
+                victim = self._victim()
+                self._schedule(keep, self.entries[keep])
+            if victim is None or victim == keep:
+                break
+            self.remove(victim)
+            self.evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._enforce_budget()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self._plain.clear()
+        self._heap = []
+        self._aging = 0.0
+        self.current_bytes = 0
+        self.raw_bytes = 0
+        self.compressed_entries = 0
+
+    def compression_ratio(self) -> float:
+        """Bytes held over the bytes the same entries take uncompressed."""
+        return self.current_bytes / self.raw_bytes if self.raw_bytes else 1.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "compressed_entries": self.compressed_entries,
+            "bytes": self.current_bytes,
+            "raw_bytes": self.raw_bytes,
+            "max_bytes": self.max_bytes,
+            "policy": self._policy,
+            "evictions": self.evictions,
+            "compressions": self.compressions,
+            "compression_ratio": self.compression_ratio()
+        }
+
 class NeuralCachePool:
-    """Intelligent cache pool management engine."""
-    def __init__(self, max_context_length: int = 16000):
-        self.storage = SQLiteConnector()
+    """
+    Intelligent cache pool management engine.
+
+    Point and ancestor lookups are served from an in-memory hot-entry tier
+    where possible; SQLite is the cold tier behind it and the source of
+    truth. Subtree and history range queries go to SQLite directly.
+    """
+    DURABILITY_LEVELS = ("buffered", "group_commit")
+
+    def __init__(
+        self,
+        max_context_tokens: int = CACHE_DEFAULTS["max_context_tokens"],
+        db_path: str = "neuracollab.db",
+        write_behind: bool = CACHE_DEFAULTS["write_behind"],
+        durability: str = CACHE_DEFAULTS["write_behind_durability"],
+        flush_interval: float = CACHE_DEFAULTS["flush_interval"],
+        flush_batch_size: int = CACHE_DEFAULTS["flush_batch_size"],
+        max_size_mb: float = CACHE_DEFAULTS["max_size_mb"],
+        eviction_policy: str = CACHE_DEFAULTS["eviction_policy"],
+        compression_enabled: bool = CACHE_DEFAULTS["compression_enabled"],
+        compression_threshold: float = CACHE_DEFAULTS["compression_threshold"],
+        storage_compression: Optional[str] = STORAGE_DEFAULTS["compression"]
+    ):
+        if durability not in self.DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {durability}")
+        self.storage = AsyncSQLiteConnector(db_path, compression=storage_compression)
         self.compressor = ContextCompressor()
-        self.max_context = max_context_length
+        self.max_context = max_context_tokens
+        self.context_cache = ContextCache()
+        self.hot = HotEntryCache(
+            int(max_size_mb * 1024 * 1024),
+            eviction_policy,
+            compression_enabled,
+            compression_threshold
+        )
+        # Entry lookups answered from memory (hot tier or staging) vs. from SQLite
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
         self._summarizer = None
 
+        # Write-behind staging: entries are visible to readers before they are flushed
+        self.write_behind = write_behind
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._staged: "OrderedDict[UUID, CacheEntry]" = OrderedDict()
+        self._commit_waiters: Dict[UUID, asyncio.Future] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closing = False
+
     def set_summarizer(self, summarizer: Any):
         """Set the summarizer instance."""
         self._summarizer = summarizer
 
+    @property
+    def entries(self) -> "OrderedDict[UUID, HotEntry]":
+        """Entries held in the hot tier."""
+        return self.hot.entries
+
+    @property
+    def current_size(self) -> float:
+        """Hot tier size in MB."""
+        return self.hot.current_bytes / (1024 * 1024)
+
+    @property
+    def max_size_mb(self) -> float:
+        return self.hot.max_bytes / (1024 * 1024)
+
+    @max_size_mb.setter
+    def max_size_mb(self, value: float) -> None:
+        self.hot.resize(int(value * 1024 * 1024))
+
+    @property
+    def eviction_policy(self) -> str:
+        return self.hot.policy
+
+    @eviction_policy.setter
+    def eviction_policy(self, policy: str) -> None:
+        self.hot.policy = policy
+
+    @property
+    def compression_enabled(self) -> bool:
+        return self.hot.compression_enabled
+
+    @compression_enabled.setter
+    def compression_enabled(self, enabled: bool) -> None:
+        self.hot.compression_enabled = enabled
+
+    @property
+    def compression_threshold(self) -> float:
+        return self.hot.compression_threshold
+
+    @compression_threshold.setter
+    def compression_threshold(self, threshold: float) -> None:
+        self.hot.compression_threshold = threshold
+
     async def add_entry(self, entry: CacheEntry) -> UUID:
         """Add a new entry to the cache pool."""
         if self._summarizer:
             summary = await self._summarizer.generate(entry.content)
             entry.metadata['summary'] = summary
-        return self.storage.insert(entry)
-
-    def get_context(self, current_id: UUID, config: WorkflowConfig) -> str:
-        """Generate context based on configuration rules."""
-        history = self._get_relevant_history(current_id, config)
-        raw_text = self._build_raw_context(history, config)
-        
-        if len(raw_text) > self.max_context:
-            return self.compressor.compress(raw_text)
-        return raw_text
-
-    def _get_relevant_history(self, current_id: UUID, config: WorkflowConfig) -> List[CacheEntry]:
+        self._record_token_counts(entry)
+        self.writes += 1
+        return await self._store(entry)
+
+    async def get_entry(self, entry_id: UUID) -> Optional[CacheEntry]:
+        """Get a single entry, including entries not yet flushed to storage."""
+        entry = self._cached(entry_id)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = await self.storage.get(entry_id)
+        if entry is not None:
+            self.hot.put(entry)
+        return entry
+
+    def _cached(self, entry_id: UUID) -> Optional[CacheEntry]:
+        """An entry from staging or the hot tier, without touching SQLite."""
+        if entry_id in self._staged:
+            return self._staged[entry_id]
+        return self.hot.get(entry_id)
+
+    async def _store(self, entry: CacheEntry) -> UUID:
+        """Persist an entry directly or through the write-behind buffer."""
+        if not self.write_behind:
+            await self.storage.insert(entry)
+            self.hot.put(entry)
+            return entry.entry_id
+
+        self.hot.put(entry)
+        self._ensure_flusher()
+        self._staged[entry.entry_id] = entry
+        waiter = None
+        if self.durability == "group_commit":
+            waiter = asyncio.get_running_loop().create_future()
+            self._commit_waiters[entry.entry_id] = waiter
+        if len(self._staged) >= self.flush_batch_size:
+            self._flush_wakeup.set()
+        if waiter:
+            await waiter
+        return entry.entry_id
+
+    def _ensure_flusher(self) -> None:
+        if self._flush_task and not self._flush_task.done():
+            return
+        self._flush_lock = self._flush_lock or asyncio.Lock()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Flush staged entries on a size or time trigger."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}")
+
+    async def flush(self) -> int:
+        """Commit all staged entries in one batched transaction."""
+        if not self._staged:
+            return 0
+        self._flush_lock = self._flush_lock or asyncio.Lock()
+        async with self._flush_lock:
+            batch = list(self._staged.values())
+            if not batch:
+                return 0
+            failures: Dict[UUID, Exception] = {}
+            try:
+                await self.storage.insert_many(batch)
+            except Exception as e:
+                # Isolate the offending rows so one bad entry does not sink the batch
+                logger.warning(
+                    f"Batched insert of {len(batch)} entries failed ({e}), retrying individually"
+                )
+                for entry in batch:
+                    try:
+                        await self.storage.insert(entry)
+                    except Exception as entry_error:
+                        failures[entry.entry_id] = entry_error
+                        logger.error(f"Dropping staged entry {entry.entry_id}: {entry_error}")
+
+            for entry in batch:
+                self._staged.pop(entry.entry_id, None)
+                waiter = self._commit_waiters.pop(entry.entry_id, None)
+                if waiter and not waiter.done():
+                    if entry.entry_id in failures:
+                        waiter.set_exception(failures[entry.entry_id])
+                    else:
+                        waiter.set_result(None)
+            if failures:
+                # Dropped entries were never persisted, so stop serving them. Contexts
+                # of their descendants may include them too, hence the full clear.
+                for entry_id in failures:
+                    self.hot.remove(entry_id)
+                self.context_cache.clear()
+            return len(batch) - len(failures)
+
+    async def get_ancestors(self, entry_id: UUID, limit: Optional[int] = None) -> List[CacheEntry]:
+        """Get the ancestor chain of an entry (oldest first), including staged entries."""
+        cached_chain: List[CacheEntry] = []
+        current = entry_id
+        while current is not None and (limit is None or len(cached_chain) < limit):
+            entry = self._cached(current)
+            if entry is None:
+                break
+            cached_chain.append(entry)
+            current = entry.parent_id
+        cached_chain.reverse()
+        self.hits += len(cached_chain)
+
+        remaining = None if limit is None else limit - len(cached_chain)
+        if current is None or remaining == 0:
+            return cached_chain
+        stored = await self.storage.get_ancestors(current, remaining)
+        self.misses += max(len(stored), 1)
+        for entry in stored:
+            self.hot.put(entry)
+        return stored + cached_chain
+
+    async def get_subtree(self, entry_id: UUID) -> List[CacheEntry]:
+        """Get an entry and all of its descendants, merging in staged entries."""
+        subtree = [] if entry_id in self._staged else await self.storage.get_subtree(entry_id)
+        if not self._staged:
+            return subtree
+
+        members = {entry.entry_id for entry in subtree}
+        if entry_id in self._staged:
+            subtree.append(self._staged[entry_id])
+            members.add(entry_id)
+        # Staged entries are kept in insertion order, so parents precede children
+        for staged in list(self._staged.values()):
+            if staged.entry_id not in members and staged.parent_id in members:
+                subtree.append(staged)
+                members.add(staged.entry_id)
+        subtree.sort(key=lambda entry: entry.timestamp)
+        return subtree
+
+    async def get_history(
+        self,
+        workflow_id: UUID,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[UUID] = None
+    ) -> List[CacheEntry]:
+        """
+        Get a workflow's entries in timestamp order.
+
+        With after, only entries newer than that entry are returned; raises
+        KeyError if the cursor entry is unknown.
+        """
+        if not self._staged:
+            return await self.storage.get_subtree(workflow_id, after, limit, offset)
+
+        def order(entry: CacheEntry) -> Tuple[datetime, str]:
+            return entry.timestamp, str(entry.entry_id)
+
+        entries = sorted(await self.get_subtree(workflow_id), key=order)
+        if after is not None:
+            anchor = await self.get_entry(after)
+            if anchor is None:
+                raise KeyError(f"Unknown history cursor: {after}")
+            entries = [entry for entry in entries if order(entry) > order(anchor)]
+        entries = entries[offset:]
+        return entries if limit is None else entries[:limit]
+
+    async def get_context(
+        self,
+        current_id: UUID,
+        config: WorkflowConfig,
+        model_name: Optional[str] = None
+    ) -> str:
+        """
+        Generate context based on configuration rules, packed to the model's token budget.
+
+        The context is built from current_id's ancestors, which never change
+        once the entry is stored, so it is memoized per entry. Ids that are
+        not stored yet have no history and are not memoized.
+        """
+        counter = get_token_counter(model_name)
+        budget = self.context_budget(model_name)
+        key = self._context_key(current_id, config, (counter.name, budget))
+        record = self.context_cache.get(key)
+        if record is not None:
+            return record.text
+
+        entry = await self.get_entry(current_id)
+        if entry is None:
+            return ""
+        blocks, tokens = await self._build_context_blocks(entry, config, counter, key[-1])
+        text = self._pack_context(blocks, tokens, budget, counter)
+        self.context_cache.put(key, ContextRecord(blocks, text, tokens))
+        return text
+
+    def context_budget(self, model_name: Optional[str] = None) -> int:
+        """Token budget for history in a model's context window."""
+        defaults = MODEL_DEFAULTS.get(model_name or "")
+        if not defaults or "context_window" not in defaults:
+            return self.max_context
+        return max(
+            defaults["context_window"]
+            - defaults.get("max_tokens", 0)
+            - CACHE_DEFAULTS["context_reserve_tokens"],
+            0
+        )
+
+    @staticmethod
+    def _context_key(entry_id: UUID, config: WorkflowConfig, variant: Hashable = None) -> Hashable:
+        return (entry_id, tuple(sorted(config.inheritance_rules.items())), config.mode, variant)
+
+    async def _build_context_blocks(
+        self,
+        entry: CacheEntry,
+        config: WorkflowConfig,
+        counter: TokenCounter,
+        variant: Hashable = None
+    ) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+        """
+        Build the per-entry context blocks and their token counts for an entry.
+
+        When the parent's context is cached the child's blocks are derived from
+        it plus the new entry, instead of re-reading and re-joining the history.
+        """
+        if entry.parent_id is not None:
+            parent = self.context_cache.peek(self._context_key(entry.parent_id, config, variant))
+            if parent is not None:
+                self.context_cache.derived += 1
+                blocks, tokens = parent.blocks, parent.tokens
+                last_3 = config.inheritance_rules.get("last_3_steps")
+                full = config.inheritance_rules.get("full_history")
+                if last_3 or full or self._should_include_entry(entry, config):
+                    blocks = blocks + (self._build_entry_block(entry, config),)
+                    tokens = tokens + (self._entry_tokens(entry, config, counter),)
+                return (blocks[-3:], tokens[-3:]) if last_3 else (blocks, tokens)
+
+        history = await self._get_relevant_history(entry.entry_id, config)
+        return (
+            tuple(self._build_entry_block(entry, config) for entry in history),
+            tuple(self._entry_tokens(entry, config, counter) for entry in history)
+        )
+
+    def _pack_context(
+        self,
+        blocks: Tuple[str, ...],
+        tokens: Tuple[int, ...],
+        budget: int,
+        counter: TokenCounter
+    ) -> str:
+        """
+        Pack history blocks into a token budget.
+
+        The newest blocks are kept whole; whatever budget is left is filled with
+        a compressed digest of the older blocks that no longer fit.
+        """
+        separator = _label_tokens(counter, _SEPARATOR)
+        if sum(tokens) + separator * max(len(tokens) - 1, 0) <= budget:
+            return "\n\n".join(blocks)
+
+        kept: List[str] = []
+        used = 0
+        for block, block_tokens in zip(reversed(blocks), reversed(tokens)):
+            cost = block_tokens + (separator if kept else 0)
+            if used + cost > budget:
+                break
+            kept.append(block)
+            used += cost
+        kept.reverse()
+
+        dropped = blocks[:len(blocks) - len(kept)]
+        remaining = budget - used - (separator if kept else 0)
+        if dropped and remaining > 0:
+            digest = self.compressor.compress("\n\n".join(dropped), remaining, counter)
+            if counter.count(digest) <= remaining:
+                kept.insert(0, digest)
+            elif not kept:
+                kept.append(self._truncate_to_budget(digest, remaining, counter))
+        return "\n\n".join(kept)
+
+    @staticmethod
+    def _truncate_to_budget(text: str, budget: int, counter: TokenCounter) -> str:
+        """Keep the longest tail of text that fits the budget."""
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if counter.count(text[-middle:]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[len(text) - low:]
+
+    def _record_token_counts(self, entry: CacheEntry) -> None:
+        """Cache the entry's token counts in its metadata."""
+        counter = get_token_counter()
+        entry.metadata["token_count"] = {
+            "counter": counter.name,
+            "content": counter.count(entry.content),
+            "prompt": counter.count(entry.prompt),
+            "summary": counter.count(entry.metadata.get("summary") or "")
+        }
+
+    def _entry_tokens(
+        self,
+        entry: CacheEntry,
+        config: WorkflowConfig,
+        counter: TokenCounter
+    ) -> int:
+        """Token count of the context block contributed by an entry."""
+        cached = entry.metadata.get("token_count")
+        if not isinstance(cached, dict) or cached.get("counter") != counter.name:
+            cached = {
+                "content": counter.count(entry.content),
+                "prompt": counter.count(entry.prompt),
+                "summary": counter.count(entry.metadata.get("summary") or "")
+            }
+        if 'summary' in entry.metadata:
+            # The label carries the entry id, so it is counted per entry
+            return cached["summary"] + counter.count(f"Summary of step {entry.entry_id}:\n")
+        if config.inheritance_rules.get("prompt_chain"):
+            return cached["prompt"] + _label_tokens(counter, _PROMPT_LABEL) + cached["content"]
+        return cached["content"]
+
+    def get_context_cache_stats(self) -> Dict[str, Any]:
+        """Get context cache hit/miss statistics."""
+        return self.context_cache.stats()
+
+    def get_hit_rate(self) -> float:
+        """Share of entry lookups answered without reading SQLite."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def activity(self) -> int:
+        """Count of foreground reads and writes, for telling when the pool is idle."""
+        return self.hits + self.misses + self.writes
+
+    def get_miss_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.misses / lookups if lookups else 0.0
+
+    def get_compression_ratio(self) -> float:
+        return self.hot.compression_ratio()
+
+    def get_hot_tier_stats(self) -> Dict[str, Any]:
+        """Get hot-tier size, eviction and lookup statistics."""
+        stats = self.hot.stats()
+        stats.update({"hits": self.hits, "misses": self.misses, "hit_rate": self.get_hit_rate()})
+        return stats
+
+    async def compress_entries(self) -> int:
+        """Compress cold hot-tier entries down to the compression threshold."""
+        return self.hot.compress()
+
+    def clear(self) -> None:
+        """Drop every in-memory entry and built context; SQLite keeps the history."""
+        self.hot.clear()
+        self.context_cache.clear()
+
+    async def optimize(self) -> None:
+        """Flush staged writes and bring the hot tier back within its thresholds."""
+        await self.flush()
+        if self.compression_enabled:
+            self.hot.compress()
+        self.hot.resize(self.hot.max_bytes)
+
+    async def vacuum(self) -> None:
+        """Reclaim free pages in the SQLite cold tier."""
+        await self.storage.vacuum()
+
+    async def prune_orphans(self, before: datetime, limit: int) -> int:
+        """Delete a batch of stored entries whose parent no longer exists."""
+        pruned = await self.storage.prune_orphans(before, limit)
+        for entry_id in pruned:
+            self.hot.remove(entry_id)
+        return len(pruned)
+
+    async def _get_relevant_history(
+        self,
+        current_id: UUID,
+        config: WorkflowConfig
+    ) -> List[CacheEntry]:
         """Get relevant historical entries based on inheritance rules."""
-        full_history = self.storage.get_branch(current_id)
-        
         if config.inheritance_rules.get("last_3_steps"):
-            return full_history[-3:]
-        elif config.inheritance_rules.get("full_history"):
+            return await self.get_ancestors(current_id, 3)
+
+        full_history = await self.get_ancestors(current_id)
+        if config.inheritance_rules.get("full_history"):
             return full_history
         else:
             return [
@@ -97,17 +1006,15 @@ class NeuralCachePool:
 
     def _build_raw_context(self, history: List[CacheEntry], config: WorkflowConfig) -> str:
         """Build context from historical entries."""
-        context_parts = []
-        
-        for entry in history:
-            if 'summary' in entry.metadata:
-                context_parts.append(f"Summary of step {entry.entry_id}:\n{entry.metadata['summary']}")
-            else:
-                if config.inheritance_rules.get("prompt_chain"):
-                    context_parts.append(f"[Prompt: {entry.prompt}]")
-                context_parts.append(f"{entry.content}")
+        return "\n\n".join(self._build_entry_block(entry, config) for entry in history)
 
-        return "\n\n".join(context_parts)
+    def _build_entry_block(self, entry: CacheEntry, config: WorkflowConfig) -> str:
+        """Build the context text contributed by a single entry."""
+        if 'summary' in entry.metadata:
+            return f"Summary of step {entry.entry_id}:\n{entry.metadata['summary']}"
+        if config.inheritance_rules.get("prompt_chain"):
+            return f"[Prompt: {entry.prompt}]\n\n{entry.content}"
+        return f"{entry.content}"
 
     def _should_include_entry(self, entry: CacheEntry, config: WorkflowConfig) -> bool:
         """Determine if an entry should be included based on rules."""
@@ -117,9 +1024,9 @@ class NeuralCachePool:
             return "role" in entry.metadata
         return True
 
-    def create_branch(self, base_id: UUID, new_prompt: str) -> UUID:
+    async def create_branch(self, base_id: UUID, new_prompt: str) -> UUID:
         """Create a new branch from an existing entry."""
-        base_entry = self.storage.get(base_id)
+        base_entry = await self.get_entry(base_id)
         if not base_entry:
             raise ValueError(f"Base entry {base_id} not found")
             
@@ -130,4 +1037,14 @@ class NeuralCachePool:
             author="System:Branch",
             metadata={"branch_from": str(base_id)}
         )
-        return self.storage.insert(new_entry)
+        return await self.add_entry(new_entry)
+
+    async def close(self) -> None:
+        """Flush staged writes and release storage resources."""
+        self._closing = True
+        if self._flush_task:
+            self._flush_wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+        await self.storage.close()
@@ -66,29 +66,140 @@ MODEL_DEFAULTS = {
     "gpt-4": {
         "temperature": 0.7,
         "max_tokens": 2000,
+        "context_window": 8192,
         "fallback_models": ["llama3"]
     },
     "llama3": {
         "temperature": 0.8,
         "max_tokens": 4000,
+        "context_window": 8192,
         "fallback_models": []
     }
 }
 
 # Cache settings
 CACHE_DEFAULTS = {
-    "max_size_mb": 100,
+    "max_size_mb": 100,        # in-memory hot-entry tier in front of SQLite
+    "eviction_policy": "lru",  # "lru", "lfu" or "size" (frequency per byte)
     "compression_enabled": True,
-    "compression_threshold": 0.8,
+    "compression_threshold": 0.8,   # fill ratio at which cold hot-tier entries are compressed
+    "compress_min_bytes": 512,      # smaller entries are not worth compressing
     "summarization_enabled": True,
-    "cleanup_interval": 3600  # 1 hour
+    "cleanup_interval": 3600,  # 1 hour
+    "write_behind": False,
+    "write_behind_durability": "group_commit",  # or "buffered"
+    "flush_interval": 0.05,    # seconds
+    "flush_batch_size": 64,
+    "context_cache_bytes": 32 * 1024 * 1024,
+    "max_context_tokens": 4000,     # history budget for models without a context_window
+    "context_reserve_tokens": 512   # room for the step prompt around the history
+}
+
+# LLM response cache; the persistent tier is bounded by CACHE_DEFAULTS["max_size_mb"]
+RESPONSE_CACHE_DEFAULTS = {
+    "ttl": 7 * 24 * 3600,             # seconds a cached response is served
+    "memory_bytes": 8 * 1024 * 1024,  # in-memory LRU in front of SQLite
+    "sweep_every": 256                # writes between sweeps for expired rows
+}
+
+# Semantic (near-duplicate prompt) cache
+SEMANTIC_CACHE_DEFAULTS = {
+    "threshold": 0.92,         # cosine similarity needed to serve a cached answer
+    "dimensions": 4096,        # hashed n-gram feature space
+    "max_entries": 2048,       # least recently used prompts are dropped beyond this
+    "refresh_ratio": 0.1,      # re-weight rows once this share of the index changed
+    "audit_rate": 0.05,        # share of hits also sent to the provider to measure false hits
+    "answer_threshold": 0.5    # audited answers less similar than this count as false hits
+}
+
+# Storage settings
+STORAGE_DEFAULTS = {
+    "pool_readers": 4,         # reader connections alongside the single writer
+    "synchronous": "NORMAL",   # safe with WAL, avoids an fsync per commit
+    "cache_size_kb": 20000,
+    "mmap_size": 268435456,    # 256 MB
+    "busy_timeout_ms": 5000,
+    "auto_vacuum": "INCREMENTAL",  # lets maintenance free pages a slice at a time
+    # Codec for entry text ("zlib" or "zstd"); None stores plain text. Off by
+    # default: older builds cannot read compressed rows. Convert existing
+    # databases with `python -m neuracollab.migrate compress`
+    "compression": None,
+    "compression_level": None,     # codec default
+    "compress_min_bytes": 128,     # shorter rows are stored as plain text
+    "dictionary_size": 32 * 1024,
+    "dictionary_samples": 500,     # recent rows a dictionary is trained on
+    "dictionary_min_rows": 200     # rows stored before maintenance trains the first dictionary
+}
+
+# Background cache maintenance; runs every CACHE_DEFAULTS["cleanup_interval"] seconds
+MAINTENANCE_DEFAULTS = {
+    "slice_seconds": 0.02,     # target duration of one unit of maintenance work
+    "initial_batch": 64,       # rows/pages/entries per slice, adapted to slice_seconds
+    "max_batch": 4096,
+    "quiet_period": 0.25,      # foreground must be idle this long before a slice runs
+    "max_deferral": 60,        # after waiting this long, slices run between requests anyway
+    "hot_fraction": 0.5,       # most recently used share of the hot tier left uncompressed
+    "orphan_grace": 24 * 3600, # seconds before an entry with a missing parent is pruned
+    "analysis_limit": 400      # rows sampled per index when refreshing planner stats
 }
 
 # API settings
 API_DEFAULTS = {
-    "rate_limit": 60,  # requests per minute
+    "rate_limit": 60,  # requests per minute, per adapter
+    "rate_limit_burst": 10,           # requests allowed back to back before throttling
+    "max_concurrency": 8,             # in-flight requests per adapter
     "timeout": 30,     # seconds
-    "max_retries": 3
+    "max_retries": 3,
+    "max_connections": 100,           # shared HTTP client pool
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30            # seconds an idle connection is kept
+}
+
+# Adapter routing
+ROUTING_DEFAULTS = {
+    "ewma_alpha": 0.2,        # weight of the newest latency/error sample
+    "default_latency": 1.0,   # seconds assumed before an adapter has answered
+    "error_penalty": 4.0,     # cost multiplier per unit of error rate
+    "priority_weight": 0.1,   # extra cost per priority step after 1
+    "reroute_factor": 2.0,    # leave the requested model once it costs this much more
+    "explore_every": 20,      # still send every Nth rerouted request to refresh its estimate
+    "latency_window": 200     # recent latencies kept per adapter for percentiles
+}
+
+# Retries and circuit breakers
+RESILIENCE_DEFAULTS = {
+    "retry_base_delay": 0.5,   # seconds before the first retry, doubled per attempt
+    "retry_max_delay": 8.0,    # cap on one backoff, including Retry-After
+    "failure_threshold": 5,    # consecutive failures that open an adapter's circuit
+    "recovery_timeout": 30     # seconds an open circuit waits before a trial request
+}
+
+# Hedged requests
+HEDGING_DEFAULTS = {
+    "percentile": 0.95,   # hedge once the primary is slower than this share of its recent answers
+    "min_samples": 20,    # latencies needed before the percentile is trusted
+    "min_delay": 0.05,    # never hedge sooner than this (seconds)
+    "max_ratio": 0.1,     # duplicated requests allowed per hedge-eligible request
+    "burst": 5            # hedges that may be issued back to back
+}
+
+# Adapter health probing
+HEALTH_DEFAULTS = {
+    "interval": 30,       # seconds between probe rounds
+    "jitter": 0.1,        # +/- fraction of the interval
+    "ttl": 90,            # seconds a probe result stays valid
+    "probe_timeout": 2    # seconds before a probe counts as failed
+}
+
+# WebSocket streaming
+WEBSOCKET_DEFAULTS = {
+    "delta_interval": 0.05,        # seconds to coalesce streamed tokens per step_delta frame
+    "queue_size": 256,             # frames buffered per connection
+    "slow_consumer_policy": "coalesce",  # "coalesce" or "drop" when a queue fills
+    "send_timeout": 10,            # seconds before a stalled send drops the connection
+    "backplane": "local",          # or "sqlite:///path.db" to fan out across workers
+    "backplane_poll_interval": 0.05,
+    "backplane_retention": 60      # seconds published messages are kept
 }
 
 # Logging configuration
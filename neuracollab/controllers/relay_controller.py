@@ -18,7 +18,7 @@ class RelayController:
         return await self.cache.add_entry(initial_entry)
 
     async def execute_step(self, workflow_id: UUID, step_config: Dict) -> CacheEntry:
-        context = self.cache.get_context(workflow_id)
+        context = await self.cache.get_context(workflow_id)
         prompt = self._build_prompt(context, step_config)
         
         content = await self.dispatcher.dispatch(
@@ -1,9 +1,21 @@
 """
 Model dispatcher for managing and routing requests to different LLM adapters.
 """
+import asyncio
 import logging
-from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
 from .adapters.llm_adapters import LLMAdapter, create_adapter, FallbackAdapter
+from .config.defaults import API_DEFAULTS, MODEL_DEFAULTS
+from .health_prober import HealthProber
+from .hedging import HedgePolicy
+from .http_pool import HTTPClientPool
+from .rate_limiter import RateLimiter
+from .resilience import CircuitBreaker, CircuitOpenError, GenerationError, RetryPolicy, is_retryable
+from .response_cache import ResponseCache
+from .routing import Router
+from .semantic_cache import SemanticCache
+from .single_flight import SingleFlight, request_key
 
 logger = logging.getLogger(__name__)
 
@@ -12,78 +24,486 @@ class LLMDispatcher:
     Manages multiple LLM adapters and routes requests to appropriate models.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        http_pool: Optional[HTTPClientPool] = None,
+        health: Optional[HealthProber] = None,
+        router: Optional[Router] = None,
+        hedging: Optional[HedgePolicy] = None,
+        retry: Optional[RetryPolicy] = None,
+        response_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
         self._adapters: Dict[str, LLMAdapter] = {}
         self._default_adapter = FallbackAdapter()
+        self.http_pool = http_pool or HTTPClientPool()
+        self.health = health or HealthProber()
+        self._limiters: Dict[str, RateLimiter] = {}
+        self.router = router or Router()
+        self.hedging = hedging or HedgePolicy()
+        self.retry = retry or RetryPolicy()
+        self.single_flight = SingleFlight()
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._fallbacks: Dict[str, List[str]] = {}
+        self.fallbacks_used = 0
+        self.exhausted = 0
         logger.info("LLM Dispatcher initialized with fallback adapter")
 
-    def register_adapter(self, name: str, adapter: LLMAdapter) -> None:
-        """Register a new model adapter."""
+    def register_adapter(
+        self,
+        name: str,
+        adapter: LLMAdapter,
+        rate_limit: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+        priority: int = 1,
+        fallback_models: Optional[List[str]] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ) -> None:
+        """
+        Register a new model adapter.
+
+        rate_limit (requests per minute) and max_concurrency default to
+        API_DEFAULTS; a prepared limiter can be passed instead. A lower
+        priority number is preferred when routing. fallback_models defaults
+        to MODEL_DEFAULTS[name]["fallback_models"].
+        """
         if adapter.is_available():
+            adapter.bind_http_pool(self.http_pool)
             self._adapters[name] = adapter
+            self._limiters[name] = limiter or RateLimiter(
+                rate_limit=rate_limit or API_DEFAULTS["rate_limit"],
+                max_concurrency=max_concurrency or API_DEFAULTS["max_concurrency"]
+            )
+            self.router.track(name, priority)
+            self._breakers[name] = breaker or CircuitBreaker()
+            if fallback_models is None:
+                fallback_models = MODEL_DEFAULTS.get(name, {}).get("fallback_models", [])
+            self._fallbacks[name] = list(fallback_models)
+            self.health.track(name, adapter)
             logger.info(f"Registered adapter: {name}")
         else:
             logger.warning(f"Adapter {name} is not available, skipping registration")
 
-    def register_adapter_from_config(self, name: str, provider: str, config: dict) -> None:
+    def remove_adapter(self, name: str) -> None:
+        """Unregister a model adapter."""
+        if self._adapters.pop(name, None) is not None:
+            self._limiters.pop(name, None)
+            self._breakers.pop(name, None)
+            self._fallbacks.pop(name, None)
+            self.router.untrack(name)
+            self.health.untrack(name)
+            logger.info(f"Removed adapter: {name}")
+
+    def is_adapter_available(self, name: str) -> bool:
+        """Check a registered adapter using cached health and its circuit breaker, without I/O."""
+        adapter = self._adapters.get(name)
+        if adapter is None or not self.health.is_available(name, adapter):
+            return False
+        breaker = self._breakers.get(name)
+        return breaker is None or not breaker.is_open()
+
+    def fallback_chain(self, name: str) -> List[str]:
+        """The adapter followed by its available fallback models, in order."""
+        chain = [name]
+        for fallback in self._fallbacks.get(name, []):
+            if fallback not in chain and self.is_adapter_available(fallback):
+                chain.append(fallback)
+        return chain
+
+    def register_adapter_from_config(
+        self,
+        name: str,
+        provider: str,
+        config: dict,
+        rate_limit: Optional[int] = None,
+        priority: int = 1
+    ) -> None:
         """Create and register an adapter from configuration."""
         try:
             adapter = create_adapter(provider, config)
-            self.register_adapter(name, adapter)
+            self.register_adapter(name, adapter, rate_limit=rate_limit, priority=priority)
         except Exception as e:
             logger.error(f"Failed to create adapter {name} with provider {provider}: {e}")
 
-    async def dispatch(self, prompt: str, model_name: Optional[str] = None, **kwargs) -> str:
+    def _select_adapter(self, model_name: Optional[str] = None) -> Tuple[Optional[str], LLMAdapter]:
+        """Route to the requested or cheapest available adapter, else the fallback (named None)."""
+        candidates = [name for name in self._adapters if self.is_adapter_available(name)]
+        if model_name in self._adapters and model_name not in candidates:
+            logger.warning(f"Selected model {model_name} is not available")
+
+        name = self.router.choose(candidates, model_name)
+        if name is None:
+            logger.warning("No LLM adapters available, using fallback adapter")
+            return None, self._default_adapter
+        if name != model_name:
+            logger.info(f"Using alternate model: {name}")
+        return name, self._adapters[name]
+
+    @asynccontextmanager
+    async def _limited(
+        self,
+        name: Optional[str],
+        workflow_id: Hashable = None
+    ) -> AsyncIterator[None]:
+        """Hold a rate-limited slot on an adapter; the fallback is unlimited."""
+        limiter = self._limiters.get(name) if name is not None else None
+        if limiter is None:
+            yield
+            return
+        async with limiter.slot(workflow_id):
+            yield
+
+    async def dispatch(
+        self,
+        prompt: str,
+        model_name: Optional[str] = None,
+        workflow_id: Hashable = None,
+        hedge: bool = False,
+        dedupe: bool = True,
+        cache: Optional[bool] = None,
+        semantic: bool = False,
+        **kwargs
+    ) -> str:
         """
         Dispatch a generation request to the specified model or fallback.
         
         Args:
             prompt: The input text to process
             model_name: Name of the model to use, or None for default
+            workflow_id: Workflow the request belongs to, for fair queueing
+            hedge: Send a duplicate to a second model if this one is slow
+            dedupe: Share the answer of an identical request already in flight
+            cache: Use the response cache; by default only deterministic
+                (temperature 0) requests are cached
+            semantic: Also answer from a cached near-duplicate prompt; this
+                opts in whatever the temperature, unless cache is False
             **kwargs: Additional model-specific parameters
         
         Returns:
             Generated text response
         """
-        selected_adapter = None
-
-        if model_name and model_name in self._adapters:
-            selected_adapter = self._adapters[model_name]
-            if not selected_adapter.is_available():
-                logger.warning(f"Selected model {model_name} is not available")
-                selected_adapter = None
-
-        if not selected_adapter:
-            # Try to find any available adapter
-            for name, adapter in self._adapters.items():
-                if adapter.is_available():
-                    selected_adapter = adapter
-                    logger.info(f"Using alternate model: {name}")
-                    break
-
-        # If no adapters are available, use fallback
-        if not selected_adapter:
-            logger.warning("No LLM adapters available, using fallback adapter")
-            selected_adapter = self._default_adapter
+        response_cache = self.response_cache
+        semantic_cache = self.semantic_cache if semantic and cache is not False else None
+        if cache is None:
+            cache = ResponseCache.cacheable(model_name, kwargs)
+        key = None
+        if response_cache is not None and cache:
+            key = response_cache.key(model_name, prompt, kwargs)
+            cached = await response_cache.get(key)
+            if cached is not None:
+                return cached
+        audited = None
+        if semantic_cache is not None:
+            match = semantic_cache.lookup(model_name, prompt, kwargs)
+            if match is not None:
+                if not semantic_cache.should_audit():
+                    return match[0]
+                audited = match[0]  # answer anyway and compare
+
+        if not dedupe:
+            response = await self._dispatch(prompt, model_name, workflow_id, hedge, **kwargs)
+        else:
+            response = await self.single_flight.do(
+                request_key(model_name, prompt, kwargs),
+                lambda: self._dispatch(prompt, model_name, workflow_id, hedge, **kwargs)
+            )
+        # Never cache the placeholder answer given when no adapter is registered
+        if self._adapters:
+            if key is not None:
+                await response_cache.put(key, model_name, response)
+            if audited is not None:
+                semantic_cache.record_audit(audited, response)
+            elif semantic_cache is not None:
+                semantic_cache.add(model_name, prompt, kwargs, response)
+        return response
+
+    async def _dispatch(
+        self,
+        prompt: str,
+        model_name: Optional[str] = None,
+        workflow_id: Hashable = None,
+        hedge: bool = False,
+        **kwargs
+    ) -> str:
+        """Route a request along its fallback chain with retries."""
+        if not self._adapters:
+            return await self._default_adapter.generate(prompt, **kwargs)
+        name, _ = self._select_adapter(model_name)
+        if name is None:
+            raise GenerationError(f"No LLM adapters available for {model_name}")
+
+        failures = []
+        for position, candidate in enumerate(self.fallback_chain(name)):
+            if position:
+                self.fallbacks_used += 1
+                logger.info(f"Falling back from {name} to {candidate}")
+            try:
+                return await self._generate_with_retries(
+                    candidate, prompt, workflow_id, hedge and position == 0, **kwargs
+                )
+            except Exception as e:
+                logger.error(f"Generation error with adapter {candidate}: {e}")
+                failures.append((candidate, e))
+        self.exhausted += 1
+        raise GenerationError(
+            f"All adapters failed for {model_name or name}: "
+            + "; ".join(f"{candidate}: {error}" for candidate, error in failures),
+            failures
+        )
+
+    async def _generate_with_retries(
+        self,
+        name: str,
+        prompt: str,
+        workflow_id: Hashable = None,
+        hedge: bool = False,
+        **kwargs
+    ) -> str:
+        """Generate on one adapter, retrying transient failures with backoff."""
+        adapter = self._adapters[name]
+        attempt = 0
+        while True:
+            try:
+                if hedge:
+                    return await self._generate_hedged(name, adapter, prompt, workflow_id, **kwargs)
+                return await self._generate(name, adapter, prompt, workflow_id, **kwargs)
+            except Exception as e:
+                if attempt >= self.retry.max_retries or not is_retryable(e):
+                    raise
+                logger.warning(f"Retrying {name} after error: {e}")
+                await self.retry.wait(attempt, e)
+                attempt += 1
+
+    async def _generate(
+        self,
+        name: Optional[str],
+        adapter: LLMAdapter,
+        prompt: str,
+        workflow_id: Hashable = None,
+        **kwargs
+    ) -> str:
+        """
+        Generate within the adapter's rate limit and circuit breaker,
+        recording the outcome for routing.
+        """
+        breaker = self._breakers.get(name) if name is not None else None
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {name}")
+        try:
+            with self.router.request(name) as timer:
+                async with self._limited(name, workflow_id):
+                    timer.start()
+                    result = await adapter.generate(prompt, **kwargs)
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            if breaker is not None:
+                breaker.release()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
 
+    async def _generate_stream(
+        self,
+        name: str,
+        prompt: str,
+        workflow_id: Hashable = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Streaming counterpart of _generate."""
+        breaker = self._breakers[name]
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {name}")
         try:
-            return await selected_adapter.generate(prompt, **kwargs)
-        except Exception as e:
-            logger.error(f"Generation error with adapter: {e}")
-            # If the selected adapter fails, try fallback
-            if selected_adapter is not self._default_adapter:
-                logger.info("Attempting generation with fallback adapter")
-                return await self._default_adapter.generate(prompt, **kwargs)
+            with self.router.request(name) as timer:
+                async with self._limited(name, workflow_id):
+                    timer.start()
+                    async for chunk in self._adapters[name].generate_stream(prompt, **kwargs):
+                        yield chunk
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
             raise
+        breaker.record_success()
+
+    def _hedge_target(self, primary: str) -> Optional[str]:
+        """The best available adapter other than the primary."""
+        ranked = self.router.rank(
+            name for name in self._adapters
+            if name != primary and self.is_adapter_available(name)
+        )
+        return ranked[0] if ranked else None
+
+    async def _generate_hedged(
+        self,
+        name: str,
+        adapter: LLMAdapter,
+        prompt: str,
+        workflow_id: Hashable = None,
+        **kwargs
+    ) -> str:
+        """
+        Generate on the primary adapter, hedging to a second one once the
+        primary runs past its latency percentile. The first successful
+        answer wins; the other request is cancelled.
+        """
+        backup = self._hedge_target(name)
+        delay = self.hedging.delay(self.router, name) if backup is not None else None
+        primary = asyncio.ensure_future(
+            self._generate(name, adapter, prompt, workflow_id, **kwargs)
+        )
+        pending = {primary}
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not self.hedging.try_spend():
+                return await primary
+
+            logger.info(f"Hedging {name} after {delay:.2f}s with {backup}")
+            hedge = asyncio.ensure_future(
+                self._generate(backup, self._adapters[backup], prompt, workflow_id, **kwargs)
+            )
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedging.record_win(task is hedge)
+                        return task.result()
+            return primary.result()  # both failed; raise the primary's error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def dispatch_stream(
+        self,
+        prompt: str,
+        model_name: Optional[str] = None,
+        workflow_id: Hashable = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a generation from the specified model or its fallback chain.
+
+        Retries and fallbacks only happen before the first chunk; a failure
+        mid-stream is raised since the partial text is already out.
+        """
+        if not self._adapters:
+            async for chunk in self._default_adapter.generate_stream(prompt, **kwargs):
+                yield chunk
+            return
+        name, _ = self._select_adapter(model_name)
+        if name is None:
+            raise GenerationError(f"No LLM adapters available for {model_name}")
+
+        failures = []
+        for position, candidate in enumerate(self.fallback_chain(name)):
+            if position:
+                self.fallbacks_used += 1
+                logger.info(f"Falling back from {name} to {candidate}")
+            attempt = 0
+            while True:
+                started = False
+                try:
+                    stream = self._generate_stream(candidate, prompt, workflow_id, **kwargs)
+                    async for chunk in stream:
+                        started = True
+                        yield chunk
+                    return
+                except Exception as e:
+                    logger.error(f"Streaming error with adapter {candidate}: {e}")
+                    if started:
+                        raise
+                    if attempt >= self.retry.max_retries or not is_retryable(e):
+                        failures.append((candidate, e))
+                        break
+                    await self.retry.wait(attempt, e)
+                    attempt += 1
+        self.exhausted += 1
+        raise GenerationError(
+            f"All adapters failed for {model_name or name}: "
+            + "; ".join(f"{candidate}: {error}" for candidate, error in failures),
+            failures
+        )
 
     def get_available_models(self) -> Dict[str, bool]:
         """Get a dictionary of registered models and their availability status."""
         return {
-            name: adapter.is_available()
+            name: self.health.is_available(name, adapter)
             for name, adapter in self._adapters.items()
         }
 
+    def get_http_stats(self) -> Dict[str, Any]:
+        """Get connection statistics for the shared HTTP client pool."""
+        return self.http_pool.stats()
+
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get queue depth and wait-time metrics per adapter."""
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Get the latency, error and load figures routing decisions are based on."""
+        return self.router.stats()
+
+    def get_hedging_stats(self) -> Dict[str, Any]:
+        """Get how often requests were hedged and how often the hedge won."""
+        return self.hedging.stats()
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """Get retry and fallback counts and the state of each circuit breaker."""
+        return {
+            "retries": self.retry.retries,
+            "fallbacks_used": self.fallbacks_used,
+            "exhausted": self.exhausted,
+            "breakers": {name: breaker.stats() for name, breaker in self._breakers.items()}
+        }
+
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """Get how many requests shared an identical in-flight request."""
+        return self.single_flight.stats()
+
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """Get response cache hit rates and sizes."""
+        return self.response_cache.stats() if self.response_cache is not None else {}
+
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
+        """Get near-duplicate cache hit and false-hit rates."""
+        return self.semantic_cache.stats() if self.semantic_cache is not None else {}
+
+    def get_health(self) -> Dict[str, Dict[str, Any]]:
+        """Get the cached probe results for registered adapters."""
+        return self.health.snapshot()
+
+    def start_health_checks(self) -> None:
+        """Start probing registered adapters in the background."""
+        self.health.start()
+
+    async def aclose(self) -> None:
+        """Stop health probing, cancel queued requests, close the HTTP pool and response cache."""
+        for limiter in self._limiters.values():
+            await limiter.close()
+        await self.health.stop()
+        await self.http_pool.aclose()
+        if self.response_cache is not None:
+            await self.response_cache.close()
+
     def reset(self) -> None:
         """Clear all registered adapters except fallback."""
         self._adapters.clear()
+        self._limiters.clear()
+        self._breakers.clear()
+        self._fallbacks.clear()
+        self.router.clear()
+        self.health.clear()
         logger.info("All adapters cleared")
@@ -1,19 +1,23 @@
 """
 Engine - Core collaboration engine implementation.
 """
-from typing import Dict, Optional, Any
-from uuid import UUID
+from typing import Awaitable, Callable, Dict, Optional, Any
+from uuid import UUID, uuid4
 from .models import CacheEntry, WorkflowConfig
 from .dispatcher import LLMDispatcher
+from .streaming import DeltaCoalescer
 
 class CollaborationEngine:
     """
     Core engine for managing the collaboration workflow.
     """
-    def __init__(self, cache_pool: Any):  # Using Any to avoid circular import
+    def __init__(self, cache_pool: Any, dispatcher: Optional[LLMDispatcher] = None):
+        # cache_pool is typed Any to avoid a circular import
         self.cache = cache_pool
-        self.dispatcher = LLMDispatcher()
+        self.dispatcher = dispatcher or LLMDispatcher()
         self._active_workflows: Dict[UUID, WorkflowConfig] = {}
+        # Workflow id -> latest entry; each step continues from and replaces it
+        self._heads: Dict[UUID, UUID] = {}
 
     async def start_workflow(self, config: WorkflowConfig, initial_content: str) -> UUID:
         """Initialize a new collaboration workflow."""
@@ -25,26 +29,61 @@ class CollaborationEngine:
         )
         entry_id = await self.cache.add_entry(initial_entry)
         self._active_workflows[entry_id] = config
+        self._heads[entry_id] = entry_id
         return entry_id
 
-    async def execute_step(self, current_id: UUID, model_name: Optional[str] = None) -> CacheEntry:
-        """Execute the next collaboration step."""
+    def head(self, workflow_id: UUID) -> UUID:
+        """Latest entry of a workflow, which the next step continues from."""
+        return self._heads.get(workflow_id, workflow_id)
+
+    async def execute_step(
+        self,
+        current_id: UUID,
+        model_name: Optional[str] = None,
+        on_delta: Optional[Callable[[UUID, str], Awaitable[None]]] = None
+    ) -> CacheEntry:
+        """
+        Execute the next collaboration step.
+
+        current_id is the workflow id returned by start_workflow. The step
+        sees the history leading to the workflow's latest entry and is
+        stored as that entry's child.
+
+        With on_delta the response is streamed: on_delta(entry_id, text) is
+        awaited with coalesced chunks as they arrive, and the entry is
+        persisted once the generation completes.
+        """
         if current_id not in self._active_workflows:
             raise ValueError(f"No active workflow found for {current_id}")
 
         config = self._active_workflows[current_id]
-        context = self.cache.get_context(current_id, config)
+        head_id = self.head(current_id)
+        context = await self.cache.get_context(head_id, config, model_name or "gpt-4")
         
         # Generate response
         prompt = self._build_step_prompt(context, config)
-        response = await self.dispatcher.dispatch(prompt, model_name or "gpt-4")
+        entry_id = uuid4()
+        if on_delta is None:
+            response = await self.dispatcher.dispatch(
+                prompt,
+                model_name or "gpt-4",
+                workflow_id=current_id,
+                hedge=config.hedging,
+                dedupe=config.dedupe_requests,
+                semantic=config.semantic_cache
+            )
+        else:
+            response = await self._stream_response(
+                entry_id, prompt, model_name or "gpt-4", on_delta, workflow_id=current_id
+            )
         
         if not response:
             raise RuntimeError("Failed to generate response")
         
         # Create new cache entry
         new_entry = CacheEntry(
-            parent_id=current_id,
+            entry_id=entry_id,
+            parent_id=head_id,
             content=response,
             prompt=prompt,
             author=f"AI:{model_name or 'default'}",
@@ -55,8 +94,29 @@ class CollaborationEngine:
         )
         
         await self.cache.add_entry(new_entry)
+        self._heads[current_id] = entry_id
         return new_entry
 
+    async def _stream_response(
+        self,
+        entry_id: UUID,
+        prompt: str,
+        model_name: str,
+        on_delta: Callable[[UUID, str], Awaitable[None]],
+        workflow_id: Optional[UUID] = None
+    ) -> str:
+        """Stream a generation to on_delta in coalesced batches and return the full text."""
+        chunks = []
+        coalescer = DeltaCoalescer(lambda text: on_delta(entry_id, text))
+        try:
+            stream = self.dispatcher.dispatch_stream(prompt, model_name, workflow_id=workflow_id)
+            async for chunk in stream:
+                chunks.append(chunk)
+                await coalescer.push(chunk)
+        finally:
+            await coalescer.aclose()
+        return "".join(chunks)
+
     def _build_step_prompt(self, context: str, config: WorkflowConfig) -> str:
         """Build the prompt for the current step."""
         if config.mode == "relay":
@@ -111,7 +111,7 @@ async def debate_example():
         
         # Optional: Create branch for alternative argument
         if round == 1:
-            branch_id = collab.create_branch(
+            branch_id = await collab.create_branch(
                 pro.entry_id,
                 "Explore alternative perspective on privacy implications"
             )
@@ -0,0 +1,159 @@
+"""
+Background health probing for LLM adapters.
+
+Adapters are probed asynchronously on an interval with jitter and the result
+is cached with a TTL, so dispatching only reads in-memory state. A stale or
+missing result is treated as "unknown" and the adapter's own last known
+availability is used instead.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from .config.defaults import HEALTH_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+class HealthStatus:
+    """Result of the latest probe of one adapter."""
+    __slots__ = ("healthy", "checked_at", "latency", "error")
+
+    def __init__(
+        self,
+        healthy: bool,
+        checked_at: float,
+        latency: float,
+        error: Optional[str] = None
+    ):
+        self.healthy = healthy
+        self.checked_at = checked_at
+        self.latency = latency
+        self.error = error
+
+class HealthProber:
+    """Probe registered adapters in the background and cache their health."""
+
+    def __init__(
+        self,
+        interval: float = HEALTH_DEFAULTS["interval"],
+        jitter: float = HEALTH_DEFAULTS["jitter"],
+        ttl: float = HEALTH_DEFAULTS["ttl"],
+        probe_timeout: float = HEALTH_DEFAULTS["probe_timeout"],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+        self._adapters: Dict[str, Any] = {}
+        self._status: Dict[str, HealthStatus] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self.probes = 0
+
+    def track(self, name: str, adapter: Any) -> None:
+        """Start tracking an adapter and probe it soon if a loop is running."""
+        self._adapters[name] = adapter
+        self._status.pop(name, None)
+        try:
+            task = asyncio.get_running_loop().create_task(self.probe(name))
+        except RuntimeError:
+            return  # no loop yet; the first probe round picks it up
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def untrack(self, name: str) -> None:
+        """Stop tracking an adapter."""
+        self._adapters.pop(name, None)
+        self._status.pop(name, None)
+
+    def clear(self) -> None:
+        """Stop tracking every adapter."""
+        self._adapters.clear()
+        self._status.clear()
+
+    def status(self, name: str) -> Optional[bool]:
+        """Get the cached health of an adapter, or None if unknown or expired."""
+        status = self._status.get(name)
+        if status is None or self._clock() - status.checked_at > self.ttl:
+            return None
+        return status.healthy
+
+    def is_available(self, name: str, adapter: Any) -> bool:
+        """Check availability without I/O, preferring a fresh probe result."""
+        healthy = self.status(name)
+        return adapter.is_available() if healthy is None else healthy
+
+    async def probe(self, name: str) -> bool:
+        """Probe one adapter now and cache the result."""
+        adapter = self._adapters.get(name)
+        if adapter is None:
+            return False
+        started = self._clock()
+        error = None
+        try:
+            healthy = bool(await asyncio.wait_for(adapter.probe(), self.probe_timeout))
+        except asyncio.TimeoutError:
+            healthy, error = False, f"probe timed out after {self.probe_timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+        finished = self._clock()
+        self.probes += 1
+        previous = self._status.get(name)
+        if name in self._adapters:
+            self._status[name] = HealthStatus(healthy, finished, finished - started, error)
+        if previous is None or previous.healthy != healthy:
+            state = "healthy" if healthy else "unhealthy"
+            logger.info(f"Adapter {name} is {state}" + (f": {error}" if error else ""))
+        return healthy
+
+    async def probe_all(self) -> Dict[str, bool]:
+        """Probe every tracked adapter concurrently."""
+        names = list(self._adapters)
+        results = await asyncio.gather(*(self.probe(name) for name in names))
+        return dict(zip(names, results))
+
+    def next_delay(self) -> float:
+        """Interval until the next round, spread by jitter to avoid bursts."""
+        return max(0.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:  # keep probing; one bad round must not stop the loop
+                logger.error(f"Health probe round failed: {e}")
+            await asyncio.sleep(self.next_delay())
+
+    def start(self) -> None:
+        """Start the background probe loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Health prober started (interval {self.interval}s, ttl {self.ttl}s)")
+
+    async def stop(self) -> None:
+        """Stop the probe loop and any in-flight probes."""
+        tasks = list(self._pending)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Cached health of every tracked adapter for reporting."""
+        now = self._clock()
+        report = {}
+        for name in self._adapters:
+            status = self._status.get(name)
+            report[name] = {
+                "healthy": self.status(name),
+                "age": None if status is None else round(now - status.checked_at, 3),
+                "latency": None if status is None else round(status.latency, 4),
+                "error": None if status is None else status.error
+            }
+        return report
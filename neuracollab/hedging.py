@@ -0,0 +1,76 @@
+"""
+Hedged requests for cutting tail latency.
+
+When a workflow opts in, the dispatcher starts a request on the primary
+adapter and, if no answer has arrived once the primary's recent latency
+percentile has passed, sends the same prompt to the next-best adapter.
+The first answer wins and the other request is cancelled. Duplicated
+requests are paid for out of a budget that grows by max_ratio per
+eligible request, capping the extra spend.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from .config.defaults import HEDGING_DEFAULTS
+from .routing import Router
+
+logger = logging.getLogger(__name__)
+
+class HedgePolicy:
+    """Decide when to hedge and enforce the duplicated-spend cap."""
+
+    def __init__(
+        self,
+        percentile: float = HEDGING_DEFAULTS["percentile"],
+        min_samples: int = HEDGING_DEFAULTS["min_samples"],
+        min_delay: float = HEDGING_DEFAULTS["min_delay"],
+        max_ratio: float = HEDGING_DEFAULTS["max_ratio"],
+        burst: float = HEDGING_DEFAULTS["burst"]
+    ):
+        if not 0 < percentile <= 1:
+            raise ValueError("percentile must be in (0, 1]")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.budget = burst
+        self.eligible = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+
+    def delay(self, router: Router, name: str) -> Optional[float]:
+        """
+        Seconds to wait for the primary before hedging, or None if its
+        latency distribution is not known yet. Each call counts as one
+        eligible request and earns max_ratio of a hedge.
+        """
+        self.eligible += 1
+        self.budget = min(self.burst, self.budget + self.max_ratio)
+        threshold = router.percentile(name, self.percentile, self.min_samples)
+        return None if threshold is None else max(self.min_delay, threshold)
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget; False once the cap is reached."""
+        if self.budget < 1:
+            self.over_budget += 1
+            return False
+        self.budget -= 1
+        self.hedged += 1
+        return True
+
+    def record_win(self, hedge_won: bool) -> None:
+        if hedge_won:
+            self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "percentile": self.percentile,
+            "eligible": self.eligible,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "over_budget": self.over_budget,
+            "hedge_ratio": self.hedged / self.eligible if self.eligible else 0.0,
+            "budget": self.budget
+        }
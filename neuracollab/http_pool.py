@@ -0,0 +1,109 @@
+"""
+Shared HTTP client pool for LLM adapters.
+
+One httpx.AsyncClient is shared by every adapter registered with a
+dispatcher, so requests to the same host reuse kept-alive connections
+instead of opening a new TCP (and TLS) connection per generation.
+"""
+import logging
+from typing import Any, Dict
+
+from .config.defaults import API_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+class HTTPClientPool:
+    """Lifecycle-managed httpx.AsyncClient with connection accounting."""
+
+    def __init__(
+        self,
+        max_connections: int = API_DEFAULTS["max_connections"],
+        max_keepalive_connections: int = API_DEFAULTS["max_keepalive_connections"],
+        keepalive_expiry: float = API_DEFAULTS["keepalive_expiry"],
+        timeout: float = API_DEFAULTS["timeout"]
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._client = None
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.requests = 0
+
+    @property
+    def client(self):
+        """Get the shared client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            import httpx
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.timeout),
+                event_hooks={"request": [self._on_request]}
+            )
+            logger.info(f"HTTP client pool started (max {self.max_connections} connections)")
+        return self._client
+
+    async def _on_request(self, request) -> None:
+        """Attach the connection trace to every outgoing request."""
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name in (
+            "connection.connect_tcp.complete",
+            "connection.connect_unix_socket.complete"
+        ):
+            self.connections_opened += 1
+            self._count_close(info["return_value"])
+
+    def _count_close(self, stream) -> None:
+        """
+        Count the close of a newly opened network stream.
+
+        httpcore traces connection closes without a request, so the close
+        event never reaches a request's trace hook; the stream handed to the
+        connect event is wrapped instead.
+        """
+        close = stream.aclose
+        closed = False
+
+        async def aclose() -> None:
+            nonlocal closed
+            if not closed:
+                closed = True
+                self.connections_closed += 1
+            await close()
+
+        stream.aclose = aclose
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection statistics for health reporting."""
+        return {
+            "active": self._client is not None and not self._client.is_closed,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_closed": self.connections_closed,
+            "connections_open": self.connections_opened - self.connections_closed,
+            # Requests sent on a kept-alive connection instead of a new one
+            "connections_reused": max(0, self.requests - self.connections_opened),
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "timeout": self.timeout
+        }
+
+    async def aclose(self) -> None:
+        """Close the client and every pooled connection."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("HTTP client pool closed")
+
+    async def __aenter__(self) -> "HTTPClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -8,6 +8,8 @@ def init_database(db_path: str = "neuracollab.db"):
     """Initialize SQLite database with required tables."""
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
+    # Only takes effect on a new file; existing ones switch on their next VACUUM
+    cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
 
     # Create cache entries table
     cur.execute("""
@@ -19,6 +21,10 @@ def init_database(db_path: str = "neuracollab.db"):
         author TEXT NOT NULL,
         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
         metadata JSON,
+        path TEXT,
+        depth INTEGER,
+        codec TEXT,          -- NULL: plain text; otherwise content/prompt are compressed BLOBs
+        dict_id INTEGER,
         FOREIGN KEY (parent_id) REFERENCES cache_entries(entry_id)
     )
     """)
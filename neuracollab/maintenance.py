@@ -0,0 +1,192 @@
+"""
+Background maintenance for the cache pool.
+
+Every cleanup_interval seconds the scheduler compresses cold hot-tier
+entries, trains a compression dictionary once enough entries are stored
+and rewrites older rows with it, prunes stored entries whose parent no
+longer exists, returns free pages to the filesystem with incremental
+vacuum and refreshes SQLite's planner statistics. Work is done in slices sized to take about
+slice_seconds each, and a slice only starts once the pool has seen no
+foreground reads or writes for quiet_period, so maintenance does not add
+to step latency.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .cache_pool import NeuralCachePool
+from .config.defaults import CACHE_DEFAULTS, MAINTENANCE_DEFAULTS, STORAGE_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+class MaintenanceScheduler:
+    """Runs cache maintenance in short slices while foreground traffic is quiet."""
+
+    def __init__(
+        self,
+        cache_pool: NeuralCachePool,
+        interval: float = CACHE_DEFAULTS["cleanup_interval"],
+        slice_seconds: float = MAINTENANCE_DEFAULTS["slice_seconds"],
+        quiet_period: float = MAINTENANCE_DEFAULTS["quiet_period"],
+        max_deferral: float = MAINTENANCE_DEFAULTS["max_deferral"],
+        busy: Optional[Callable[[], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ):
+        self.cache_pool = cache_pool
+        self.interval = interval
+        self.slice_seconds = slice_seconds
+        self.quiet_period = quiet_period
+        self.max_deferral = max_deferral
+        self._busy = busy  # extra foreground signal, e.g. requests in flight at the dispatcher
+        self._clock = clock
+        self._sleep = sleep
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Dict[str, int] = {}
+        self.runs = 0
+        self.slices = 0
+        self.deferrals = 0
+        self.totals: Dict[str, int] = {
+            "compressed": 0, "recompressed": 0, "pruned": 0, "pages_freed": 0
+        }
+        # Rewriting rows for a new (codec, dict_id) is one pass over the table by rowid
+        self._recompress_target: Optional[tuple] = None
+        self._recompress_cursor = 0
+        self._recompressed_for: Optional[tuple] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        """Start the periodic loop; must be called from a running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await self._sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Cache maintenance failed: {e}")
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Run every maintenance task to completion, a slice at a time."""
+        started = self._clock()
+        pool = self.cache_pool
+        storage = pool.storage
+        keep = int(len(pool.entries) * MAINTENANCE_DEFAULTS["hot_fraction"])
+        cutoff = datetime.now() - timedelta(seconds=MAINTENANCE_DEFAULTS["orphan_grace"])
+
+        async def compress(batch: int) -> int:
+            before = pool.hot.compression_candidates()
+            self.totals["compressed"] += pool.hot.compress(target_bytes=0, keep=keep, limit=batch)
+            # Entries too small to be worth compressing count as work done too
+            return before - pool.hot.compression_candidates()
+
+        async def recompress(batch: int) -> int:
+            examined, cursor = await storage.recompress(batch, self._recompress_cursor)
+            self._recompress_cursor = cursor
+            self.totals["recompressed"] += examined
+            return examined
+
+        async def prune(batch: int) -> int:
+            pruned = await pool.prune_orphans(cutoff, batch)
+            self.totals["pruned"] += pruned
+            return pruned
+
+        async def vacuum(batch: int) -> int:
+            freed = await storage.incremental_vacuum(batch)
+            self.totals["pages_freed"] += freed
+            return freed
+
+        async def optimize(batch: int) -> int:
+            await storage.optimize(MAINTENANCE_DEFAULTS["analysis_limit"])
+            return 0
+
+        report = {}
+        if pool.compression_enabled:
+            report["compressed"] = await self._sliced("compress", compress)
+        if storage.sync.compression:
+            if storage.sync.dict_id is None:
+                await self._wait_for_quiet()
+                min_rows = STORAGE_DEFAULTS["dictionary_min_rows"]
+                report["dictionary"] = await storage.train_dictionary(min_rows)
+            target = (storage.sync.compression, storage.sync.dict_id)
+            if target != self._recompressed_for:
+                if target != self._recompress_target:
+                    self._recompress_target, self._recompress_cursor = target, 0
+                report["recompressed"] = await self._sliced("recompress", recompress)
+                self._recompressed_for = target
+        report["pruned"] = await self._sliced("prune", prune)
+        report["pages_freed"] = await self._sliced("vacuum", vacuum)
+        await self._sliced("optimize", optimize)
+
+        self.runs += 1
+        report["seconds"] = self._clock() - started
+        self.last_run = report
+        logger.info(f"Cache maintenance finished: {report}")
+        return report
+
+    async def _sliced(self, name: str, step: Callable[[int], Awaitable[int]]) -> int:
+        """
+        Call step(batch) between bursts of foreground traffic until it has
+        nothing left to do, resizing the batch to fit slice_seconds.
+        """
+        batch = self._batches.get(name, MAINTENANCE_DEFAULTS["initial_batch"])
+        total = 0
+        while True:
+            await self._wait_for_quiet()
+            started = self._clock()
+            done = await step(batch)
+            elapsed = self._clock() - started
+            self.slices += 1
+            total += done
+            if elapsed > self.slice_seconds:
+                batch = max(1, batch // 2)
+            elif elapsed < self.slice_seconds / 4:
+                batch = min(MAINTENANCE_DEFAULTS["max_batch"], batch * 2)
+            self._batches[name] = batch
+            if not done:
+                return total
+
+    def _foreground_busy(self) -> bool:
+        return self._busy is not None and self._busy()
+
+    async def _wait_for_quiet(self) -> None:
+        """
+        Wait until the pool has been idle for quiet_period. Under sustained
+        load, give up after max_deferral and just yield to the event loop,
+        so slices still run in between requests.
+        """
+        deadline = self._clock() + self.max_deferral
+        activity = self.cache_pool.activity()
+        while self._clock() < deadline:
+            await self._sleep(self.quiet_period)
+            current = self.cache_pool.activity()
+            if current == activity and not self._foreground_busy():
+                return
+            activity = current
+            self.deferrals += 1
+        await self._sleep(0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "runs": self.runs,
+            "slices": self.slices,
+            "deferrals": self.deferrals,
+            "batches": dict(self._batches),
+            "totals": dict(self.totals),
+            "last_run": self.last_run
+        }
@@ -0,0 +1,77 @@
+"""
+One-time migration tools for existing NeuraCollab databases.
+
+Usage:
+    python -m neuracollab.migrate backfill-ancestry [--db neuracollab.db]
+    python -m neuracollab.migrate compress [--db neuracollab.db] [--codec zlib|zstd|none]
+                                           [--no-dictionary]
+"""
+import argparse
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from .storage import SQLiteConnector
+
+def backfill_ancestry(db_path: str) -> int:
+    """Add and populate the ancestry path index of an existing database."""
+    connector = SQLiteConnector(db_path, pool_size=0)
+    try:
+        # Opening the connector migrates the schema and backfills new columns
+        return connector.backfilled
+    finally:
+        connector.close()
+
+def compress_database(
+    db_path: str,
+    codec: Optional[str] = "zlib",
+    dictionary: bool = True,
+    batch: int = 1000
+) -> Dict[str, Any]:
+    """
+    Rewrite every stored entry with codec (None stores plain text), training
+    a fresh dictionary first unless disabled, then vacuum the file.
+    """
+    size_before = os.path.getsize(db_path)
+    connector = SQLiteConnector(db_path, pool_size=0, compression=codec)
+    try:
+        if codec and dictionary:
+            connector.train_dictionary()
+        rows, cursor = 0, 0
+        while True:
+            examined, cursor = connector.recompress(batch, cursor)
+            if not examined:
+                break
+            rows += examined
+        connector.vacuum()
+        stats = connector.compression_stats()
+    finally:
+        connector.close()
+    stats.update(rows=rows, bytes_before=size_before, bytes_after=os.path.getsize(db_path))
+    return stats
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate a NeuraCollab database")
+    parser.add_argument("command", choices=["backfill-ancestry", "compress"])
+    parser.add_argument("--db", default="neuracollab.db", help="Path to the SQLite database")
+    parser.add_argument("--codec", default="zlib", choices=["zlib", "zstd", "none"],
+                        help="Codec for entry text (compress only; none decompresses)")
+    parser.add_argument("--no-dictionary", action="store_true",
+                        help="Do not train a compression dictionary (compress only)")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill-ancestry":
+        updated = backfill_ancestry(args.db)
+        print(f"✓ Ancestry index up to date for {args.db} ({updated} rows backfilled)")
+    elif args.command == "compress":
+        codec = None if args.codec == "none" else args.codec
+        stats = compress_database(args.db, codec, dictionary=not args.no_dictionary)
+        ratio = stats["bytes_after"] / stats["bytes_before"] if stats["bytes_before"] else 1.0
+        print(
+            f"✓ {stats['rows']} entries in {args.db} stored as {args.codec} "
+            f"({stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes, {ratio:.0%})"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,9 @@ class WorkflowConfig(BaseModel):
     }
     roles: Optional[Dict[str, Dict[str, Any]]] = None
     model_settings: Optional[Dict[str, Dict[str, Any]]] = None
+    hedging: bool = False  # duplicate slow steps to a second model, first answer wins
+    dedupe_requests: bool = True  # share identical in-flight prompts; False keeps samples apart
+    semantic_cache: bool = False  # reuse answers to near-duplicate prompts
 
 class WorkflowStep(BaseModel):
     """Configuration for a single step in the workflow."""
@@ -56,3 +59,10 @@ class ModelConfig(BaseModel):
     api_key: Optional[str] = None
     parameters: Dict[str, Any] = Field(default_factory=dict)
     fallback_models: list[str] = Field(default_factory=list)
+
+class CacheSettings(BaseModel):
+    """Settings for the cache pool's in-memory hot tier."""
+    max_size_mb: float = Field(gt=0)
+    compression_enabled: bool = True
+    compression_threshold: float = Field(default=0.8, ge=0, le=1)
+    eviction_policy: Optional[str] = None  # "lru", "lfu" or "size"; unchanged if omitted
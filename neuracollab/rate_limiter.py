@@ -0,0 +1,185 @@
+"""
+Request rate limiting and concurrency control for LLM adapters.
+
+Each adapter registered with the dispatcher gets a RateLimiter combining a
+token bucket (requests per minute with a burst allowance) and a concurrency
+cap. Requests that cannot start at once are queued per workflow and granted
+round-robin, so one busy workflow cannot starve the others.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional
+
+from .config.defaults import API_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+class RateLimiter:
+    """
+    Admit requests to one adapter within its rate limit and concurrency cap.
+
+    Waiting requests are queued by key (the workflow id) and the keys are
+    served round-robin. The clock and sleep functions can be replaced to
+    drive the limiter from a fake clock in tests.
+    """
+
+    def __init__(
+        self,
+        rate_limit: Optional[float] = API_DEFAULTS["rate_limit"],
+        max_concurrency: int = API_DEFAULTS["max_concurrency"],
+        burst: Optional[int] = API_DEFAULTS["rate_limit_burst"],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.rate_limit = rate_limit
+        self.max_concurrency = max_concurrency
+        self.bucket = None
+        if rate_limit:
+            capacity = max(1, min(burst or 1, rate_limit))
+            self.bucket = TokenBucket(rate_limit / 60.0, capacity, clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._released: Optional[asyncio.Event] = None  # created on the running loop
+        self._pump: Optional[asyncio.Task] = None
+        self.active = 0
+        self.granted = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _can_start(self) -> bool:
+        if self.active >= self.max_concurrency:
+            return False
+        return self.bucket is None or self.bucket.delay() == 0
+
+    def _grant(self) -> None:
+        if self.bucket is not None:
+            self.bucket.take()
+        self.active += 1
+        self.granted += 1
+
+    async def acquire(self, key: Hashable = None) -> None:
+        """Wait for a request slot; pair every call with release()."""
+        if not self._queues and self._can_start():
+            self._grant()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(future)
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_queue())
+        started = self._clock()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just as the caller gave up
+            raise
+        waited = self._clock() - started
+        self.throttled += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def release(self) -> None:
+        """Free a slot taken by acquire()."""
+        self.active -= 1
+        if self._released is not None:
+            self._released.set()
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable = None) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the block."""
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """Pop the next live waiter, rotating between keys."""
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not future.cancelled():
+                return future
+        return None
+
+    async def _run_queue(self) -> None:
+        if self._released is None:
+            self._released = asyncio.Event()
+        while self._queues:
+            if self.active >= self.max_concurrency:
+                self._released.clear()
+                await self._released.wait()
+                continue
+            delay = self.bucket.delay() if self.bucket is not None else 0.0
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+            future = self._next_waiter()
+            if future is not None:
+                self._grant()
+                future.set_result(None)
+
+    def queue_depth(self) -> int:
+        return sum(
+            1 for queue in self._queues.values() for future in queue if not future.cancelled()
+        )
+
+    async def close(self) -> None:
+        """Stop granting and cancel queued requests."""
+        if self._pump is not None:
+            self._pump.cancel()
+            await asyncio.gather(self._pump, return_exceptions=True)
+            self._pump = None
+        for queue in self._queues.values():
+            for future in queue:
+                future.cancel()
+        self._queues.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_limit": self.rate_limit,
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queue_depth(),
+            "queued_workflows": len(self._queues),
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "wait_avg": self.wait_total / self.throttled if self.throttled else 0.0,
+            "wait_max": self.wait_max
+        }
@@ -22,7 +22,10 @@ def get_missing_dependencies() -> Dict[str, List[str]]:
         "ollama": [],
         "compression": [],
         "database": [],
-        "web": []
+        "web": [],
+        "binary_frames": [],
+        "semantic_cache": [],
+        "storage_zstd": []
     }
 
     # OpenAI features
@@ -55,6 +58,20 @@ def get_missing_dependencies() -> Dict[str, List[str]]:
     if not check_dependency("websockets"):
         missing["web"].append("websockets")
 
+    # Binary WebSocket frames
+    if not check_dependency("msgpack"):
+        missing["binary_frames"].append("msgpack")
+    if not check_dependency("cbor2"):
+        missing["binary_frames"].append("cbor2")
+
+    # Semantic prompt cache
+    if not check_dependency("numpy"):
+        missing["semantic_cache"].append("numpy")
+
+    # zstd compression of stored entries
+    if not check_dependency("zstandard"):
+        missing["storage_zstd"].append("zstandard")
+
     # Remove empty categories
     return {k: v for k, v in missing.items() if v}
 
@@ -65,7 +82,10 @@ def get_install_command(feature: str) -> Optional[str]:
         "ollama": "pip install httpx>=0.24.0 requests>=2.31.0",
         "compression": "pip install nltk>=3.8.0 numpy>=1.24.0",
         "database": "pip install aiosqlite>=0.19.0 sqlalchemy>=2.0.0",
-        "web": "pip install fastapi>=0.100.0 uvicorn[standard]>=0.20.0 websockets>=11.0.0"
+        "web": "pip install fastapi>=0.100.0 uvicorn[standard]>=0.20.0 websockets>=11.0.0",
+        "binary_frames": "pip install msgpack>=1.0.0 cbor2>=5.4.0",
+        "semantic_cache": "pip install numpy>=1.24.0",
+        "storage_zstd": "pip install zstandard>=0.20.0"
     }
     return commands.get(feature)
 
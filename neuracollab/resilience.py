@@ -0,0 +1,159 @@
+"""
+Retry, circuit breaker and fallback policies for LLM adapters.
+
+Transient failures (rate limits, 5xx responses, timeouts, dropped
+connections) are retried with exponential backoff and full jitter. Each
+adapter has a circuit breaker: after repeated failures it opens and
+requests skip the adapter until a recovery period has passed, when a
+single trial request is let through (half-open). When an adapter gives
+up, the dispatcher moves along its fallback chain, and raises
+GenerationError once the chain is exhausted instead of inventing a
+response.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config.defaults import API_DEFAULTS, RESILIENCE_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+class GenerationError(RuntimeError):
+    """Every adapter in a request's fallback chain failed."""
+
+    def __init__(self, message: str, failures: Optional[List[Tuple[str, BaseException]]] = None):
+        super().__init__(message)
+        self.failures = failures or []
+
+class CircuitOpenError(RuntimeError):
+    """An adapter's circuit breaker is refusing requests."""
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an openai or httpx error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failure is likely transient."""
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    # openai.APIConnectionError/APITimeoutError and httpx.TransportError
+    return any(
+        cls.__name__ in ("APIConnectionError", "APITimeoutError", "TransportError")
+        for cls in type(error).__mro__
+    )
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from a Retry-After header."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """Retries with exponential backoff and full jitter."""
+
+    def __init__(
+        self,
+        max_retries: int = API_DEFAULTS["max_retries"],
+        base_delay: float = RESILIENCE_DEFAULTS["retry_base_delay"],
+        max_delay: float = RESILIENCE_DEFAULTS["retry_max_delay"],
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        rng: Callable[[], float] = random.random
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._rng = rng
+        self.retries = 0
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Delay before retry number attempt + 1; honours Retry-After up to max_delay."""
+        requested = retry_after(error) if error is not None else None
+        if requested is not None:
+            return min(self.max_delay, requested)
+        return self._rng() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+    async def wait(self, attempt: int, error: Optional[BaseException] = None) -> None:
+        self.retries += 1
+        await self._sleep(self.backoff(attempt, error))
+
+class CircuitBreaker:
+    """Stop calling an adapter that keeps failing, then probe it with one trial request."""
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = RESILIENCE_DEFAULTS["failure_threshold"],
+        recovery_timeout: float = RESILIENCE_DEFAULTS["recovery_timeout"],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.times_opened = 0
+        self._trial = False
+
+    def is_open(self) -> bool:
+        """Whether requests are currently being refused, without taking a trial slot."""
+        if self.state == self.OPEN:
+            return self._clock() - self.opened_at < self.recovery_timeout
+        return self.state == self.HALF_OPEN and self._trial
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; half-open admits one trial at a time."""
+        if self.state == self.OPEN:
+            if self._clock() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trial = False
+        if self.state == self.HALF_OPEN:
+            if self._trial:
+                self.rejected += 1
+                return False
+            self._trial = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def release(self) -> None:
+        """End a trial that neither succeeded nor failed (e.g. it was cancelled)."""
+        self._trial = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened
+        }
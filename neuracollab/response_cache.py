@@ -0,0 +1,266 @@
+"""
+Exact-match cache of LLM responses.
+
+Responses are keyed on a hash of the normalized (model, prompt, parameters)
+and kept in an in-memory LRU in front of an optional SQLite table, so a
+re-run of a known state is answered without calling the provider again.
+Entries expire after a TTL and the SQLite tier is held to a size budget by
+evicting the least recently used rows. Only deterministic calls
+(temperature 0) are cached unless a caller asks otherwise.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config.defaults import CACHE_DEFAULTS, MODEL_DEFAULTS, RESPONSE_CACHE_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(prompt: str) -> str:
+    """Ignore line-ending and trailing-whitespace differences."""
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+def cache_key(model_name: Optional[str], prompt: str, params: Dict[str, Any]) -> str:
+    """Stable hex digest of a normalized request."""
+    canonical = json.dumps(
+        [model_name, normalize_prompt(prompt), params],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """In-memory LRU over an optional persistent SQLite tier."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_size_mb: float = CACHE_DEFAULTS["max_size_mb"],
+        memory_bytes: int = RESPONSE_CACHE_DEFAULTS["memory_bytes"],
+        ttl: float = RESPONSE_CACHE_DEFAULTS["ttl"],
+        clock: Callable[[], float] = time.time
+    ):
+        self.db_path = db_path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.memory_bytes = memory_bytes
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (response, expires)
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_size = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # One thread owns the connection, as in the SQLite backplane
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="neuracollab-response-cache"
+        )
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expired = 0
+        self.disk_entries = 0  # as of the last write
+        self.disk_bytes = 0
+
+    @staticmethod
+    def key(model_name: Optional[str], prompt: str, params: Dict[str, Any]) -> str:
+        return cache_key(model_name, prompt, params)
+
+    @staticmethod
+    def cacheable(model_name: Optional[str], params: Dict[str, Any]) -> bool:
+        """Whether a call is deterministic: temperature 0, given or from MODEL_DEFAULTS."""
+        temperature = params.get("temperature")
+        if temperature is None:
+            temperature = MODEL_DEFAULTS.get(model_name or "", {}).get("temperature")
+        return temperature == 0
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    expires REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_access "
+                "ON response_cache(last_access)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_expires "
+                "ON response_cache(expires)"
+            )
+            self.disk_entries, self.disk_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+            ).fetchone()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, response: str, expires: float) -> None:
+        size = len(response.encode("utf-8"))
+        if size > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key)[0].encode("utf-8"))
+        self._memory[key] = (response, expires)
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.encode("utf-8"))
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_size -= len(entry[0].encode("utf-8"))
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT response, expires FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+        return row[0], row[1]
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a response, promoting persistent hits into memory."""
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._forget(key)
+            self.expired += 1
+        if self.db_path is not None:
+            row = await self._run(self._load, key, now)
+            if row is not None:
+                self._remember(key, *row)
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+        self.misses += 1
+        return None
+
+    def _store(
+        self,
+        key: str,
+        model_name: Optional[str],
+        response: str,
+        now: float,
+        expires: float
+    ) -> Tuple[int, int, int]:
+        conn = self._connection()
+        size = len(response.encode("utf-8"))
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache "
+            "(key, model, response, size, created, expires, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, model_name, response, size, now, expires, now)
+        )
+        # The running total only grows between sweeps (replaced rows count twice),
+        # so the budget is never exceeded unnoticed
+        rows, total = self.disk_entries + 1, self.disk_bytes + size
+        if total > self.max_bytes or self.stores % RESPONSE_CACHE_DEFAULTS["sweep_every"] == 0:
+            return self._enforce_budget(now)
+        return 0, rows, total
+
+    def _enforce_budget(self, now: float) -> Tuple[int, int, int]:
+        """
+        Drop expired rows, then least recently used rows over the size
+        budget; returns (evicted, rows left, bytes left).
+        """
+        conn = self._connection()
+        evicted = conn.execute("DELETE FROM response_cache WHERE expires <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            freed = 0
+            keys = []
+            by_age = conn.execute("SELECT key, size FROM response_cache ORDER BY last_access")
+            for key, size in by_age:
+                keys.append(key)
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM response_cache WHERE key = ?", [(key,) for key in keys])
+            evicted += len(keys)
+        rows, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+        ).fetchone()
+        return evicted, rows, size
+
+    async def put(
+        self,
+        key: str,
+        model_name: Optional[str],
+        response: str,
+        ttl: Optional[float] = None
+    ) -> None:
+        """Store a response in both tiers."""
+        now = self._clock()
+        expires = now + (self.ttl if ttl is None else ttl)
+        self._remember(key, response, expires)
+        self.stores += 1
+        if self.db_path is not None:
+            evicted, self.disk_entries, self.disk_bytes = await self._run(
+                self._store, key, model_name, response, now, expires
+            )
+            self.evictions += evicted
+
+    def _clear(self) -> None:
+        self._connection().execute("DELETE FROM response_cache")
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        self._memory_size = 0
+        if self.db_path is not None:
+            await self._run(self._clear)
+            self.disk_entries = self.disk_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": self.disk_entries,
+            "disk_bytes": self.disk_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
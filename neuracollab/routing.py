@@ -0,0 +1,210 @@
+"""
+Latency- and priority-aware routing between LLM adapters.
+
+The router keeps an exponentially weighted moving average (EWMA) of each
+adapter's latency and error rate, and counts its in-flight requests. An
+adapter's cost is its expected latency scaled by its load, error rate and
+configured priority; the dispatcher sends a request to the cheapest
+healthy adapter, keeping the requested model unless it has become much
+slower than the alternatives.
+"""
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .config.defaults import ROUTING_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+class AdapterMetrics:
+    """Smoothed latency and error rate of one adapter."""
+    __slots__ = (
+        "priority", "latency", "error_rate", "in_flight", "requests", "errors", "chosen", "skipped",
+        "samples"
+    )
+
+    def __init__(self, priority: int = 1, window: int = ROUTING_DEFAULTS["latency_window"]):
+        self.priority = priority
+        self.latency: Optional[float] = None
+        self.samples: Deque[float] = deque(maxlen=window)  # recent latencies, for percentiles
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.chosen = 0
+        self.skipped = 0  # requests routed away since this adapter was last used
+
+class RequestTimer:
+    """Times one routed request; start() excludes time spent queueing."""
+
+    def __init__(self, clock: Callable[[], float]):
+        self._clock = clock
+        self.started = clock()
+        self.failed = False
+        self.cancelled = False
+
+    def start(self) -> None:
+        self.started = self._clock()
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+class Router:
+    """Rank adapters by priority, EWMA latency, error rate and in-flight load."""
+
+    def __init__(
+        self,
+        alpha: float = ROUTING_DEFAULTS["ewma_alpha"],
+        default_latency: float = ROUTING_DEFAULTS["default_latency"],
+        error_penalty: float = ROUTING_DEFAULTS["error_penalty"],
+        priority_weight: float = ROUTING_DEFAULTS["priority_weight"],
+        reroute_factor: float = ROUTING_DEFAULTS["reroute_factor"],
+        explore_every: int = ROUTING_DEFAULTS["explore_every"],
+        latency_window: int = ROUTING_DEFAULTS["latency_window"],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.error_penalty = error_penalty
+        self.priority_weight = priority_weight
+        self.reroute_factor = reroute_factor
+        self.explore_every = explore_every
+        self.latency_window = latency_window
+        self._clock = clock
+        self._metrics: Dict[str, AdapterMetrics] = {}
+        self.rerouted = 0
+
+    def track(self, name: str, priority: int = 1) -> None:
+        """Start routing to an adapter; a lower priority number is preferred."""
+        metrics = self._metrics.setdefault(name, AdapterMetrics(priority, self.latency_window))
+        metrics.priority = priority
+
+    def untrack(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    def clear(self) -> None:
+        self._metrics.clear()
+
+    def metrics(self, name: str) -> AdapterMetrics:
+        """Metrics of a tracked adapter; untracked names get unrecorded defaults."""
+        return self._metrics.get(name) or AdapterMetrics()
+
+    def cost(self, name: str) -> float:
+        """Expected cost of sending one more request to an adapter."""
+        m = self.metrics(name)
+        latency = m.latency if m.latency is not None else self.default_latency
+        return (
+            latency
+            * (1 + m.in_flight)
+            * (1 + self.error_penalty * m.error_rate)
+            * (1 + self.priority_weight * (m.priority - 1))
+        )
+
+    def rank(self, names: Iterable[str]) -> List[str]:
+        """Order adapters from cheapest to most expensive; ties keep priority order."""
+        return sorted(names, key=lambda name: (self.cost(name), self.metrics(name).priority))
+
+    def choose(self, candidates: List[str], requested: Optional[str] = None) -> Optional[str]:
+        """
+        Pick the adapter for a request.
+
+        The requested model is kept unless its cost exceeds the best
+        alternative's by more than reroute_factor. A model that has not
+        answered yet, or has been routed around explore_every times, is
+        tried anyway so its estimate can recover.
+        """
+        if not candidates:
+            return None
+        best = self.rank(candidates)[0]
+        choice = best
+        if requested in candidates and requested != best:
+            m = self.metrics(requested)
+            requested_cost, best_cost = self.cost(requested), self.cost(best)
+            if (
+                m.latency is None
+                or requested_cost <= best_cost * self.reroute_factor
+                or m.skipped + 1 >= self.explore_every
+            ):
+                choice = requested
+            else:
+                m.skipped += 1
+                self.rerouted += 1
+                logger.info(
+                    f"Routing {requested} -> {best}: cost {requested_cost:.2f}s vs {best_cost:.2f}s"
+                )
+        elif requested is not None and requested != best:
+            logger.debug(f"Routing {requested} -> {best} (requested model unavailable)")
+        chosen = self.metrics(choice)
+        chosen.chosen += 1
+        chosen.skipped = 0
+        return choice
+
+    def observe(self, name: str, latency: float, failed: bool = False) -> None:
+        """Fold a completed request into the adapter's averages."""
+        m = self._metrics.get(name)
+        if m is None:
+            return
+        m.requests += 1
+        m.errors += int(failed)
+        if not failed:
+            if m.latency is None:
+                m.latency = latency
+            else:
+                m.latency = (1 - self.alpha) * m.latency + self.alpha * latency
+            m.samples.append(latency)
+        m.error_rate = (1 - self.alpha) * m.error_rate + self.alpha * float(failed)
+
+    def percentile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile (0 < q <= 1) over recent successes, or None with too few samples."""
+        samples = self.metrics(name).samples
+        if len(samples) < max(1, min_samples):
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    @contextmanager
+    def request(self, name: Optional[str]) -> Iterator[RequestTimer]:
+        """Count a request as in flight and record its latency and outcome."""
+        timer = RequestTimer(self._clock)
+        m = self._metrics.get(name) if name is not None else None
+        if m is None:
+            yield timer
+            return
+        m.in_flight += 1
+        try:
+            yield timer
+        except Exception:
+            timer.failed = True
+            raise
+        except BaseException:
+            timer.cancelled = True
+            raise
+        finally:
+            m.in_flight -= 1
+            elapsed = timer.elapsed()
+            if not timer.cancelled:
+                self.observe(name, elapsed, timer.failed)
+            elif m.latency is not None and elapsed > m.latency:
+                # The request would have taken at least this long
+                self.observe(name, elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rerouted": self.rerouted,
+            "adapters": {
+                name: {
+                    "priority": m.priority,
+                    "latency_ewma": m.latency,
+                    "error_rate": m.error_rate,
+                    "in_flight": m.in_flight,
+                    "requests": m.requests,
+                    "errors": m.errors,
+                    "chosen": m.chosen,
+                    "cost": self.cost(name)
+                }
+                for name, m in self._metrics.items()
+            }
+        }
@@ -0,0 +1,240 @@
+"""
+Semantic cache for near-duplicate prompts.
+
+Relay and debate prompts often differ from an earlier one only by a
+sentence or two. Prompts are embedded locally as hashed word n-gram TF-IDF
+vectors and kept in a dense matrix; a lookup is one matrix-vector product
+over every entry of the same model and parameters, and the best match is
+served when its cosine similarity reaches the threshold.
+
+Because a near match can still deserve a different answer, a sample of
+hits is also sent to the provider and the two answers compared, which
+gives a false-hit rate to tune the threshold against.
+"""
+import json
+import logging
+import random
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config.defaults import SEMANTIC_CACHE_DEFAULTS
+from .response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is part of the optional "semantic_cache" feature set
+    np = None
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def namespace(model_name: Optional[str], params: Dict[str, Any]) -> str:
+    """Prompts only match others sent to the same model with the same parameters."""
+    return json.dumps([model_name, params], sort_keys=True, separators=(",", ":"), default=str)
+
+class SemanticCache:
+    """Brute-force cosine search over hashed n-gram TF-IDF prompt vectors."""
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_DEFAULTS["threshold"],
+        dimensions: int = SEMANTIC_CACHE_DEFAULTS["dimensions"],
+        max_entries: int = SEMANTIC_CACHE_DEFAULTS["max_entries"],
+        refresh_ratio: float = SEMANTIC_CACHE_DEFAULTS["refresh_ratio"],
+        audit_rate: float = SEMANTIC_CACHE_DEFAULTS["audit_rate"],
+        answer_threshold: float = SEMANTIC_CACHE_DEFAULTS["answer_threshold"],
+        rng: Callable[[], float] = random.random
+    ):
+        if np is None:
+            raise ImportError("SemanticCache requires numpy (pip install numpy)")
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self.refresh_ratio = refresh_ratio
+        self.audit_rate = audit_rate
+        self.answer_threshold = answer_threshold
+        self._rng = rng
+
+        # Row i of every array below describes entry i; rows are kept packed
+        self._matrix = np.zeros((0, dimensions), dtype=np.float32)  # unit TF-IDF vectors
+        self._namespaces = np.zeros(0, dtype=np.int64)
+        self._last_used = np.zeros(0, dtype=np.int64)
+        # (indices, tf) per row, kept to re-weight rows when the IDF changes
+        self._features: List[Tuple["np.ndarray", "np.ndarray"]] = []
+        self._responses: List[str] = []
+        self._namespace_ids: Dict[str, int] = {}
+
+        # Document frequencies track the index; rows and queries use the idf
+        # snapshot from the last refresh so they are always comparable
+        self._df = np.zeros(dimensions, dtype=np.int64)
+        self._idf = np.ones(dimensions, dtype=np.float32)
+        self._changes = 0
+        self._tick = 0
+
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.audits = 0
+        self.false_hits = 0
+        self._similarity_total = 0.0
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def _ngrams(self, text: str) -> "Tuple[np.ndarray, np.ndarray]":
+        """Hashed word unigram and bigram indices with sublinear term frequencies."""
+        tokens = _TOKEN_PATTERN.findall(normalize_prompt(text).lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        # The index lives in memory only, so per-process hash() seeds do not matter
+        hashes = np.fromiter((hash(gram) for gram in grams), dtype=np.int64, count=len(grams))
+        indices, counts = np.unique(hashes % self.dimensions, return_counts=True)
+        return indices, (1.0 + np.log(counts)).astype(np.float32)
+
+    def _vector(self, indices: "np.ndarray", tf: "np.ndarray") -> "Optional[np.ndarray]":
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        vector[indices] = tf * self._idf[indices]
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _refresh(self) -> None:
+        """Recompute idf from the current index and re-weight every row."""
+        count = len(self._responses)
+        self._idf = (np.log((1.0 + count) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        for row, (indices, tf) in enumerate(self._features):
+            vector = self._vector(indices, tf)
+            self._matrix[row] = vector if vector is not None else 0.0
+        self._changes = 0
+
+    def _changed(self) -> None:
+        self._changes += 1
+        if self._changes > self.refresh_ratio * len(self._responses):
+            self._refresh()
+
+    def lookup(
+        self,
+        model_name: Optional[str],
+        prompt: str,
+        params: Dict[str, Any]
+    ) -> Optional[Tuple[str, float]]:
+        """Best cached (response, similarity) at or above the threshold, if any."""
+        self.lookups += 1
+        space = self._namespace_ids.get(namespace(model_name, params))
+        if space is None or not self._responses:
+            return None
+        query = self._vector(*self._ngrams(prompt))
+        if query is None:
+            return None
+        count = len(self._responses)
+        scores = self._matrix[:count] @ query
+        scores[self._namespaces[:count] != space] = -1.0
+        row = int(np.argmax(scores))
+        similarity = float(scores[row])
+        if similarity < self.threshold:
+            return None
+        self._tick += 1
+        self._last_used[row] = self._tick
+        self.hits += 1
+        self._similarity_total += similarity
+        return self._responses[row], similarity
+
+    def add(
+        self,
+        model_name: Optional[str],
+        prompt: str,
+        params: Dict[str, Any],
+        response: str
+    ) -> None:
+        """Index a prompt and its response, dropping the least recently used entry when full."""
+        indices, tf = self._ngrams(prompt)
+        if not len(indices):
+            return
+        if len(self._responses) >= self.max_entries:
+            self._remove(int(np.argmin(self._last_used[:len(self._responses)])))
+            self.evictions += 1
+
+        row = len(self._responses)
+        if row == len(self._matrix):
+            self._grow()
+        key = namespace(model_name, params)
+        space = self._namespace_ids.setdefault(key, len(self._namespace_ids))
+        vector = self._vector(indices, tf)
+        self._matrix[row] = vector if vector is not None else 0.0
+        self._namespaces[row] = space
+        self._tick += 1
+        self._last_used[row] = self._tick
+        self._features.append((indices, tf))
+        self._responses.append(response)
+        self._df[indices] += 1
+        self._changed()
+
+    def _grow(self) -> None:
+        """Double the row capacity, up to max_entries."""
+        capacity = min(self.max_entries, max(16, 2 * len(self._matrix)))
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        matrix[:len(self._matrix)] = self._matrix
+        self._matrix = matrix
+        self._namespaces = np.resize(self._namespaces, capacity)
+        self._last_used = np.resize(self._last_used, capacity)
+
+    def _remove(self, row: int) -> None:
+        """Drop a row by moving the last row into its place."""
+        indices, _ = self._features[row]
+        self._df[indices] -= 1
+        last = len(self._responses) - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self._namespaces[row] = self._namespaces[last]
+            self._last_used[row] = self._last_used[last]
+            self._features[row] = self._features[last]
+            self._responses[row] = self._responses[last]
+        self._matrix[last] = 0.0
+        self._features.pop()
+        self._responses.pop()
+        self._changed()
+
+    def should_audit(self) -> bool:
+        """Whether a hit should also be checked against a fresh answer."""
+        return self._rng() < self.audit_rate
+
+    def record_audit(self, cached: str, fresh: str) -> bool:
+        """Compare a served answer with a fresh one; returns True for a false hit."""
+        self.audits += 1
+        cached_indices, cached_tf = self._ngrams(cached)
+        fresh_indices, fresh_tf = self._ngrams(fresh)
+        a = np.zeros(self.dimensions, dtype=np.float32)
+        b = np.zeros(self.dimensions, dtype=np.float32)
+        a[cached_indices] = cached_tf
+        b[fresh_indices] = fresh_tf
+        norms = float(np.linalg.norm(a) * np.linalg.norm(b))
+        similarity = float(a @ b) / norms if norms else float(cached == fresh)
+        if similarity < self.answer_threshold:
+            self.false_hits += 1
+            logger.debug(f"Semantic cache false hit (answer similarity {similarity:.2f})")
+            return True
+        return False
+
+    def clear(self) -> None:
+        self._matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+        self._namespaces = np.zeros(0, dtype=np.int64)
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._features.clear()
+        self._responses.clear()
+        self._namespace_ids.clear()
+        self._df[:] = 0
+        self._idf[:] = 1.0
+        self._changes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._responses),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "mean_similarity": self._similarity_total / self.hits if self.hits else 0.0,
+            "threshold": self.threshold,
+            "evictions": self.evictions,
+            "audits": self.audits,
+            "false_hits": self.false_hits,
+            "false_hit_rate": self.false_hits / self.audits if self.audits else 0.0
+        }
@@ -0,0 +1,94 @@
+"""
+Sentence splitting for context compression.
+
+NLTK's punkt model is used when its data is available, either installed
+system-wide or bundled in ``neuracollab/nltk_data`` by ``neuracollab.setup``.
+Nothing is imported or downloaded until the first split. Without punkt a
+built-in regex splitter handles Latin and CJK punctuation.
+"""
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+NLTK_DATA_DIR = Path(__file__).parent / "nltk_data"
+PUNKT_RESOURCES = ("tokenizers/punkt_tab/english/", "tokenizers/punkt")
+
+# Terminal punctuation plus closing quotes/brackets, then whitespace; CJK
+# full stops need no whitespace; blank lines always end a sentence.
+_BOUNDARY = re.compile(
+    r"[.!?…]+[\"'”’)\]]*\s+"
+    r"|[。！？]+[」』”’）]*\s*"
+    r"|\n\s*\n"
+)
+_LAST_WORD = re.compile(r"(\w+)\.$")
+_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "eg", "ie",
+    "e.g", "i.e", "fig", "no", "vol", "approx", "inc", "ltd", "co", "jan", "feb",
+    "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences with a punctuation-based heuristic."""
+    sentences, start = [], 0
+    for match in _BOUNDARY.finditer(text):
+        end = match.end()
+        if _is_abbreviation(text, match.start()) or _continues_lowercase(text, match):
+            continue
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = end
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+def _is_abbreviation(text: str, boundary: int) -> bool:
+    """Check whether a period closes an abbreviation or an initial."""
+    if text[boundary] != ".":
+        return False
+    word = _LAST_WORD.search(text, max(0, boundary - 16), boundary + 1)
+    if not word:
+        return False
+    token = word.group(1)
+    return token.lower() in _ABBREVIATIONS or (len(token) == 1 and token.isupper())
+
+def _continues_lowercase(text: str, match: "re.Match") -> bool:
+    """A period followed by a lowercase word rarely ends a sentence."""
+    end = match.end()
+    return (
+        text[match.start()] == "."
+        and "\n" not in match.group()
+        and end < len(text)
+        and text[end].islower()
+    )
+
+@lru_cache(maxsize=1)
+def get_sentence_tokenizer() -> Callable[[str], List[str]]:
+    """Load punkt on first use, falling back to the built-in splitter."""
+    try:
+        import nltk
+        from nltk.tokenize import sent_tokenize
+    except ImportError:
+        logger.info("nltk not installed, using the built-in sentence splitter")
+        return split_sentences
+
+    if NLTK_DATA_DIR.is_dir() and str(NLTK_DATA_DIR) not in nltk.data.path:
+        nltk.data.path.insert(0, str(NLTK_DATA_DIR))
+    for resource in PUNKT_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            continue
+        try:
+            sent_tokenize("Warm up. Punkt.")
+        except LookupError:
+            continue
+        return sent_tokenize
+
+    logger.info("NLTK punkt data not found, using the built-in sentence splitter")
+    return split_sentences
@@ -13,10 +13,15 @@ from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 
 from .cache_pool import NeuralCachePool
+from .config.defaults import STORAGE_DEFAULTS
 from .engine import CollaborationEngine
 from .dispatcher import LLMDispatcher
+from .requires import check_dependency
+from .response_cache import ResponseCache
+from .semantic_cache import SemanticCache
 from .adapters.llm_adapters import create_adapter
 from .init_db import init_database
+from .maintenance import MaintenanceScheduler
 from .ai_config import AIConfigManager
 
 from .workflow_controller import get_workflow_controller
@@ -44,19 +49,28 @@ async def lifespan(app: FastAPI):
         logger.info("Database initialized successfully")
         
         # Initialize core components
-        app.state.cache_pool = NeuralCachePool()
+        # Opt in to compressed entry text with NEURACOLLAB_STORAGE_COMPRESSION=zlib|zstd
+        compression = os.getenv("NEURACOLLAB_STORAGE_COMPRESSION", STORAGE_DEFAULTS["compression"])
+        app.state.cache_pool = NeuralCachePool(storage_compression=compression or None)
         app.state.ai_config = AIConfigManager()
-        app.state.dispatcher = LLMDispatcher()
-        app.state.engine = CollaborationEngine(app.state.cache_pool)
+        app.state.dispatcher = LLMDispatcher(
+            response_cache=ResponseCache(db_path="neuracollab.db"),
+            semantic_cache=SemanticCache() if check_dependency("numpy") else None
+        )
+        app.state.engine = CollaborationEngine(app.state.cache_pool, app.state.dispatcher)
         
         # Initialize WebSocket manager
         app.state.ws_manager = create_websocket_manager(
             app.state.cache_pool,
             app.state.engine
         )
+        await app.state.ws_manager.start()
         
         # Load AI configurations
         await load_ai_configs(app)
+        app.state.dispatcher.start_health_checks()
+        app.state.maintenance = MaintenanceScheduler(app.state.cache_pool)
+        app.state.maintenance.start()
         
         # Register controllers
         setup_routers(app)
@@ -68,6 +82,15 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         logger.info("Application shutting down")
+        if maintenance := getattr(app.state, "maintenance", None):
+            await maintenance.stop()
+        if ws_manager := getattr(app.state, "ws_manager", None):
+            await ws_manager.close()
+        if cache_pool := getattr(app.state, "cache_pool", None):
+            # Flushes any write-behind entries before the storage pool closes
+            await cache_pool.close()
+        if dispatcher := getattr(app.state, "dispatcher", None):
+            await dispatcher.aclose()
 
 def setup_routers(app: FastAPI):
     """Setup API routers."""
@@ -112,12 +135,14 @@ def setup_routers(app: FastAPI):
 
 async def load_ai_configs(app: FastAPI):
     """Load and register AI configurations."""
-    configs = app.state.ai_config.list_configs()
+    configs = app.state.ai_config.get_active_configs()
     for config in configs:
         if config.is_active:
             try:
                 adapter = create_adapter(config.provider, config.credentials)
-                app.state.dispatcher.register_adapter(config.name, adapter)
+                app.state.dispatcher.register_adapter(
+                    config.name, adapter, rate_limit=config.rate_limit, priority=config.priority
+                )
                 logger.info(f"Registered AI adapter: {config.name}")
             except Exception as e:
                 logger.error(f"Failed to load AI config {config.name}: {e}")
@@ -153,19 +178,31 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 async def health_check():
     """API health check endpoint."""
-    ws_connections = len(app.state.ws_manager.active_connections)
+    ws_connections = app.state.ws_manager.connection_count()
     active_models = app.state.dispatcher.get_available_models()
     cache_stats = {
         "size": app.state.cache_pool.current_size,
-        "entries": len(app.state.cache_pool.entries)
+        "entries": len(app.state.cache_pool.entries),
+        "hit_rate": app.state.cache_pool.get_hit_rate(),
+        "maintenance": app.state.maintenance.stats()
     }
     
     return {
         "status": "healthy",
         "version": "0.1.0",
         "active_models": active_models,
+        "model_health": app.state.dispatcher.get_health(),
         "cache_stats": cache_stats,
-        "websocket_connections": ws_connections
+        "http_pool": app.state.dispatcher.get_http_stats(),
+        "rate_limits": app.state.dispatcher.get_rate_limit_stats(),
+        "routing": app.state.dispatcher.get_routing_stats(),
+        "hedging": app.state.dispatcher.get_hedging_stats(),
+        "resilience": app.state.dispatcher.get_resilience_stats(),
+        "dedup": app.state.dispatcher.get_dedup_stats(),
+        "response_cache": app.state.dispatcher.get_response_cache_stats(),
+        "semantic_cache": app.state.dispatcher.get_semantic_cache_stats(),
+        "websocket_connections": ws_connections,
+        "websocket_hub": app.state.ws_manager.stats()
     }
 
 if __name__ == "__main__":
@@ -1,11 +1,19 @@
-import nltk
+"""
+Bundle NLTK data with the package so the server never downloads at startup.
+
+Usage:
+    python -m neuracollab.setup
+"""
+from .sentences import NLTK_DATA_DIR
 
 def setup_nltk():
     """
-    Download required NLTK data during package installation
+    Download the punkt sentence tokenizer into neuracollab/nltk_data
     """
     try:
-        nltk.download('punkt', quiet=True)
+        import nltk
+        for package in ("punkt_tab", "punkt"):
+            nltk.download(package, download_dir=str(NLTK_DATA_DIR), quiet=True)
     except Exception as e:
         print(f"Warning: Could not download NLTK data: {e}")
 
@@ -0,0 +1,74 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+Concurrent callers asking for the same key share one underlying task: the
+first caller starts it and later callers await the same result. The task
+is cancelled only when every caller waiting on it has gone away.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def request_key(
+    model_name: Optional[str],
+    prompt: str,
+    kwargs: Dict[str, Any]
+) -> Tuple[Optional[str], str, str]:
+    """Key identifying a generation request: (model, prompt hash, kwargs)."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return model_name, prompt_hash, json.dumps(kwargs, sort_keys=True, default=str)
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await the call for key, starting it with factory() if none is in flight."""
+        call = self._calls.get(key)
+        if call is None:
+            self.misses += 1
+            call = self._calls[key] = _Call(asyncio.ensure_future(factory()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.hits += 1
+            logger.debug(f"Coalesced duplicate in-flight request ({call.waiters} already waiting)")
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()  # nobody is waiting for the answer any more
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "in_flight": self.in_flight()
+        }
@@ -2,35 +2,204 @@
 Storage implementation for the NeuraCollab cache pool.
 """
 
+import asyncio
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from contextlib import contextmanager
-from typing import List, Optional, Dict, Any
+from queue import Queue, Empty
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import json
 
 from .models import CacheEntry
+from .config.defaults import STORAGE_DEFAULTS
+from .text_codec import CodecRegistry, train_dictionary
 
-class SQLiteConnector:
+# Bound parameters per statement; SQLite before 3.32 allows at most 999
+MAX_VARIABLES = 999
+
+class ConnectionPool:
     """
-    SQLite-based persistent storage for the cache pool.
+    SQLite connection pool with a single writer and N reader connections.
+
+    WAL journaling lets the readers see the last committed snapshot while the
+    writer commits, so concurrent workflow steps can read history without
+    waiting on each other.
     """
-    def __init__(self, db_path: str = "neuracollab.db"):
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = STORAGE_DEFAULTS["pool_readers"],
+        synchronous: str = STORAGE_DEFAULTS["synchronous"],
+        cache_size_kb: int = STORAGE_DEFAULTS["cache_size_kb"],
+        mmap_size: int = STORAGE_DEFAULTS["mmap_size"],
+        busy_timeout_ms: int = STORAGE_DEFAULTS["busy_timeout_ms"],
+        auto_vacuum: str = STORAGE_DEFAULTS["auto_vacuum"]
+    ):
         self.db_path = db_path
-        self._initialize_db()
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.auto_vacuum = auto_vacuum
+        # In-memory databases are private to a single connection
+        self._in_memory = db_path == ":memory:" or db_path.startswith("file::memory:")
+        self._write_lock = threading.Lock()
+        self._readers: "Queue[sqlite3.Connection]" = Queue()
+        self._closed = False
+        self._stats = {
+            "connections_opened": 0,
+            "reads": 0,
+            "writes": 0,
+            "read_waits": 0,
+            "write_waits": 0,
+            "read_wait_seconds": 0.0,
+            "write_wait_seconds": 0.0
+        }
+        self._stats_lock = threading.Lock()
 
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        self._writer = self._open()
+        self.reader_count = 0 if self._in_memory else readers
+        for _ in range(self.reader_count):
+            self._readers.put(self._open(readonly=True))
+
+    def _open(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a connection and apply the tuned pragmas."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=self.busy_timeout_ms / 1000
+        )
         conn.row_factory = sqlite3.Row
+        if not readonly:
+            # Must precede WAL to apply to a new file; otherwise it applies at the next VACUUM
+            conn.execute(f"PRAGMA auto_vacuum={self.auto_vacuum}")
+        if not self._in_memory and not readonly:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        self._bump("connections_opened")
+        return conn
+
+    def _bump(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    @contextmanager
+    def reader(self):
+        """Borrow a reader connection, falling back to the writer if there are none."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self.reader_count:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        started = time.perf_counter()
+        try:
+            conn = self._readers.get_nowait()
+        except Empty:
+            self._bump("read_waits")
+            conn = self._readers.get()
+            self._bump("read_wait_seconds", time.perf_counter() - started)
         try:
+            self._bump("reads")
             yield conn
         finally:
-            conn.close()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Acquire the single writer connection; commits on success, rolls back on error."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        started = time.perf_counter()
+        if not self._write_lock.acquire(blocking=False):
+            self._bump("write_waits")
+            self._write_lock.acquire()
+            self._bump("write_wait_seconds", time.perf_counter() - started)
+        try:
+            self._bump("writes")
+            yield self._writer
+            self._writer.commit()
+        except Exception:
+            self._writer.rollback()
+            raise
+        finally:
+            self._write_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool usage statistics."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            "db_path": self.db_path,
+            "journal_mode": "memory" if self._in_memory else "wal",
+            "readers": self.reader_count,
+            "idle_readers": self._readers.qsize(),
+            "writer_busy": self._write_lock.locked(),
+            "closed": self._closed
+        })
+        return stats
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except Empty:
+                break
+        with self._write_lock:
+            self._writer.close()
+
+class SQLiteConnector:
+    """
+    SQLite-based persistent storage for the cache pool.
+
+    Every row carries a materialized ancestry path ("/root_id/.../entry_id")
+    and its depth, maintained on insert. Ancestor lookups read one path and
+    fetch the ids by primary key; subtree lookups are a range scan on the
+    path index.
+
+    Content and prompt are stored as compressed BLOBs when a codec is set;
+    each row records its codec and dictionary, so rows written plain or
+    with an older dictionary stay readable and are decoded as they are read.
+    """
+    def __init__(
+        self,
+        db_path: str = "neuracollab.db",
+        pool_size: int = STORAGE_DEFAULTS["pool_readers"],
+        compression: Optional[str] = STORAGE_DEFAULTS["compression"],
+        compression_level: Optional[int] = STORAGE_DEFAULTS["compression_level"]
+    ):
+        self.db_path = db_path
+        self._pool = ConnectionPool(db_path, readers=pool_size)
+        self.compression = compression
+        self.codecs = CodecRegistry(compression_level)
+        self.dict_id: Optional[int] = None  # dictionary new rows are written with
+        self._initialize_db()
+
+    def _read_connection(self):
+        return self._pool.reader()
+
+    def _write_connection(self):
+        return self._pool.writer()
 
     def _initialize_db(self):
         """Create required tables if they don't exist."""
-        with self._get_connection() as conn:
+        with self._write_connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS cache_entries (
                     entry_id TEXT PRIMARY KEY,
@@ -40,94 +209,496 @@ class SQLiteConnector:
                     author TEXT NOT NULL,
                     timestamp DATETIME NOT NULL,
                     metadata TEXT,
+                    path TEXT,
+                    depth INTEGER,
                     FOREIGN KEY (parent_id) REFERENCES cache_entries (entry_id)
                 )
             """)
-            conn.commit()
-
-    def insert(self, entry: CacheEntry) -> UUID:
-        """Insert a new cache entry."""
-        with self._get_connection() as conn:
+            # Databases created before the ancestry index need the columns added
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            if "path" not in columns:
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN path TEXT")
+            if "depth" not in columns:
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN depth INTEGER")
+            if "codec" not in columns:
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN codec TEXT")
+            if "dict_id" not in columns:
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN dict_id INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_path ON cache_entries(path)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_parent ON cache_entries(parent_id)")
             conn.execute("""
-                INSERT INTO cache_entries 
-                (entry_id, parent_id, content, prompt, author, timestamp, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+                CREATE TABLE IF NOT EXISTS compression_dicts (
+                    dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    codec TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    created DATETIME NOT NULL
+                )
+            """)
+            dictionaries = conn.execute(
+                "SELECT dict_id, codec, data FROM compression_dicts ORDER BY dict_id"
+            )
+            for row in dictionaries:
+                self.codecs.add_dictionary(row["dict_id"], row["data"])
+                if row["codec"] == self.compression:
+                    self.dict_id = row["dict_id"]
+        if self.compression:
+            self.codecs.get(self.compression)  # fail early if the codec is unavailable
+        self.backfilled = self.backfill_ancestry()
+
+    def backfill_ancestry(self) -> int:
+        """
+        Populate path/depth for rows written before the ancestry index existed.
+
+        Runs one UPDATE per tree level, so it is cheap to call on every startup
+        once the database has been migrated. Returns the number of rows updated.
+        """
+        with self._write_connection() as conn:
+            pending = conn.execute(
+                "SELECT 1 FROM cache_entries WHERE path IS NULL LIMIT 1"
+            ).fetchone()
+            if not pending:
+                return 0
+
+            updated = conn.execute("""
+                UPDATE cache_entries SET path = '/' || entry_id, depth = 0
+                WHERE path IS NULL AND (
+                    parent_id IS NULL
+                    OR parent_id NOT IN (SELECT entry_id FROM cache_entries)
+                )
+            """).rowcount
+            while True:
+                level = conn.execute("""
+                    UPDATE cache_entries SET
+                        path = (
+                            SELECT p.path FROM cache_entries p
+                            WHERE p.entry_id = cache_entries.parent_id
+                        ) || '/' || entry_id,
+                        depth = (
+                            SELECT p.depth FROM cache_entries p
+                            WHERE p.entry_id = cache_entries.parent_id
+                        ) + 1
+                    WHERE path IS NULL AND parent_id IN (
+                        SELECT entry_id FROM cache_entries WHERE path IS NOT NULL
+                    )
+                """).rowcount
+                if not level:
+                    break
+                updated += level
+
+            # Anything left is part of a parent cycle; index it as its own root
+            updated += conn.execute("""
+                UPDATE cache_entries SET path = '/' || entry_id, depth = 0
+                WHERE path IS NULL
+            """).rowcount
+        return updated
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        return self._pool.stats()
+
+    def vacuum(self) -> None:
+        """Rebuild the database file to reclaim free pages and truncate the WAL."""
+        with self._write_connection() as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def train_dictionary(
+        self,
+        samples: int = STORAGE_DEFAULTS["dictionary_samples"],
+        size: int = STORAGE_DEFAULTS["dictionary_size"],
+        min_rows: int = 0
+    ) -> Optional[int]:
+        """
+        Train a dictionary for the configured codec on the most recent rows
+        and write new rows with it. Returns its id, or None if there are
+        fewer than min_rows rows or they share nothing worth a dictionary.
+        """
+        if not self.compression:
+            return None
+        with self._read_connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM cache_entries ORDER BY timestamp DESC LIMIT ?", (int(samples),)
+            ).fetchall()
+        if not rows or len(rows) < min_rows:
+            return None
+        texts = []
+        for row in rows:
+            entry = self._row_to_entry(row)
+            texts.extend((entry.content, entry.prompt))
+        data = train_dictionary(texts, self.compression, size)
+        if not data:
+            return None
+        with self._write_connection() as conn:
+            dict_id = conn.execute(
+                "INSERT INTO compression_dicts (codec, data, created) VALUES (?, ?, ?)",
+                (self.compression, data, datetime.now().isoformat())
+            ).lastrowid
+        self.codecs.add_dictionary(dict_id, data)
+        self.dict_id = dict_id
+        return dict_id
+
+    def recompress(self, limit: int, after: int = 0) -> Tuple[int, int]:
+        """
+        Rewrite the next limit rows (by rowid, after `after`) that are not
+        stored with the current codec and dictionary. Returns (rows looked
+        at, last rowid) so a caller can walk the table in batches.
+        """
+        target = (self.compression, self.dict_id)
+        with self._read_connection() as conn:
+            rows = conn.execute(
+                "SELECT rowid AS row_id, * FROM cache_entries "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (int(after), int(limit))
+            ).fetchall()
+        updates = []
+        for row in rows:
+            if (row["codec"], row["dict_id"]) == target:
+                continue
+            entry = self._row_to_entry(row)
+            encoded = self._encode_text(entry.content, entry.prompt)
+            if encoded[2] is None and row["codec"] is None:
+                continue  # stays plain text
+            updates.append(encoded + (row["row_id"],))
+        if updates:
+            with self._write_connection() as conn:
+                conn.executemany(
+                    "UPDATE cache_entries SET content = ?, prompt = ?, codec = ?, dict_id = ? "
+                    "WHERE rowid = ?",
+                    updates
+                )
+        return len(rows), rows[-1]["row_id"] if rows else after
+
+    def compression_stats(self) -> Dict[str, Any]:
+        """Rows and stored text bytes by codec."""
+        with self._read_connection() as conn:
+            rows = conn.execute("""
+                SELECT COALESCE(codec, 'plain') AS codec, COUNT(*) AS rows,
+                       SUM(length(CAST(content AS BLOB)) + length(CAST(prompt AS BLOB))) AS bytes
+                FROM cache_entries GROUP BY codec
+            """).fetchall()
+        return {
+            "codec": self.compression,
+            "dict_id": self.dict_id,
+            "by_codec": {row["codec"]: {"rows": row["rows"], "bytes": row["bytes"]} for row in rows}
+        }
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to pages free pages to the filesystem; returns how many were freed."""
+        with self._write_connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not before:
+                return 0
+            # executescript steps the pragma to completion; execute() frees a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def optimize(self, analysis_limit: int = 400) -> None:
+        """Refresh query planner statistics where SQLite judges them stale."""
+        with self._write_connection() as conn:
+            conn.execute(f"PRAGMA analysis_limit={int(analysis_limit)}")
+            conn.execute("PRAGMA optimize")
+
+    def prune_orphans(self, before: datetime, limit: int) -> List[UUID]:
+        """
+        Delete up to limit entries older than before whose parent no longer
+        exists. Their children become orphans in turn, so repeated calls
+        remove whole detached branches a bounded batch at a time.
+        """
+        with self._read_connection() as conn:
+            orphans = [row["entry_id"] for row in conn.execute("""
+                SELECT c.entry_id FROM cache_entries c
+                WHERE c.parent_id IS NOT NULL AND c.timestamp < ?
+                AND NOT EXISTS (SELECT 1 FROM cache_entries p WHERE p.entry_id = c.parent_id)
+                LIMIT ?
+            """, (before.isoformat(), int(limit)))]
+        if orphans:
+            with self._write_connection() as conn:
+                conn.executemany(
+                    "DELETE FROM cache_entries WHERE entry_id = ?", [(o,) for o in orphans]
+                )
+        return [UUID(entry_id) for entry_id in orphans]
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._pool.close()
+
+    def _row_to_entry(self, row: sqlite3.Row) -> CacheEntry:
+        content, prompt = row["content"], row["prompt"]
+        if row["codec"]:
+            codec = self.codecs.get(row["codec"], row["dict_id"])
+            content, prompt = codec.decode(content), codec.decode(prompt)
+        return CacheEntry(
+            entry_id=UUID(row["entry_id"]),
+            parent_id=UUID(row["parent_id"]) if row["parent_id"] else None,
+            content=content,
+            prompt=prompt,
+            author=row["author"],
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            metadata=json.loads(row["metadata"])
+        )
+
+    def _encode_text(self, content: str, prompt: str) -> tuple:
+        """(content, prompt, codec, dict_id) as stored: compressed when that saves space."""
+        size = len(content) + len(prompt)
+        if not self.compression or size < STORAGE_DEFAULTS["compress_min_bytes"]:
+            return content, prompt, None, None
+        codec = self.codecs.get(self.compression, self.dict_id)
+        packed_content, packed_prompt = codec.encode(content), codec.encode(prompt)
+        raw_size = len(content.encode("utf-8")) + len(prompt.encode("utf-8"))
+        if len(packed_content) + len(packed_prompt) >= raw_size:
+            return content, prompt, None, None
+        return packed_content, packed_prompt, self.compression, self.dict_id
+
+    @staticmethod
+    def _ancestry(conn: sqlite3.Connection, entry: CacheEntry, known: Dict[str, tuple]) -> tuple:
+        """Compute (path, depth) for a new entry from its parent's path."""
+        entry_id = str(entry.entry_id)
+        if not entry.parent_id:
+            return f"/{entry_id}", 0
+        parent_id = str(entry.parent_id)
+        parent = known.get(parent_id)
+        if parent is None:
+            row = conn.execute(
+                "SELECT path, depth FROM cache_entries WHERE entry_id = ?", (parent_id,)
+            ).fetchone()
+            parent = (row["path"], row["depth"]) if row and row["path"] else None
+        if parent is None:
+            # Unknown parent: index the entry as the root of its own tree
+            return f"/{entry_id}", 0
+        return f"{parent[0]}/{entry_id}", parent[1] + 1
+
+    def _insert_rows(self, conn: sqlite3.Connection, entries: List[CacheEntry]) -> None:
+        known: Dict[str, tuple] = {}
+        rows = []
+        for entry in entries:
+            path, depth = self._ancestry(conn, entry, known)
+            known[str(entry.entry_id)] = (path, depth)
+            content, prompt, codec, dict_id = self._encode_text(entry.content, entry.prompt)
+            rows.append((
                 str(entry.entry_id),
                 str(entry.parent_id) if entry.parent_id else None,
-                entry.content,
-                entry.prompt,
+                content,
+                prompt,
                 entry.author,
                 entry.timestamp.isoformat(),
-                json.dumps(entry.metadata)
+                json.dumps(entry.metadata),
+                path,
+                depth,
+                codec,
+                dict_id
             ))
-            conn.commit()
+        conn.executemany("""
+            INSERT INTO cache_entries
+            (entry_id, parent_id, content, prompt, author, timestamp, metadata, path, depth,
+             codec, dict_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def insert(self, entry: CacheEntry) -> UUID:
+        """Insert a new cache entry."""
+        with self._write_connection() as conn:
+            self._insert_rows(conn, [entry])
         return entry.entry_id
 
+    def insert_many(self, entries: List[CacheEntry]) -> List[UUID]:
+        """Insert several cache entries in a single transaction."""
+        with self._write_connection() as conn:
+            self._insert_rows(conn, entries)
+        return [entry.entry_id for entry in entries]
+
     def get(self, entry_id: UUID) -> Optional[CacheEntry]:
         """Retrieve a specific cache entry."""
-        with self._get_connection() as conn:
+        with self._read_connection() as conn:
             result = conn.execute("""
                 SELECT * FROM cache_entries WHERE entry_id = ?
             """, (str(entry_id),)).fetchone()
-            
+
             if not result:
                 return None
-                
-            return CacheEntry(
-                entry_id=UUID(result["entry_id"]),
-                parent_id=UUID(result["parent_id"]) if result["parent_id"] else None,
-                content=result["content"],
-                prompt=result["prompt"],
-                author=result["author"],
-                timestamp=datetime.fromisoformat(result["timestamp"]),
-                metadata=json.loads(result["metadata"])
-            )
+
+            return self._row_to_entry(result)
+
+    def get_ancestors(self, entry_id: UUID, limit: Optional[int] = None) -> List[CacheEntry]:
+        """
+        Get the ancestor chain of an entry, oldest first, ending with the entry itself.
+
+        With a limit only the nearest `limit` entries of the chain are returned.
+        """
+        with self._read_connection() as conn:
+            row = conn.execute(
+                "SELECT path FROM cache_entries WHERE entry_id = ?", (str(entry_id),)
+            ).fetchone()
+            if not row:
+                return []
+
+            chain = row["path"].split("/")[1:]
+            if limit is not None:
+                chain = chain[-limit:] if limit > 0 else []
+            if not chain:
+                return []
+            by_id = {}
+            for start in range(0, len(chain), MAX_VARIABLES):
+                batch = chain[start:start + MAX_VARIABLES]
+                placeholders = ", ".join("?" for _ in batch)
+                for r in conn.execute(
+                    f"SELECT * FROM cache_entries WHERE entry_id IN ({placeholders})", batch
+                ):
+                    by_id[r["entry_id"]] = r
+            return [self._row_to_entry(by_id[i]) for i in chain if i in by_id]
+
+    def get_subtree(
+        self,
+        entry_id: UUID,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[CacheEntry]:
+        """
+        Get an entry and all of its descendants, ordered by timestamp.
+
+        With after, only entries ordered after that entry are returned, so a
+        client can resume from the last entry_id it has seen.
+        """
+        with self._read_connection() as conn:
+            row = conn.execute(
+                "SELECT path FROM cache_entries WHERE entry_id = ?", (str(entry_id),)
+            ).fetchone()
+            if not row:
+                return []
+
+            # Every descendant path starts with "<path>/"; '0' sorts right after '/'
+            path = row["path"]
+            query = "SELECT * FROM cache_entries WHERE path >= ? AND path < ?"
+            params: List[Any] = [path, path + "0"]
+            if after is not None:
+                anchor = conn.execute(
+                    "SELECT timestamp, entry_id FROM cache_entries WHERE entry_id = ?",
+                    (str(after),)
+                ).fetchone()
+                if not anchor:
+                    raise KeyError(f"Unknown history cursor: {after}")
+                query += " AND (timestamp, entry_id) > (?, ?)"
+                params += [anchor["timestamp"], anchor["entry_id"]]
+            query += " ORDER BY timestamp ASC, entry_id ASC"
+            if limit is not None or offset:
+                query += " LIMIT ? OFFSET ?"
+                params += [-1 if limit is None else limit, offset]
+
+            return [self._row_to_entry(r) for r in conn.execute(query, params).fetchall()]
 
     def get_branch(self, entry_id: UUID) -> List[CacheEntry]:
         """Get all entries in a branch starting from the given entry."""
-        with self._get_connection() as conn:
-            results = conn.execute("""
-                WITH RECURSIVE branch AS (
-                    SELECT * FROM cache_entries WHERE entry_id = ?
-                    UNION ALL
-                    SELECT e.*
-                    FROM cache_entries e
-                    JOIN branch b ON e.parent_id = b.entry_id
-                )
-                SELECT * FROM branch
-                ORDER BY timestamp ASC
-            """, (str(entry_id),)).fetchall()
-            
-            return [
-                CacheEntry(
-                    entry_id=UUID(r["entry_id"]),
-                    parent_id=UUID(r["parent_id"]) if r["parent_id"] else None,
-                    content=r["content"],
-                    prompt=r["prompt"],
-                    author=r["author"],
-                    timestamp=datetime.fromisoformat(r["timestamp"]),
-                    metadata=json.loads(r["metadata"])
-                )
-                for r in results
-            ]
+        return self.get_subtree(entry_id)
 
     def get_children(self, entry_id: UUID) -> List[CacheEntry]:
         """Get direct child entries of the given entry."""
-        with self._get_connection() as conn:
+        with self._read_connection() as conn:
             results = conn.execute("""
                 SELECT * FROM cache_entries WHERE parent_id = ?
             """, (str(entry_id),)).fetchall()
-            
-            return [
-                CacheEntry(
-                    entry_id=UUID(r["entry_id"]),
-                    parent_id=UUID(r["parent_id"]),
-                    content=r["content"],
-                    prompt=r["prompt"],
-                    author=r["author"],
-                    timestamp=datetime.fromisoformat(r["timestamp"]),
-                    metadata=json.loads(r["metadata"])
-                )
-                for r in results
-            ]
+
+            return [self._row_to_entry(r) for r in results]
+
+class AsyncSQLiteConnector:
+    """
+    Asyncio front-end for SQLiteConnector.
+
+    Every call runs on a dedicated pool of I/O threads sized to the underlying
+    connection pool, so disk hits never block the event loop while readers can
+    still proceed in parallel with the single writer.
+    """
+    def __init__(
+        self,
+        db_path: str = "neuracollab.db",
+        pool_size: int = STORAGE_DEFAULTS["pool_readers"],
+        connector: Optional[SQLiteConnector] = None,
+        compression: Optional[str] = STORAGE_DEFAULTS["compression"]
+    ):
+        self.sync = connector or SQLiteConnector(
+            db_path, pool_size=pool_size, compression=compression
+        )
+        self.db_path = self.sync.db_path
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(pool_size, 1) + 1,
+            thread_name_prefix="neuracollab-sqlite"
+        )
+
+    async def _run(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def insert(self, entry: CacheEntry) -> UUID:
+        """Insert a new cache entry."""
+        return await self._run(self.sync.insert, entry)
+
+    async def insert_many(self, entries: List[CacheEntry]) -> List[UUID]:
+        """Insert several cache entries in a single transaction."""
+        return await self._run(self.sync.insert_many, entries)
+
+    async def get(self, entry_id: UUID) -> Optional[CacheEntry]:
+        """Retrieve a specific cache entry."""
+        return await self._run(self.sync.get, entry_id)
+
+    async def get_ancestors(self, entry_id: UUID, limit: Optional[int] = None) -> List[CacheEntry]:
+        """Get the ancestor chain of an entry, oldest first, ending with the entry itself."""
+        return await self._run(self.sync.get_ancestors, entry_id, limit)
+
+    async def get_subtree(
+        self,
+        entry_id: UUID,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[CacheEntry]:
+        """Get an entry and all of its descendants, ordered by timestamp."""
+        return await self._run(self.sync.get_subtree, entry_id, after, limit, offset)
+
+    async def get_branch(self, entry_id: UUID) -> List[CacheEntry]:
+        """Get all entries in a branch starting from the given entry."""
+        return await self._run(self.sync.get_branch, entry_id)
+
+    async def get_children(self, entry_id: UUID) -> List[CacheEntry]:
+        """Get direct child entries of the given entry."""
+        return await self._run(self.sync.get_children, entry_id)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        return self.sync.pool_stats()
+
+    async def vacuum(self) -> None:
+        """Rebuild the database file to reclaim free pages."""
+        await self._run(self.sync.vacuum)
+
+    async def train_dictionary(self, min_rows: int = 0) -> Optional[int]:
+        """Train a compression dictionary on recent rows and start using it."""
+        return await self._run(
+            self.sync.train_dictionary,
+            STORAGE_DEFAULTS["dictionary_samples"],
+            STORAGE_DEFAULTS["dictionary_size"],
+            min_rows
+        )
+
+    async def recompress(self, limit: int, after: int = 0) -> Tuple[int, int]:
+        """Rewrite a batch of rows with the current codec and dictionary."""
+        return await self._run(self.sync.recompress, limit, after)
+
+    async def compression_stats(self) -> Dict[str, Any]:
+        """Rows and stored text bytes by codec."""
+        return await self._run(self.sync.compression_stats)
+
+    async def incremental_vacuum(self, pages: int) -> int:
+        """Return up to pages free pages to the filesystem."""
+        return await self._run(self.sync.incremental_vacuum, pages)
+
+    async def optimize(self, analysis_limit: int = 400) -> None:
+        """Refresh query planner statistics where needed."""
+        await self._run(self.sync.optimize, analysis_limit)
+
+    async def prune_orphans(self, before: datetime, limit: int) -> List[UUID]:
+        """Delete a batch of old entries whose parent no longer exists."""
+        return await self._run(self.sync.prune_orphans, before, limit)
+
+    async def close(self) -> None:
+        """Close the connection pool and stop the I/O threads."""
+        await self._run(self.sync.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,70 @@
+"""
+Coalescing of streamed model output into delta frames.
+
+Adapters yield many tiny chunks; sending each one as its own WebSocket frame
+wastes bandwidth and client render time. The coalescer emits the first chunk
+immediately and then at most one delta per interval.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from .config.defaults import WEBSOCKET_DEFAULTS
+
+class DeltaCoalescer:
+    """Batch streamed text into deltas emitted at most once per interval."""
+
+    def __init__(
+        self,
+        emit: Callable[[str], Awaitable[None]],
+        interval: float = WEBSOCKET_DEFAULTS["delta_interval"],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.emit = emit
+        self.interval = interval
+        self._clock = clock
+        self._buffer: List[str] = []
+        self._last_emit: Optional[float] = None
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.chunks = 0
+        self.deltas = 0
+
+    async def push(self, text: str) -> None:
+        """Add a chunk, emitting now if the interval has passed."""
+        if not text:
+            return
+        self._buffer.append(text)
+        self.chunks += 1
+        if self._last_emit is None:
+            await self.flush()
+            return
+        wait = self.interval - (self._clock() - self._last_emit)
+        if wait <= 0:
+            await self.flush()
+        elif self._timer is None:
+            # Emit buffered text even if the model stalls before the next chunk
+            self._timer = asyncio.create_task(self._flush_later(wait))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Emit everything buffered so far as one delta."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._last_emit = self._clock()
+            self.deltas += 1
+            await self.emit(text)
+
+    async def aclose(self) -> None:
+        """Flush the remainder and stop the timer."""
+        await self.flush()
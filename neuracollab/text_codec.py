@@ -0,0 +1,135 @@
+"""
+Compression codecs for stored entry text.
+
+Entry content and prompts are compressed per row with zlib (always
+available) or zstd (with the optional zstandard package). Either can be
+primed with a dictionary trained on existing entries: step prompts repeat
+the same templates, labels and recent context, so a shared dictionary pays
+off even on rows too short to compress well alone.
+"""
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd is the optional "storage_zstd" feature
+    zstandard = None
+
+CODECS = ("zlib", "zstd")
+DEFAULT_LEVELS = {"zlib": 6, "zstd": 3}
+# zlib only looks back 32 KiB, so a larger preset dictionary is wasted
+MAX_ZLIB_DICTIONARY = 32 * 1024
+
+def available_codecs() -> List[str]:
+    return ["zlib"] + (["zstd"] if zstandard is not None else [])
+
+class TextCodec:
+    """Compresses text to bytes and back, optionally with a preset dictionary."""
+
+    def __init__(
+        self,
+        name: str = "zlib",
+        level: Optional[int] = None,
+        dictionary: Optional[bytes] = None
+    ):
+        if name not in CODECS:
+            raise ValueError(f"Unknown codec: {name}")
+        if name == "zstd" and zstandard is None:
+            raise ImportError("The zstd codec requires zstandard (pip install zstandard)")
+        self.name = name
+        self.level = DEFAULT_LEVELS[name] if level is None else level
+        self.dictionary = dictionary
+        # zstd (de)compressors are not thread-safe; storage reads run on several threads
+        self._local = threading.local()
+        self._zstd_dict = (
+            zstandard.ZstdCompressionDict(dictionary)
+            if name == "zstd" and dictionary else None
+        )
+
+    def encode(self, text: str) -> bytes:
+        data = text.encode("utf-8")
+        if self.name == "zstd":
+            return self._zstd("compressor").compress(data)
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+
+    def decode(self, blob: bytes) -> str:
+        if self.name == "zstd":
+            return self._zstd("decompressor").decompress(blob).decode("utf-8")
+        if self.dictionary:
+            decompressor = zlib.decompressobj(-15, zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return (decompressor.decompress(blob) + decompressor.flush()).decode("utf-8")
+
+    def _zstd(self, kind: str):
+        worker = getattr(self._local, kind, None)
+        if worker is None:
+            if kind == "compressor":
+                worker = zstandard.ZstdCompressor(level=self.level, dict_data=self._zstd_dict)
+            else:
+                worker = zstandard.ZstdDecompressor(dict_data=self._zstd_dict)
+            setattr(self._local, kind, worker)
+        return worker
+
+def _frequent_lines(samples: Sequence[str], size: int) -> bytes:
+    """
+    Dictionary of the lines repeated across samples, most valuable last
+    (deflate reaches the end of its window most cheaply).
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update({line.strip() for line in sample.splitlines() if len(line.strip()) >= 8})
+    ranked = sorted(
+        ((count - 1) * len(line.encode("utf-8")), line)
+        for line, count in counts.items() if count > 1
+    )
+    chosen: List[bytes] = []
+    total = 0
+    for _, line in reversed(ranked):
+        encoded = line.encode("utf-8") + b"\n"
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chosen))
+
+def train_dictionary(
+    samples: Sequence[str],
+    codec: str = "zlib",
+    size: int = MAX_ZLIB_DICTIONARY
+) -> bytes:
+    """Build a preset dictionary for codec from sample texts; empty if nothing repeats."""
+    if codec == "zstd" and zstandard is not None:
+        try:
+            encoded = [sample.encode("utf-8") for sample in samples]
+            return zstandard.train_dictionary(size, encoded).as_bytes()
+        except zstandard.ZstdError:
+            pass  # too few samples for the trainer; fall back to repeated lines
+    return _frequent_lines(samples, min(size, MAX_ZLIB_DICTIONARY) if codec == "zlib" else size)
+
+class CodecRegistry:
+    """Codecs by (name, dictionary id), for decoding rows written with older dictionaries."""
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = level
+        self.dictionaries: Dict[int, bytes] = {}
+        self._codecs: Dict[tuple, TextCodec] = {}
+
+    def add_dictionary(self, dict_id: int, data: bytes) -> None:
+        self.dictionaries[dict_id] = data
+
+    def get(self, name: str, dict_id: Optional[int] = None) -> TextCodec:
+        key = (name, dict_id)
+        codec = self._codecs.get(key)
+        if codec is None:
+            if dict_id is not None and dict_id not in self.dictionaries:
+                raise KeyError(f"Unknown compression dictionary: {dict_id}")
+            dictionary = self.dictionaries.get(dict_id) if dict_id is not None else None
+            codec = self._codecs[key] = TextCodec(name, self.level, dictionary)
+        return codec
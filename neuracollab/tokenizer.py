@@ -0,0 +1,75 @@
+"""
+Token counting for context budgeting.
+
+Context windows are measured in model tokens, not characters. A fast local
+heuristic is always available; tiktoken is used for OpenAI models when it is
+installed.
+"""
+import importlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenCounter(ABC):
+    """Base class for token counters."""
+    name: str = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Count the tokens in a piece of text."""
+        pass
+
+class HeuristicTokenCounter(TokenCounter):
+    """
+    Fast local token estimate modelled on BPE tokenizers.
+
+    Latin words cost one token per (started) five characters, punctuation one
+    token per mark and CJK ideographs, kana and hangul about 1.5 tokens per
+    character. The estimate errs on the high side so contexts do not overflow.
+    """
+    name = "heuristic"
+    cjk_weight = 1.5
+
+    # Kana, bopomofo, CJK ideographs, hangul syllables, CJK and fullwidth punctuation
+    _CJK_LETTERS = "\u3040-\u30ff\u3100-\u312f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+    _CJK_MARKS = "\u3000-\u303f\uff00-\uffef"
+    _CJK = re.compile(f"[{_CJK_LETTERS}{_CJK_MARKS}]")
+    _PIECES = re.compile(f"[^\\W{_CJK_LETTERS}{_CJK_MARKS}]+|[^\\w\\s{_CJK_MARKS}]")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        cjk = len(self._CJK.findall(text))
+        pieces = sum((len(piece) + 4) // 5 for piece in self._PIECES.findall(text))
+        return pieces + int(cjk * self.cjk_weight + 0.5)
+
+class TiktokenCounter(TokenCounter):
+    """Exact counts for OpenAI models using tiktoken."""
+    name = "tiktoken"
+
+    def __init__(self, model_name: str):
+        tiktoken = importlib.import_module("tiktoken")
+        try:
+            self._encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        self.name = f"tiktoken:{self._encoding.name}"
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: Optional[str] = None) -> TokenCounter:
+    """Get the token counter for a model, falling back to the heuristic."""
+    if model_name and model_name.startswith(("gpt-", "o1", "o3", "text-")):
+        try:
+            return TiktokenCounter(model_name)
+        except ImportError:
+            logger.debug("tiktoken not installed, using heuristic token counts")
+        except Exception as e:
+            logger.warning(f"Failed to load tiktoken encoding for {model_name}: {e}")
+    return HeuristicTokenCounter()
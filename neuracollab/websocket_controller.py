@@ -1,55 +1,333 @@
 """
 Controller for WebSocket connections and real-time updates.
 """
+import asyncio
+import json
 import logging
-from typing import Dict, Any
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set
 from uuid import UUID
 from fastapi import APIRouter, WebSocket
 from starlette.websockets import WebSocketDisconnect
 
 from .cache_pool import NeuralCachePool
 from .engine import CollaborationEngine
+from .config.defaults import WEBSOCKET_DEFAULTS
+from .ws_backplane import Backplane, LocalBackplane, create_backplane
+from .ws_codec import SUBPROTOCOL_PREFIX, Frame, FrameCodec, get_codec, negotiate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Messages where only the latest queued copy matters
+REPLACEABLE_TYPES = frozenset({"status_update", "pong", "history_update"})
+
+class Subscriber:
+    """One WebSocket connection with its own bounded send queue and sender task."""
+
+    def __init__(
+        self,
+        manager: "WebSocketManager",
+        websocket: WebSocket,
+        workflow_id: UUID,
+        codec: Optional[FrameCodec] = None
+    ):
+        self.manager = manager
+        self.websocket = websocket
+        self.workflow_id = workflow_id
+        self.codec = codec or get_codec("json")
+        self.queue: Deque[Frame] = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.sending_since: Optional[float] = None
+        self.sent = 0
+        self.coalesced = 0
+        self.closed = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def offer(self, frame: Frame) -> bool:
+        """Queue a frame without blocking; returns False if the subscriber must be dropped."""
+        if self.closed:
+            return False
+        sending_since = self.sending_since
+        stuck_for = None if sending_since is None else time.monotonic() - sending_since
+        if stuck_for is not None and stuck_for > self.manager.send_timeout:
+            return False  # stuck in a send; checked here rather than with a timer per frame
+        if self.manager.policy == "coalesce" and self._coalesce(frame):
+            self.coalesced += 1
+            return True
+        if len(self.queue) >= self.manager.queue_size:
+            return False
+        self.queue.append(frame)
+        self._ready.set()
+        return True
+
+    def _coalesce(self, frame: Frame) -> bool:
+        """Merge a frame into one still waiting in the queue."""
+        if not self.queue:
+            return False
+        kind, message = frame.type, frame.message
+        tail = self.queue[-1].message
+        if kind == "step_delta" and tail.get("type") == "step_delta" \
+                and tail["data"].get("entry_id") == message["data"].get("entry_id"):
+            # Frames are shared between subscribers, so build a new one
+            self.queue[-1] = Frame({
+                **message,
+                "data": {
+                    **message["data"],
+                    "delta": tail["data"]["delta"] + message["data"]["delta"]
+                }
+            })
+            return True
+        if kind in REPLACEABLE_TYPES:
+            for index in range(len(self.queue) - 1, -1, -1):
+                if self.queue[index].type == kind:
+                    del self.queue[index]
+                    self.queue.append(frame)
+                    return True
+        return False
+
+    async def _run(self) -> None:
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                data = self.queue.popleft().encode(self.codec)
+                self.sending_since = time.monotonic()
+                if self.codec.binary:
+                    await self.websocket.send_bytes(data)
+                else:
+                    await self.websocket.send_text(data)
+                self.sending_since = None
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping WebSocket for workflow {self.workflow_id}: {e}")
+            await self.manager.handle_disconnect(self.workflow_id, self)
+
+    async def receive(self) -> Dict[str, Any]:
+        """Receive and decode one client message in the negotiated encoding."""
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes") is not None:
+            return self.codec.decode(message["bytes"])
+        return json.loads(message["text"])
+
+    async def close(self, code: int = 1000) -> None:
+        """Stop the sender and close the socket."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self._ready.set()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # already gone
+
 class WebSocketManager:
-    def __init__(self, cache_pool: NeuralCachePool, engine: CollaborationEngine):
-        self.active_connections: Dict[UUID, WebSocket] = {}
+    """Topic hub fanning workflow messages out to any number of sockets."""
+
+    def __init__(
+        self,
+        cache_pool: NeuralCachePool,
+        engine: CollaborationEngine,
+        queue_size: int = WEBSOCKET_DEFAULTS["queue_size"],
+        policy: str = WEBSOCKET_DEFAULTS["slow_consumer_policy"],
+        send_timeout: float = WEBSOCKET_DEFAULTS["send_timeout"],
+        backplane: Optional[Backplane] = None
+    ):
+        if policy not in ("coalesce", "drop"):
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.topics: Dict[UUID, Set[Subscriber]] = {}
         self.cache_pool = cache_pool
         self.engine = engine
+        self.queue_size = queue_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.messages = 0
+        self.dropped = 0
+        self.backplane = backplane or LocalBackplane()
+        self.backplane.bind(self.deliver)
 
-    async def connect(self, websocket: WebSocket, workflow_id: UUID):
-        """Connect a new WebSocket client."""
-        await websocket.accept()
-        self.active_connections[workflow_id] = websocket
-        logger.info(f"WebSocket connected for workflow {workflow_id}")
-
-    def disconnect(self, workflow_id: UUID):
-        """Disconnect a WebSocket client."""
-        if workflow_id in self.active_connections:
-            del self.active_connections[workflow_id]
-            logger.info(f"WebSocket disconnected for workflow {workflow_id}")
-
-    async def broadcast(self, workflow_id: UUID, message: Dict[str, Any]):
-        """Broadcast a message to a specific workflow's WebSocket."""
-        if websocket := self.active_connections.get(workflow_id):
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to broadcast message: {e}")
-                await self.handle_disconnect(workflow_id)
+    async def start(self) -> None:
+        """Start receiving messages published by other workers."""
+        await self.backplane.start()
+
+    @property
+    def active_connections(self) -> Dict[UUID, Set[Subscriber]]:
+        """Subscribers per workflow."""
+        return self.topics
+
+    def connection_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self.topics.values())
+
+    async def connect(self, websocket: WebSocket, workflow_id: UUID) -> Subscriber:
+        """Connect a new WebSocket client, negotiating its frame encoding."""
+        offered = [
+            p for p in websocket.scope.get("subprotocols", ()) if p.startswith(SUBPROTOCOL_PREFIX)
+        ]
+        codec = negotiate(offered or websocket.query_params.get("encoding", "json").split(","))
+        selected = SUBPROTOCOL_PREFIX + codec.name
+        if selected in offered:
+            await websocket.accept(subprotocol=selected)
+        else:
+            # Echoing a subprotocol the client did not offer makes it drop the
+            # connection; without one it gets the JSON fallback
+            await websocket.accept()
+        return self.subscribe(websocket, workflow_id, codec)
 
-    async def broadcast_many(self, workflow_ids: list[UUID], message: Dict[str, Any]):
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        workflow_id: UUID,
+        codec: Optional[FrameCodec] = None
+    ) -> Subscriber:
+        """Subscribe an accepted WebSocket to a workflow's messages."""
+        subscriber = Subscriber(self, websocket, workflow_id, codec)
+        self.topics.setdefault(workflow_id, set()).add(subscriber)
+        subscriber.start()
+        logger.info(
+            f"WebSocket connected for workflow {workflow_id} "
+            f"({len(self.topics[workflow_id])} subscribers)"
+        )
+        return subscriber
+
+    def disconnect(self, workflow_id: UUID, subscriber: Optional[Subscriber] = None) -> None:
+        """Unsubscribe one client, or every client of a workflow."""
+        subscribers = self.topics.get(workflow_id)
+        if not subscribers:
+            return
+        if subscriber is None:
+            subscribers.clear()
+        else:
+            subscribers.discard(subscriber)
+        if not subscribers:
+            del self.topics[workflow_id]
+        logger.info(f"WebSocket disconnected for workflow {workflow_id}")
+
+    async def broadcast(self, workflow_id: UUID, message: Dict[str, Any]) -> int:
+        """
+        Publish a message to a workflow's subscribers in every worker.
+
+        Returns the number of subscribers reached in this process.
+        """
+        return await self.backplane.publish(workflow_id, message)
+
+    async def deliver(self, workflow_id: UUID, message: Dict[str, Any]) -> int:
+        """
+        Queue a message for every local subscriber of a workflow.
+
+        Never waits on a socket: each subscriber's sender task delivers its
+        own queue, so one slow client cannot hold up the others.
+        """
+        if workflow_id not in self.topics:
+            return 0
+        self.messages += 1
+        frame = Frame(message)
+        delivered, slow = 0, []
+        for subscriber in self.topics.get(workflow_id, ()):
+            if subscriber.offer(frame):
+                delivered += 1
+            else:
+                slow.append(subscriber)
+        for subscriber in slow:
+            self.dropped += 1
+            logger.warning(f"Dropping slow WebSocket consumer for workflow {workflow_id}")
+            await self.handle_disconnect(workflow_id, subscriber, code=1013)
+        return delivered
+
+    async def broadcast_many(self, workflow_ids: Iterable[UUID], message: Dict[str, Any]) -> int:
         """Broadcast a message to multiple workflows."""
+        delivered = 0
         for workflow_id in workflow_ids:
-            await self.broadcast(workflow_id, message)
+            delivered += await self.broadcast(workflow_id, message)
+        return delivered
+
+    async def send(self, subscriber: Subscriber, message: Dict[str, Any]) -> None:
+        """Queue a reply for a single subscriber."""
+        if not subscriber.offer(Frame(message)):
+            self.dropped += 1
+            await self.handle_disconnect(subscriber.workflow_id, subscriber, code=1013)
+
+    async def history_message(
+        self,
+        workflow_id: UUID,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a history reply for a client.
+
+        With a cursor (the last entry_id the client has) only newer entries
+        are sent as a history_delta; without one, or if the cursor is
+        unknown, the full history is sent as a history_update.
+        """
+        entries = None
+        if after is not None:
+            try:
+                entries = await self.cache_pool.get_history(
+                    workflow_id, limit=limit, after=UUID(str(after))
+                )
+            except (KeyError, ValueError):
+                after = None
+        if entries is None:
+            entries = await self.cache_pool.get_history(workflow_id, limit=limit)
+        cursor = str(entries[-1].entry_id) if entries else after
+        return {
+            "type": "history_delta" if after is not None else "history_update",
+            "data": {
+                "after": after,
+                "cursor": cursor,
+                "more": limit is not None and len(entries) == limit,
+                "entries": [entry.model_dump(mode="json") for entry in entries]
+            }
+        }
 
-    async def handle_disconnect(self, workflow_id: UUID):
+    async def handle_disconnect(
+        self,
+        workflow_id: UUID,
+        subscriber: Optional[Subscriber] = None,
+        code: int = 1000
+    ) -> None:
         """Handle client disconnection."""
-        self.disconnect(workflow_id)
-        # Additional cleanup if needed
-        await self.engine.handle_client_disconnect(workflow_id)
+        targets = [subscriber] if subscriber else list(self.topics.get(workflow_id, ()))
+        self.disconnect(workflow_id, subscriber)
+        for target in targets:
+            await target.close(code)
+        if workflow_id not in self.topics:
+            # Additional cleanup once the last viewer has left
+            if handler := getattr(self.engine, "handle_client_disconnect", None):
+                await handler(workflow_id)
+
+    async def close(self) -> None:
+        """Close every connection and the backplane."""
+        await self.backplane.close()
+        for workflow_id in list(self.topics):
+            await self.handle_disconnect(workflow_id, code=1001)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hub statistics for health reporting."""
+        subscribers = [s for group in self.topics.values() for s in group]
+        return {
+            "workflows": len(self.topics),
+            "connections": len(subscribers),
+            "queued": sum(len(s.queue) for s in subscribers),
+            "messages": self.messages,
+            "coalesced": sum(s.coalesced for s in subscribers),
+            "dropped": self.dropped,
+            "backplane": self.backplane.stats()
+        }
 
 def get_websocket_router(ws_manager: WebSocketManager):
     """Create a router with WebSocket endpoints."""
@@ -57,52 +335,54 @@ def get_websocket_router(ws_manager: WebSocketManager):
     @router.websocket("/ws/{workflow_id}")
     async def websocket_endpoint(websocket: WebSocket, workflow_id: UUID):
         """WebSocket endpoint for real-time workflow updates."""
+        subscriber = None
         try:
-            await ws_manager.connect(websocket, workflow_id)
+            subscriber = await ws_manager.connect(websocket, workflow_id)
 
             try:
                 while True:
-                    data = await websocket.receive_json()
-                    
+                    data = await subscriber.receive()
+
                     # Handle different message types
                     if data.get("type") == "request_history":
-                        history = await ws_manager.cache_pool.get_history(workflow_id)
-                        await ws_manager.broadcast(workflow_id, {
-                            "type": "history_update",
-                            "data": history
-                        })
-                    
+                        await ws_manager.send(subscriber, await ws_manager.history_message(
+                            workflow_id, data.get("after"), data.get("limit")
+                        ))
+
                     elif data.get("type") == "step_status":
                         status = await ws_manager.engine.get_workflow_status(workflow_id)
-                        await ws_manager.broadcast(workflow_id, {
+                        await ws_manager.send(subscriber, {
                             "type": "status_update",
                             "data": status
                         })
-                    
+
                     elif data.get("type") == "ping":
-                        await ws_manager.broadcast(workflow_id, {
+                        await ws_manager.send(subscriber, {
                             "type": "pong",
                             "timestamp": data.get("timestamp")
                         })
 
             except WebSocketDisconnect:
-                await ws_manager.handle_disconnect(workflow_id)
-                
+                await ws_manager.handle_disconnect(workflow_id, subscriber)
+
             except Exception as e:
                 logger.error(f"WebSocket error: {e}")
-                await ws_manager.broadcast(workflow_id, {
+                await ws_manager.send(subscriber, {
                     "type": "error",
                     "message": str(e)
                 })
-                
+
         except Exception as e:
             logger.error(f"WebSocket connection error: {e}")
             # Ensure connection is closed
-            if workflow_id in ws_manager.active_connections:
-                await ws_manager.handle_disconnect(workflow_id)
+            if subscriber is not None:
+                await ws_manager.handle_disconnect(workflow_id, subscriber)
 
     return router
 
 def create_websocket_manager(cache_pool: NeuralCachePool, engine: CollaborationEngine) -> WebSocketManager:
     """Create and configure a WebSocket manager."""
-    return WebSocketManager(cache_pool, engine)
+    backplane = create_backplane(
+        os.getenv("NEURACOLLAB_WS_BACKPLANE", WEBSOCKET_DEFAULTS["backplane"])
+    )
+    return WebSocketManager(cache_pool, engine, backplane=backplane)
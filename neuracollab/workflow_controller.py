@@ -2,9 +2,9 @@
 Controller for managing workflows and their operations.
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, WebSocket, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 
 from .models import (
     WorkflowConfig,
@@ -15,6 +15,8 @@ from .models import (
 from .engine import CollaborationEngine
 from .dispatcher import LLMDispatcher
 from .cache_pool import NeuralCachePool
+from .resilience import GenerationError
+from .websocket_controller import WebSocketManager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -23,7 +25,7 @@ def get_workflow_controller(
     engine: CollaborationEngine,
     dispatcher: LLMDispatcher,
     cache_pool: NeuralCachePool,
-    active_websockets: Dict[UUID, WebSocket]
+    ws_manager: WebSocketManager
 ):
     """Create a router with workflow management endpoints."""
 
@@ -82,11 +84,14 @@ def get_workflow_controller(
     async def get_workflow_history(
         workflow_id: UUID,
         limit: int = Query(50, ge=1, le=1000),
-        offset: int = Query(0, ge=0)
+        offset: int = Query(0, ge=0),
+        after: Optional[UUID] = Query(None, description="Only return entries newer than this entry")
     ) -> List[CacheEntry]:
         """Get workflow history."""
         try:
-            return await cache_pool.get_history(workflow_id, limit, offset)
+            return await cache_pool.get_history(workflow_id, limit, offset, after)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to get workflow history: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -95,29 +100,51 @@ def get_workflow_controller(
     async def execute_step(
         workflow_id: UUID,
         model_name: str = Query(None),
+        stream: bool = Query(False, description="Push step_delta frames while generating"),
         background_tasks: BackgroundTasks = None
     ):
         """Execute next workflow step."""
+        seq = 0
+
+        async def send_delta(entry_id: UUID, text: str):
+            nonlocal seq
+            seq += 1
+            await ws_manager.broadcast(workflow_id, {
+                "type": "step_delta",
+                "data": {
+                    "entry_id": str(entry_id),
+                    "parent_id": str(engine.head(workflow_id)),
+                    "seq": seq,
+                    "delta": text
+                }
+            })
+
         try:
             step_result = await engine.execute_step(
-                workflow_id=workflow_id,
-                model_name=model_name
+                workflow_id,
+                model_name,
+                on_delta=send_delta if stream else None
             )
 
             # Broadcast update to connected clients
-            if websocket := active_websockets.get(workflow_id):
-                background_tasks.add_task(
-                    websocket.send_json,
-                    {
-                        "type": "step_complete",
-                        "data": step_result
-                    }
-                )
+            message = {
+                "type": "step_complete",
+                "data": step_result.model_dump(mode="json")
+            }
+            if stream:
+                # Sent inline so it cannot overtake the last delta
+                await ws_manager.broadcast(workflow_id, message)
+            else:
+                background_tasks.add_task(ws_manager.broadcast, workflow_id, message)
 
             return step_result
         except Exception as e:
             logger.error(f"Failed to execute workflow step: {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+            if stream and seq:
+                await ws_manager.broadcast(workflow_id, {"type": "step_error", "message": str(e)})
+            # No model could answer: nothing was persisted and the step can be retried
+            status_code = 503 if isinstance(e, GenerationError) else 500
+            raise HTTPException(status_code=status_code, detail=str(e))
 
     @router.post("/{workflow_id}/input")
     async def add_user_input(
@@ -164,9 +191,7 @@ def get_workflow_controller(
         try:
             await engine.delete_workflow(workflow_id)
             # Clean up any websocket connections
-            if workflow_id in active_websockets:
-                await active_websockets[workflow_id].close()
-                del active_websockets[workflow_id]
+            await ws_manager.handle_disconnect(workflow_id)
             return {"status": "success"}
         except Exception as e:
             logger.error(f"Failed to delete workflow: {e}")
@@ -0,0 +1,206 @@
+"""
+Broadcast backplanes for fanning WebSocket messages out across processes.
+
+A WebSocketManager only knows the sockets connected to its own process. With
+several uvicorn workers, messages are published through a backplane that
+delivers them to the manager of every worker. LocalBackplane keeps the
+single-process behaviour; SQLiteBackplane shares a table polled by each
+worker. Other brokers (Redis pub/sub, NATS) implement the same interface.
+"""
+import asyncio
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from .config.defaults import WEBSOCKET_DEFAULTS
+from .ws_codec import JSONCodec
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[UUID, Dict[str, Any]], Awaitable[int]]
+
+class Backplane(ABC):
+    """Publishes workflow messages to every process serving WebSockets."""
+    name: str = "base"
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def bind(self, deliver: Deliver) -> None:
+        """Set the callback delivering messages to this process's subscribers."""
+        self._deliver = deliver
+
+    async def start(self) -> None:
+        """Start receiving messages from other processes."""
+        pass
+
+    @abstractmethod
+    async def publish(self, workflow_id: UUID, message: Dict[str, Any]) -> int:
+        """Publish a message; returns the number of local subscribers reached."""
+        pass
+
+    async def close(self) -> None:
+        """Stop delivering messages."""
+        self._deliver = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+class LocalBackplane(Backplane):
+    """In-process delivery for single-worker deployments."""
+    name = "local"
+
+    async def publish(self, workflow_id: UUID, message: Dict[str, Any]) -> int:
+        if self._deliver is None:
+            return 0
+        return await self._deliver(workflow_id, message)
+
+class SQLiteBackplane(Backplane):
+    """
+    Shares messages between workers on one host through a SQLite table.
+
+    Publishing delivers to local subscribers at once and appends the message
+    to the table; every other worker polls for rows newer than the last one
+    it has seen. Old rows are pruned after the retention period.
+    """
+    name = "sqlite"
+
+    def __init__(
+        self,
+        db_path: str,
+        poll_interval: float = WEBSOCKET_DEFAULTS["backplane_poll_interval"],
+        retention: float = WEBSOCKET_DEFAULTS["backplane_retention"],
+        batch_size: int = 500
+    ):
+        super().__init__()
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.batch_size = batch_size
+        self.origin = uuid4().hex
+        self._conn: Optional[sqlite3.Connection] = None
+        # One thread owns the connection, so no locking is needed around it
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="neuracollab-backplane"
+        )
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self._codec = JSONCodec()
+        self.published = 0
+        self.received = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ws_backplane (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                origin TEXT NOT NULL,
+                workflow_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        return conn
+
+    async def start(self) -> None:
+        self._conn = await self._run(self._connect)
+        row = await self._run(
+            lambda: self._conn.execute("SELECT MAX(id) FROM ws_backplane").fetchone()
+        )
+        self._last_id = row[0] or 0
+        self._task = asyncio.create_task(self._poll_loop())
+        logger.info(f"SQLite WebSocket backplane started on {self.db_path}")
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _insert(self, workflow_id: UUID, payload: str) -> None:
+        self._conn.execute(
+            "INSERT INTO ws_backplane (origin, workflow_id, payload, created) VALUES (?, ?, ?, ?)",
+            (self.origin, str(workflow_id), payload, time.time())
+        )
+
+    async def publish(self, workflow_id: UUID, message: Dict[str, Any]) -> int:
+        if self._conn is None or self._deliver is None:
+            raise RuntimeError("Backplane is not started")
+        # Encode first so an unencodable message fails before anyone receives it
+        payload = self._codec.encode(message)
+        delivered = await self._deliver(workflow_id, message)
+        await self._run(self._insert, workflow_id, payload)
+        self.published += 1
+        return delivered
+
+    def _fetch(self) -> List[Tuple[int, str, str, str]]:
+        return self._conn.execute(
+            "SELECT id, origin, workflow_id, payload FROM ws_backplane "
+            "WHERE id > ? ORDER BY id LIMIT ?",
+            (self._last_id, self.batch_size)
+        ).fetchall()
+
+    def _prune(self) -> None:
+        self._conn.execute(
+            "DELETE FROM ws_backplane WHERE created < ?", (time.time() - self.retention,)
+        )
+
+    async def poll(self) -> int:
+        """Deliver messages published by other processes; returns how many."""
+        delivered = 0
+        rows = await self._run(self._fetch)
+        for row_id, origin, workflow_id, payload in rows:
+            self._last_id = row_id
+            if origin == self.origin:
+                continue  # already delivered locally when published
+            self.received += 1
+            delivered += await self._deliver(UUID(workflow_id), self._codec.decode(payload))
+        return delivered
+
+    async def _poll_loop(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            try:
+                await self.poll()
+                if time.monotonic() - last_prune > self.retention:
+                    await self._run(self._prune)
+                    last_prune = time.monotonic()
+            except Exception as e:
+                logger.error(f"Backplane poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+        await super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "published": self.published,
+            "received": self.received,
+            "last_id": self._last_id
+        }
+
+def create_backplane(url: str = WEBSOCKET_DEFAULTS["backplane"]) -> Backplane:
+    """
+    Create a backplane from a URL.
+
+    "local" delivers in-process; "sqlite:///path/to/file.db" shares a
+    SQLite table between workers on the same host.
+    """
+    if url in ("", "local"):
+        return LocalBackplane()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackplane(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported WebSocket backplane: {url}")
@@ -0,0 +1,127 @@
+"""
+WebSocket frame encodings.
+
+Clients negotiate an encoding with the "neuracollab.<codec>" subprotocol or
+an ``?encoding=`` query parameter. JSON text frames are always available;
+msgpack and CBOR binary frames are used when their packages are installed.
+A broadcast is wrapped in a Frame that caches each encoding, so a message
+going to thousands of subscribers is serialised once per codec.
+"""
+import importlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+SUBPROTOCOL_PREFIX = "neuracollab."
+
+def _default(value: Any) -> Any:
+    """Encode the non-native types found in messages."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+class FrameCodec(ABC):
+    """Serialises messages for one wire encoding."""
+    name: str = "base"
+    binary: bool = True
+
+    @abstractmethod
+    def encode(self, message: Dict[str, Any]) -> Union[str, bytes]:
+        pass
+
+    @abstractmethod
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        pass
+
+class JSONCodec(FrameCodec):
+    """Compact JSON text frames."""
+    name = "json"
+    binary = False
+
+    def encode(self, message: Dict[str, Any]) -> str:
+        return json.dumps(message, separators=(",", ":"), default=_default)
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return json.loads(data)
+
+class MsgpackCodec(FrameCodec):
+    """MessagePack binary frames."""
+    name = "msgpack"
+
+    def __init__(self):
+        self._msgpack = importlib.import_module("msgpack")
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return self._msgpack.packb(message, default=_default, use_bin_type=True)
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return self._msgpack.unpackb(data, raw=False)
+
+class CBORCodec(FrameCodec):
+    """CBOR (RFC 8949) binary frames."""
+    name = "cbor"
+
+    def __init__(self):
+        self._cbor2 = importlib.import_module("cbor2")
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return self._cbor2.dumps(
+            message, default=lambda encoder, value: encoder.encode(_default(value))
+        )
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return self._cbor2.loads(data)
+
+_CODEC_TYPES = {"json": JSONCodec, "msgpack": MsgpackCodec, "cbor": CBORCodec}
+_codecs: Dict[str, Optional[FrameCodec]] = {}
+
+def get_codec(name: str) -> Optional[FrameCodec]:
+    """Get a codec by name, or None if unknown or its package is missing."""
+    if name not in _codecs:
+        codec_type = _CODEC_TYPES.get(name)
+        try:
+            _codecs[name] = codec_type() if codec_type else None
+        except ImportError:
+            logger.info(f"WebSocket codec {name} unavailable: package not installed")
+            _codecs[name] = None
+    return _codecs[name]
+
+def available_codecs() -> List[str]:
+    """Names of the codecs usable in this process."""
+    return [name for name in _CODEC_TYPES if get_codec(name) is not None]
+
+def negotiate(requested: Iterable[str]) -> FrameCodec:
+    """Pick the first requested codec that is available, defaulting to JSON."""
+    for name in requested:
+        name = name[len(SUBPROTOCOL_PREFIX):] if name.startswith(SUBPROTOCOL_PREFIX) else name
+        codec = get_codec(name.strip().lower())
+        if codec is not None:
+            return codec
+    return get_codec("json")
+
+class Frame:
+    """A message shared between subscribers, encoded at most once per codec."""
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        self._encoded: Dict[str, Union[str, bytes]] = {}
+
+    def encode(self, codec: FrameCodec) -> Union[str, bytes]:
+        data = self._encoded.get(codec.name)
+        if data is None:
+            data = self._encoded[codec.name] = codec.encode(self.message)
+        return data
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.message.get("type")
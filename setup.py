@@ -4,6 +4,7 @@ setup(
     name="neuracollab",
     version="0.1.0",
     packages=find_packages(),
+    package_data={"neuracollab": ["nltk_data/**/*"]},
     install_requires=[
         # Core dependencies
         "fastapi>=0.100.0",
@@ -0,0 +1,131 @@
+"""
+Tests for the LLM adapters against a local OpenAI-compatible server.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from neuracollab.adapters.llm_adapters import OpenAIGPT4Adapter, create_adapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.resilience import GenerationError, RetryPolicy
+
+TOKENS = ["Once", " upon", " a", " time", ",", " the", " end", "."]
+TOKEN_DELAY = 0.05
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint that streams one token every TOKEN_DELAY seconds."""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if request["messages"][0]["content"] == "fail":
+            self.send_error(500, "upstream failure")
+            return
+        base = {"id": "chatcmpl-test", "created": 0, "model": request["model"]}
+        if not request.get("stream"):
+            time.sleep(TOKEN_DELAY * len(TOKENS))
+            body = json.dumps({
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(TOKENS)},
+                    "finish_reason": "stop"
+                }]
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for token in TOKENS:
+            chunk = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(TOKEN_DELAY)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def openai_url():
+    """Run a fake OpenAI API on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+class TestOpenAIAdapter:
+    """Tests for the asyncio OpenAI adapter."""
+
+    @pytest.mark.asyncio
+    async def test_generate_does_not_block_loop(self, openai_url):
+        """Test a full completion is awaited without stalling the event loop."""
+        adapter = create_adapter("openai", {"api_key": "test-key", "base_url": openai_url})
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        assert await adapter.generate("hello") == "".join(TOKENS)
+        task.cancel()
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_tokens_incrementally(self, openai_url):
+        """Test the first token arrives long before the completion finishes."""
+        adapter = OpenAIGPT4Adapter("test-key", base_url=openai_url)
+        started = time.perf_counter()
+        chunks, first_token = [], None
+        async for chunk in adapter.generate_stream("hello"):
+            first_token = first_token or time.perf_counter() - started
+            chunks.append(chunk)
+        total = time.perf_counter() - started
+
+        assert chunks == TOKENS
+        assert first_token < total / 2
+
+class TestDispatchStream:
+    """Tests for streaming through the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_stream_uses_shared_pool(self, openai_url):
+        """Test streamed generations go through the dispatcher's HTTP pool."""
+        dispatcher = LLMDispatcher()
+        dispatcher.register_adapter("gpt-4", OpenAIGPT4Adapter("test-key", base_url=openai_url))
+        chunks = [chunk async for chunk in dispatcher.dispatch_stream("hello", "gpt-4")]
+
+        assert "".join(chunks) == "".join(TOKENS)
+        assert dispatcher.get_http_stats()["requests"] == 1
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_stream_failure_raises_before_first_token(self, openai_url):
+        """Test an adapter failing before any output is retried, then raised, not replaced."""
+        dispatcher = LLMDispatcher(retry=RetryPolicy(max_retries=1, base_delay=0.01))
+        adapter = OpenAIGPT4Adapter("test-key", base_url=openai_url)
+        adapter._openai = adapter._openai.with_options(max_retries=0)
+        dispatcher.register_adapter("gpt-4", adapter, fallback_models=[])
+        with pytest.raises(GenerationError):
+            _ = [chunk async for chunk in dispatcher.dispatch_stream("fail", "gpt-4")]
+
+        assert dispatcher.get_resilience_stats()["retries"] == 1
+        await dispatcher.aclose()
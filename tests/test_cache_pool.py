@@ -0,0 +1,586 @@
+"""
+Tests for the neural cache pool.
+"""
+import asyncio
+import random
+import subprocess
+import sys
+import pytest
+
+from neuracollab.cache_pool import (
+    NeuralCachePool,
+    ContextCache,
+    ContextCompressor,
+    ContextRecord,
+    HotEntryCache,
+    entry_size,
+    _score_sentences_numpy,
+    _score_sentences_python
+)
+from neuracollab.config.defaults import CACHE_DEFAULTS, MODEL_DEFAULTS
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.engine import CollaborationEngine
+from neuracollab.models import CacheEntry, WorkflowConfig
+from neuracollab.sentences import split_sentences
+from neuracollab.tokenizer import HeuristicTokenCounter, get_token_counter
+from utils import CountingAdapter
+
+def make_entry(parent_id=None, content="content", **kwargs) -> CacheEntry:
+    """Create a cache entry for tests."""
+    return CacheEntry(
+        parent_id=parent_id,
+        content=content,
+        prompt=kwargs.pop("prompt", "prompt"),
+        author=kwargs.pop("author", "User:test"),
+        **kwargs
+    )
+
+@pytest.fixture
+def relay_config():
+    """Workflow config keeping the last three steps."""
+    return WorkflowConfig(mode="relay", prompt_template="{context}")
+
+@pytest.fixture
+def full_history_config():
+    """Workflow config passing the whole history through as plain text."""
+    return WorkflowConfig(
+        mode="custom",
+        prompt_template="{context}",
+        inheritance_rules={"full_history": True, "last_3_steps": False, "prompt_chain": False}
+    )
+
+async def add_labelled_chain(pool: NeuralCachePool, steps: int = 8) -> CacheEntry:
+    """Add a chain whose odd steps carry summaries; returns the last entry."""
+    entry = None
+    for i in range(steps):
+        metadata = {"summary": f"Summary {i}: the keeper lit the lamp."} if i % 2 else {}
+        entry = make_entry(
+            entry.entry_id if entry else None,
+            content=f"Step {i}: the keeper climbed the stairs and looked out to sea.",
+            prompt=f"Continue the story, part {i}.",
+            metadata=metadata
+        )
+        await pool.add_entry(entry)
+    return entry
+
+def make_engine(tmp_path) -> CollaborationEngine:
+    """Engine over a fresh pool whose gpt-4 adapter answers "answer <n>"."""
+    dispatcher = LLMDispatcher()
+    dispatcher.register_adapter("gpt-4", CountingAdapter())
+    pool = NeuralCachePool(db_path=str(tmp_path / "engine.db"))
+    return CollaborationEngine(pool, dispatcher)
+
+class TestWriteBehind:
+    """Tests for the write-behind staging buffer."""
+
+    @pytest.mark.asyncio
+    async def test_staged_entries_visible_before_flush(self, tmp_path):
+        """Test buffered entries can be read before they are committed."""
+        pool = NeuralCachePool(
+            db_path=str(tmp_path / "wb.db"),
+            write_behind=True,
+            durability="buffered",
+            flush_interval=60
+        )
+        root = make_entry(content="root")
+        child = make_entry(root.entry_id, content="child")
+        await pool.add_entry(root)
+        await pool.add_entry(child)
+
+        assert await pool.storage.get(root.entry_id) is None
+        assert (await pool.get_entry(child.entry_id)).content == "child"
+        assert [e.content for e in await pool.get_subtree(root.entry_id)] == ["root", "child"]
+
+        assert await pool.flush() == 2
+        assert (await pool.storage.get(child.entry_id)).content == "child"
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_group_commit_batches_concurrent_writers(self, tmp_path):
+        """Test concurrent group-commit writers share one transaction."""
+        pool = NeuralCachePool(
+            db_path=str(tmp_path / "wb.db"),
+            write_behind=True,
+            durability="group_commit",
+            flush_interval=0.01
+        )
+        writes_before = pool.storage.pool_stats()["writes"]
+        entries = [make_entry(content=f"entry {i}") for i in range(20)]
+        await asyncio.gather(*(pool.add_entry(entry) for entry in entries))
+
+        # Acknowledged entries are durable
+        for entry in entries:
+            assert await pool.storage.get(entry.entry_id) is not None
+        assert pool.storage.pool_stats()["writes"] - writes_before < len(entries)
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_staged_entries(self, tmp_path):
+        """Test shutdown flushes entries still in the buffer."""
+        db_path = str(tmp_path / "wb.db")
+        pool = NeuralCachePool(
+            db_path=db_path, write_behind=True, durability="buffered", flush_interval=60
+        )
+        entry = make_entry()
+        await pool.add_entry(entry)
+        await pool.close()
+
+        reopened = NeuralCachePool(db_path=db_path)
+        assert await reopened.get_entry(entry.entry_id) is not None
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_entries_are_not_served(self, tmp_path, relay_config, monkeypatch):
+        """Test an entry whose insert fails is dropped from memory along with contexts using it."""
+        pool = NeuralCachePool(
+            db_path=str(tmp_path / "wb.db"),
+            write_behind=True,
+            durability="buffered",
+            flush_interval=60
+        )
+        good, bad = make_entry(content="good"), make_entry(content="bad")
+        await pool.add_entry(good)
+        await pool.add_entry(bad)
+        assert "bad" in await pool.get_context(bad.entry_id, relay_config)
+
+        insert = pool.storage.insert
+
+        async def failing_insert_many(entries):
+            raise RuntimeError("batch failed")
+
+        async def failing_insert(entry):
+            if entry.entry_id == bad.entry_id:
+                raise RuntimeError("row failed")
+            return await insert(entry)
+
+        monkeypatch.setattr(pool.storage, "insert_many", failing_insert_many)
+        monkeypatch.setattr(pool.storage, "insert", failing_insert)
+        assert await pool.flush() == 1
+
+        assert await pool.get_entry(bad.entry_id) is None
+        assert (await pool.get_entry(good.entry_id)).content == "good"
+        assert pool.get_context_cache_stats()["entries"] == 0
+        await pool.close()
+
+    def test_rejects_unknown_durability(self, tmp_path):
+        """Test invalid durability levels are rejected."""
+        with pytest.raises(ValueError):
+            NeuralCachePool(db_path=str(tmp_path / "wb.db"), durability="fsync-maybe")
+
+class TestContextHistory:
+    """Tests for history selection used to build step context."""
+
+    @pytest.mark.asyncio
+    async def test_last_3_steps_uses_ancestors(self, tmp_path, relay_config):
+        """Test only the nearest three ancestors feed the context."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "ctx.db"))
+        parent_id = None
+        for i in range(6):
+            entry = make_entry(parent_id, content=f"step {i}", metadata={"role": "writer"})
+            await pool.add_entry(entry)
+            parent_id = entry.entry_id
+
+        history = await pool._get_relevant_history(parent_id, relay_config)
+        assert [e.content for e in history] == ["step 3", "step 4", "step 5"]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_engine_steps_see_previous_steps(self, tmp_path, full_history_config):
+        """Test each engine step continues from, and sees, the step before it."""
+        engine = make_engine(tmp_path)
+        workflow_id = await engine.start_workflow(full_history_config, "INITIAL.")
+        steps = [await engine.execute_step(workflow_id, "gpt-4") for _ in range(3)]
+
+        assert [step.prompt for step in steps] == [
+            "INITIAL.",
+            "INITIAL.\n\nanswer 1",
+            "INITIAL.\n\nanswer 1\n\nanswer 2"
+        ]
+        assert [step.parent_id for step in steps] == [
+            workflow_id, steps[0].entry_id, steps[1].entry_id
+        ]
+        assert engine.head(workflow_id) == steps[-1].entry_id
+        await engine.cache.close()
+        await engine.dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_ancestors_span_staged_and_stored_entries(self, tmp_path):
+        """Test ancestor chains join unflushed entries to stored ones."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "ctx.db"))
+        root = make_entry(content="stored")
+        await pool.add_entry(root)
+
+        pool.write_behind, pool.durability, pool.flush_interval = True, "buffered", 60
+        child = make_entry(root.entry_id, content="staged")
+        await pool.add_entry(child)
+
+        assert [e.content for e in await pool.get_ancestors(child.entry_id)] == ["stored", "staged"]
+        assert [e.content for e in await pool.get_ancestors(child.entry_id, 1)] == ["staged"]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("staged", [False, True])
+    async def test_history_after_cursor(self, tmp_path, staged):
+        """Test a history cursor returns only newer entries, stored or staged."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "history.db"))
+        if staged:
+            pool.write_behind, pool.durability, pool.flush_interval = True, "buffered", 60
+        root = make_entry(content="step 0")
+        await pool.add_entry(root)
+        entries, parent_id = [root], root.entry_id
+        for i in range(1, 6):
+            entry = make_entry(parent_id, content=f"step {i}")
+            await pool.add_entry(entry)
+            entries.append(entry)
+            parent_id = entry.entry_id
+
+        history = await pool.get_history(root.entry_id, after=entries[2].entry_id)
+        assert [e.content for e in history] == ["step 3", "step 4", "step 5"]
+        page = await pool.get_history(root.entry_id, limit=2, after=entries[2].entry_id)
+        assert [e.content for e in page] == ["step 3", "step 4"]
+        assert await pool.get_history(root.entry_id, after=entries[-1].entry_id) == []
+        with pytest.raises(KeyError):
+            await pool.get_history(root.entry_id, after=make_entry().entry_id)
+        await pool.close()
+
+class TestContextCache:
+    """Tests for the memoized context builder."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("rules,mode", [
+        ({"last_3_steps": True, "full_history": False, "prompt_chain": True}, "relay"),
+        ({"last_3_steps": False, "full_history": True, "prompt_chain": False}, "debate"),
+        ({"last_3_steps": False, "full_history": False, "prompt_chain": True}, "relay"),
+    ])
+    async def test_derived_context_matches_full_build(self, tmp_path, rules, mode):
+        """Test contexts derived from a cached parent equal a fresh build."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "ctx.db"))
+        config = WorkflowConfig(mode=mode, prompt_template="{context}", inheritance_rules=rules)
+        parent_id, contexts = None, {}
+        for i in range(6):
+            metadata = {"role": "writer"} if i % 2 else {}
+            entry = make_entry(
+                parent_id, content=f"step {i}", prompt=f"prompt {i}", metadata=metadata
+            )
+            await pool.add_entry(entry)
+            contexts[entry.entry_id] = await pool.get_context(entry.entry_id, config)
+            parent_id = entry.entry_id
+
+        assert pool.get_context_cache_stats()["derived"] == 5
+        for entry_id, context in contexts.items():
+            history = await pool._get_relevant_history(entry_id, config)
+            assert context == pool._build_raw_context(history, config)
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_are_counted(self, tmp_path, relay_config):
+        """Test repeated lookups are served from the cache."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "ctx.db"))
+        entry = make_entry()
+        await pool.add_entry(entry)
+        first = await pool.get_context(entry.entry_id, relay_config)
+        assert await pool.get_context(entry.entry_id, relay_config) == first
+
+        stats = pool.get_context_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_engine_steps_derive_fresh_contexts(self, tmp_path, full_history_config):
+        """Test engine steps derive each context from the last one and never see stale text."""
+        engine = make_engine(tmp_path)
+        workflow_id = await engine.start_workflow(full_history_config, "INITIAL.")
+        root_context = await engine.cache.get_context(workflow_id, full_history_config, "gpt-4")
+        assert root_context == "INITIAL."
+        steps = [await engine.execute_step(workflow_id, "gpt-4") for _ in range(3)]
+
+        assert steps[-1].prompt == "INITIAL.\n\nanswer 1\n\nanswer 2"
+        stats = engine.cache.get_context_cache_stats()
+        assert (stats["hits"], stats["misses"], stats["derived"]) == (1, 3, 2)
+        context = await engine.cache.get_context(steps[-1].entry_id, full_history_config, "gpt-4")
+        assert context == "INITIAL.\n\nanswer 1\n\nanswer 2\n\nanswer 3"
+        await engine.cache.close()
+        await engine.dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_unstored_entry_is_not_memoized(self, tmp_path, full_history_config):
+        """Test asking for an entry's context before it is stored does not pin an empty one."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "ctx.db"))
+        entry = make_entry(content="late")
+        assert await pool.get_context(entry.entry_id, full_history_config) == ""
+        await pool.add_entry(entry)
+        assert await pool.get_context(entry.entry_id, full_history_config) == "late"
+        await pool.close()
+
+    def test_lru_eviction_respects_byte_budget(self):
+        """Test least recently used contexts are evicted over budget."""
+        cache = ContextCache(max_bytes=100)
+        cache.put("a", ContextRecord(("x" * 20,), "x" * 20))
+        cache.put("b", ContextRecord(("y" * 20,), "y" * 20))
+        cache.get("a")
+        cache.put("c", ContextRecord(("z" * 20,), "z" * 20))
+
+        assert cache.peek("b") is None
+        assert cache.peek("a") is not None and cache.peek("c") is not None
+        assert cache.current_bytes <= 100
+        assert cache.evictions == 1
+
+class TestHotTier:
+    """Tests for the in-memory hot-entry tier in front of SQLite."""
+
+    def test_byte_accounting(self):
+        """Test the tier tracks the exact row size of what it holds."""
+        hot = HotEntryCache(max_bytes=10 ** 6, compression_enabled=False)
+        entries = [make_entry(content="x" * n, metadata={"n": n}) for n in (10, 200, 3000)]
+        for entry in entries:
+            hot.put(entry)
+        assert hot.current_bytes == sum(entry_size(entry) for entry in entries)
+        hot.put(entries[0])  # replacing does not double count
+        hot.remove(entries[1].entry_id)
+        assert hot.current_bytes == entry_size(entries[0]) + entry_size(entries[2])
+        hot.clear()
+        assert hot.current_bytes == 0 and not hot.entries
+
+    @pytest.mark.parametrize("policy", ["lru", "lfu", "size"])
+    def test_recently_or_frequently_read_entry_survives(self, policy):
+        """Test every policy keeps a read entry and stays within budget."""
+        a, b, c = (make_entry(content=letter * 1000) for letter in "abc")
+        hot = HotEntryCache(
+            max_bytes=int(2.5 * entry_size(a)), policy=policy, compression_enabled=False
+        )
+        hot.put(a)
+        hot.put(b)
+        assert hot.get(a.entry_id) is a
+        hot.put(c)
+
+        assert b.entry_id not in hot
+        assert a.entry_id in hot and c.entry_id in hot
+        assert hot.current_bytes <= hot.max_bytes and hot.evictions == 1
+
+    def test_lfu_keeps_frequent_entry_over_recent_one(self):
+        """Test LFU evicts the least read entry even if it was read recently."""
+        a, b, c = (make_entry(content=letter * 1000) for letter in "abc")
+        hot = HotEntryCache(
+            max_bytes=int(2.5 * entry_size(a)), policy="lfu", compression_enabled=False
+        )
+        hot.put(a)
+        hot.put(b)
+        for _ in range(3):
+            hot.get(a.entry_id)
+        hot.get(b.entry_id)
+        hot.put(c)
+        assert b.entry_id not in hot and a.entry_id in hot
+
+    def test_size_policy_prefers_evicting_large_entries(self):
+        """Test the size-aware policy drops one large entry rather than many small ones."""
+        large = make_entry(content="L" * 5000)
+        small = [make_entry(content=f"small {i}") for i in range(5)]
+        budget = entry_size(large) + sum(entry_size(entry) for entry in small)
+        hot = HotEntryCache(max_bytes=budget, policy="size", compression_enabled=False)
+        hot.put(large)
+        for entry in small:
+            hot.put(entry)
+        hot.put(make_entry(content="one more"))
+        assert large.entry_id not in hot
+        assert all(entry.entry_id in hot for entry in small)
+
+    def test_cold_entries_are_compressed_past_threshold(self):
+        """Test entries are compressed before anything is evicted, and read back intact."""
+        entries = [make_entry(content=f"step {i} " * 300) for i in range(4)]
+        hot = HotEntryCache(max_bytes=3 * entry_size(entries[0]), compression_threshold=0.5)
+        for entry in entries:
+            hot.put(entry)
+
+        assert len(hot.entries) == 4 and hot.evictions == 0
+        assert hot.compressed_entries > 0 and hot.compression_ratio() < 1.0
+        restored = hot.get(entries[0].entry_id)
+        assert restored.model_dump() == entries[0].model_dump()
+
+    @pytest.mark.asyncio
+    async def test_pool_counts_hits_and_misses(self, tmp_path):
+        """Test lookups served from memory and from SQLite are counted exactly."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "hot.db"), max_size_mb=10)
+        parent_id = None
+        for i in range(4):
+            entry = make_entry(parent_id, content=f"step {i}")
+            await pool.add_entry(entry)
+            parent_id = entry.entry_id
+
+        assert len(await pool.get_ancestors(parent_id)) == 4
+        assert (pool.hits, pool.misses) == (4, 0)
+
+        pool.clear()
+        assert len(pool.entries) == 0 and pool.current_size == 0
+        assert (await pool.get_entry(parent_id)).content == "step 3"
+        ancestors = await pool.get_ancestors(parent_id)
+        assert [e.content for e in ancestors] == [f"step {i}" for i in range(4)]
+        assert (pool.hits, pool.misses) == (5, 4)  # one ancestor was loaded by get_entry
+        assert pool.get_miss_rate() == pytest.approx(4 / 9)
+        await pool.vacuum()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_shrinking_budget_evicts(self, tmp_path):
+        """Test lowering max_size_mb evicts down to the new budget."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "hot.db"), compression_enabled=False)
+        for i in range(10):
+            await pool.add_entry(make_entry(content="x" * 1000))
+        pool.max_size_mb = 3000 / (1024 * 1024)
+        assert pool.hot.current_bytes <= 3000 and 0 < len(pool.entries) < 10
+        with pytest.raises(ValueError):
+            pool.eviction_policy = "random"
+        await pool.close()
+
+class TestContextCompressor:
+    """Tests for sentence density scoring and selection."""
+
+    @staticmethod
+    def random_sentences(seed: int, alphabet: str):
+        rng = random.Random(seed)
+        vocabulary = [
+            "therefore", "THUS", "Hence", "concluded", "important", "signiﬁcant",
+            "key", "CRITICAL", "42", "１２", "thuſ", "Key", "İmportant",
+            "story", "council", "　", " ", "天下", "行动", "step"
+        ]
+        sentences = []
+        for _ in range(rng.randint(4, 60)):
+            words = rng.choices(vocabulary, k=rng.randint(0, 12))
+            words += ["".join(rng.choices(alphabet, k=rng.randint(1, 6)))]
+            separator = rng.choice([" ", "  ", "\t", "\n"])
+            sentences.append(separator.join(words) + rng.choice([".", "!", "?", "。"]))
+        return sentences
+
+    @pytest.mark.parametrize("seed", range(25))
+    @pytest.mark.parametrize("alphabet", ["abcdefghik 0123", "abcdé ſ٣  "])
+    def test_vectorized_scores_match_reference(self, seed, alphabet):
+        """Test vectorized density scores equal per-sentence regex scoring."""
+        sentences = self.random_sentences(seed, alphabet)
+        assert list(_score_sentences_numpy(sentences)) == _score_sentences_python(sentences)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_vectorized_selection_matches_reference(self, seed):
+        """Test argsort/cumsum selection picks the same sentences as the greedy loop."""
+        compressor = ContextCompressor()
+        sentences = self.random_sentences(seed, "abcdefghik 0123")
+        lengths = [len(sentence) for sentence in sentences]
+        for target in (0, 50, 200, 1000, 10_000):
+            assert compressor.select_sentences(sentences, target) == \
+                compressor._select_python(sentences, target, lengths)
+
+    def test_fallback_splitter(self):
+        """Test the built-in splitter handles abbreviations and CJK punctuation."""
+        text = "Dr. Smith arrived at 3.30 p.m. today. Was it late? 他来了。她也来了！\n\nThe end"
+        assert split_sentences(text) == [
+            "Dr. Smith arrived at 3.30 p.m. today.",
+            "Was it late?",
+            "他来了。",
+            "她也来了！",
+            "The end",
+        ]
+
+    def test_import_does_not_load_nltk(self):
+        """Test importing the cache pool leaves NLTK unloaded until first use."""
+        code = "import sys, neuracollab.cache_pool; print('nltk' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "False"
+
+class TestTokenBudget:
+    """Tests for token-based context packing."""
+
+    def test_heuristic_counter(self):
+        """Test the heuristic counter weighs CJK text per character."""
+        counter = HeuristicTokenCounter()
+        assert counter.count("") == 0
+        assert counter.count("Hello, world!") == 4
+        assert counter.count("根据以下上下文继续创作") > len("根据以下上下文继续创作")
+
+    def test_budget_follows_model_defaults(self, tmp_path):
+        """Test the history budget comes from the model's context window."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "tok.db"), max_context_tokens=1234)
+        gpt4 = MODEL_DEFAULTS["gpt-4"]
+        assert pool.context_budget("gpt-4") == (
+            gpt4["context_window"] - gpt4["max_tokens"] - CACHE_DEFAULTS["context_reserve_tokens"]
+        )
+        assert pool.context_budget("unknown-model") == 1234
+
+    @pytest.mark.asyncio
+    async def test_entries_cache_token_counts(self, tmp_path):
+        """Test token counts are stored in entry metadata on insert."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "tok.db"))
+        entry = make_entry(content="Hello, world!")
+        await pool.add_entry(entry)
+        stored = await pool.storage.get(entry.entry_id)
+        assert stored.metadata["token_count"]["content"] == 4
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_context_packed_to_budget(self, tmp_path):
+        """Test history is packed newest first within the token budget."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "tok.db"), max_context_tokens=60)
+        counter = HeuristicTokenCounter()
+        config = WorkflowConfig(
+            mode="custom",
+            prompt_template="{context}",
+            inheritance_rules={"full_history": True, "last_3_steps": False, "prompt_chain": False}
+        )
+        parent_id = None
+        for i in range(10):
+            content = f"Step {i} adds twenty characters of story text here."
+            entry = make_entry(parent_id, content=content)
+            await pool.add_entry(entry)
+            parent_id = entry.entry_id
+
+        context = await pool.get_context(parent_id, config, "unknown-model")
+        assert counter.count(context) <= 60
+        assert context.endswith("Step 9 adds twenty characters of story text here.")
+        assert "Step 0" not in context
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_block_labels_counted_exactly(self, tmp_path, relay_config):
+        """Test labelled blocks are costed as written, so an exact budget keeps them whole."""
+        counter = HeuristicTokenCounter()
+        pool = NeuralCachePool(db_path=str(tmp_path / "tok.db"))
+        head = await add_labelled_chain(pool, steps=3)
+        history = await pool._get_relevant_history(head.entry_id, relay_config)
+        raw = pool._build_raw_context(history, relay_config)
+
+        pool.max_context = counter.count(raw)
+        assert await pool.get_context(head.entry_id, relay_config, "unknown-model") == raw
+        pool.max_context -= 1
+        context = await pool.get_context(head.entry_id, relay_config, "unknown-model")
+        assert context != raw and counter.count(context) <= pool.max_context
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_tiktoken_context_within_budget(self, tmp_path, relay_config):
+        """Test the packed context stays within the budget when counted with tiktoken."""
+        pytest.importorskip("tiktoken")
+        counter = get_token_counter("gpt-4-budget-test")
+        if not counter.name.startswith("tiktoken"):
+            pytest.skip("tiktoken encoding unavailable offline")
+        for budget in (40, 90, 150):
+            pool = NeuralCachePool(
+                db_path=str(tmp_path / f"tok{budget}.db"), max_context_tokens=budget
+            )
+            head = await add_labelled_chain(pool)
+            context = await pool.get_context(head.entry_id, relay_config, "gpt-4-budget-test")
+            assert 0 < counter.count(context) <= budget
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_branch_entries_use_the_write_path(self, tmp_path):
+        """Test branch entries get cached token counts and count as writes."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "tok.db"))
+        base = make_entry(content="Hello, world!")
+        await pool.add_entry(base)
+        writes = pool.writes
+
+        branch_id = await pool.create_branch(base.entry_id, "Try another ending.")
+        stored = await pool.storage.get(branch_id)
+        assert stored.metadata["token_count"]["content"] == 4
+        assert pool.writes == writes + 1
+        await pool.close()
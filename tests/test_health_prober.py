@@ -0,0 +1,102 @@
+"""
+Tests for background adapter health probing.
+"""
+import asyncio
+import time
+import pytest
+
+from neuracollab.adapters.llm_adapters import LLMAdapter, OllamaAdapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.health_prober import HealthProber
+from utils import FakeClock
+
+class ProbedAdapter(LLMAdapter):
+    """Adapter whose backend health is scripted by the test."""
+    def __init__(self, name: str, healthy: bool = True, delay: float = 0.0):
+        self.name = name
+        self.healthy = healthy
+        self.delay = delay
+        self.probes = 0
+        self.availability_checks = 0
+
+    def is_available(self) -> bool:
+        self.availability_checks += 1
+        return True
+
+    async def probe(self) -> bool:
+        self.probes += 1
+        await asyncio.sleep(self.delay)
+        return self.healthy
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        return self.name
+
+class TestHealthProber:
+    """Tests for probe caching, expiry and scheduling."""
+
+    @pytest.mark.asyncio
+    async def test_results_cached_until_ttl(self):
+        """Test tracked adapters are probed once and cached until the TTL expires."""
+        clock = FakeClock()
+        prober = HealthProber(ttl=10, clock=clock)
+        adapter = ProbedAdapter("a", healthy=False)
+        prober.track("a", adapter)
+        await asyncio.sleep(0.01)
+
+        assert prober.status("a") is False
+        assert prober.is_available("a", adapter) is False
+        clock.now += 11
+        assert prober.status("a") is None
+        assert prober.is_available("a", adapter) is True  # falls back to the adapter's own state
+        assert adapter.probes == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_probe_times_out(self):
+        """Test a hanging backend is marked unhealthy after the probe timeout."""
+        prober = HealthProber(probe_timeout=0.01)
+        prober.track("slow", ProbedAdapter("slow", delay=1))
+        assert await prober.probe("slow") is False
+        assert "timed out" in prober.snapshot()["slow"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_background_loop_probes_on_interval(self):
+        """Test the loop keeps probing with a jittered interval and stops cleanly."""
+        prober = HealthProber(interval=0.01, jitter=0.5)
+        assert all(0.005 <= prober.next_delay() <= 0.015 for _ in range(100))
+        adapter = ProbedAdapter("a")
+        prober.track("a", adapter)
+        prober.start()
+        await asyncio.sleep(0.1)
+        await prober.stop()
+        assert adapter.probes >= 3
+
+class TestDispatcherHealth:
+    """Tests for dispatching on cached health."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_skips_unhealthy_adapter_without_io(self):
+        """Test dispatch reads cached health instead of checking the backend."""
+        dispatcher = LLMDispatcher(health=HealthProber(ttl=60))
+        down, up = ProbedAdapter("down", healthy=False), ProbedAdapter("up")
+        dispatcher.register_adapter("down", down)
+        dispatcher.register_adapter("up", up)
+        await dispatcher.health.probe_all()
+        probes = down.probes + up.probes
+
+        assert await dispatcher.dispatch("prompt", "down") == "up"
+        assert down.probes + up.probes == probes
+        assert dispatcher.get_available_models() == {"down": False, "up": True}
+        dispatcher.remove_adapter("down")
+        assert "down" not in dispatcher.get_health()
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_ollama_constructor_does_not_block(self):
+        """Test creating an Ollama adapter performs no I/O until probed."""
+        started = time.perf_counter()
+        adapter = OllamaAdapter("llama3", "http://127.0.0.1:9")
+        assert time.perf_counter() - started < 0.05
+        assert adapter.is_available()  # unknown is treated as available
+        assert await adapter.probe() is False
+        assert not adapter.is_available()
+        await adapter.http_pool.aclose()
@@ -0,0 +1,97 @@
+"""
+Tests for hedged dispatch.
+"""
+import asyncio
+import time
+import pytest
+
+from neuracollab.adapters.llm_adapters import LLMAdapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.hedging import HedgePolicy
+from neuracollab.routing import Router
+
+class DelayedAdapter(LLMAdapter):
+    """Adapter answering with its name after scripted delays."""
+    def __init__(self, name: str, delays):
+        self.name = name
+        self.delays = list(delays)
+        self.calls = 0
+        self.cancelled = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def probe(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.name
+
+def make_dispatcher(primary_delays, backup_delays, **policy):
+    """Dispatcher whose primary has a learned latency of about 10ms."""
+    hedging = HedgePolicy(min_samples=5, min_delay=0.01, **policy)
+    dispatcher = LLMDispatcher(router=Router(), hedging=hedging)
+    primary = DelayedAdapter("primary", primary_delays)
+    backup = DelayedAdapter("backup", backup_delays)
+    dispatcher.register_adapter("primary", primary)
+    dispatcher.register_adapter("backup", backup)
+    for _ in range(10):
+        dispatcher.router.observe("primary", 0.01)
+    return dispatcher, primary, backup
+
+class TestHedgedDispatch:
+    """Tests for hedging, cancellation and the spend cap."""
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self):
+        """Test a backup answers a primary running past its percentile; the loser is cancelled."""
+        dispatcher, primary, backup = make_dispatcher([1.0], [0.01])
+        started = time.perf_counter()
+        assert await dispatcher.dispatch("p", "primary", hedge=True) == "backup"
+        assert time.perf_counter() - started < 0.5
+        assert primary.cancelled == 1
+
+        stats = dispatcher.get_hedging_stats()
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+        assert dispatcher.get_rate_limit_stats()["primary"]["active"] == 0
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_and_opt_out_are_not_hedged(self):
+        """Test no duplicate is sent when the primary is quick or hedging is off."""
+        dispatcher, primary, backup = make_dispatcher([0.001, 0.2], [0.001])
+        assert await dispatcher.dispatch("p", "primary", hedge=True) == "primary"
+        assert await dispatcher.dispatch("p", "primary") == "primary"
+        assert backup.calls == 0
+        assert dispatcher.get_hedging_stats()["hedged"] == 0
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_spend_cap_limits_duplicates(self):
+        """Test hedges stop once the duplicated-spend budget is used up."""
+        dispatcher, primary, backup = make_dispatcher([0.1], [0.05], max_ratio=0.0, burst=1)
+        assert await dispatcher.dispatch("p", "primary", hedge=True) == "backup"
+        assert await dispatcher.dispatch("p", "primary", hedge=True) == "primary"
+
+        stats = dispatcher.get_hedging_stats()
+        assert stats["hedged"] == 1 and stats["over_budget"] == 1
+        assert backup.calls == 1
+        await dispatcher.aclose()
+
+    def test_percentile_needs_samples(self):
+        """Test no hedge delay is offered before enough latencies are known."""
+        router = Router()
+        router.track("a")
+        policy = HedgePolicy(percentile=0.9, min_samples=10)
+        for i in range(1, 10):
+            router.observe("a", i / 100)
+        assert policy.delay(router, "a") is None
+        router.observe("a", 0.10)
+        assert policy.delay(router, "a") == pytest.approx(0.09)
@@ -0,0 +1,93 @@
+"""
+Tests for the shared HTTP client pool.
+"""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from neuracollab.adapters.llm_adapters import OllamaAdapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.http_pool import HTTPClientPool
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive Ollama API."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply({"version": "0.0.0-test"})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._reply({"response": f"echo: {request['prompt']}", "done": True})
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def ollama_url():
+    """Run a fake Ollama server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+class TestHTTPClientPool:
+    """Tests for connection reuse and accounting."""
+
+    @pytest.mark.asyncio
+    async def test_requests_reuse_keepalive_connection(self, ollama_url):
+        """Test sequential generations share one TCP connection."""
+        dispatcher = LLMDispatcher()
+        adapter = OllamaAdapter("llama3", ollama_url)
+        dispatcher.register_adapter("llama3", adapter)
+        assert adapter.http_pool is dispatcher.http_pool
+        await asyncio.gather(*dispatcher.health._pending)  # registration probe
+
+        for i in range(5):
+            assert await dispatcher.dispatch(f"prompt {i}", "llama3") == f"echo: prompt {i}"
+
+        stats = dispatcher.get_http_stats()
+        assert stats["requests"] == 6  # five generations and the registration probe
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 5
+        assert stats["connections_open"] == 1
+
+        await dispatcher.aclose()
+        assert not dispatcher.get_http_stats()["active"]
+
+    @pytest.mark.asyncio
+    async def test_closed_connections_are_counted(self, ollama_url):
+        """Test open and closed counts follow a connection through close."""
+        pool = HTTPClientPool()
+        for _ in range(3):
+            response = await pool.client.get(f"{ollama_url}/api/version")
+            assert response.status_code == 200
+        stats = pool.stats()
+        assert (stats["connections_open"], stats["connections_closed"]) == (1, 0)
+
+        await pool.aclose()
+        stats = pool.stats()
+        assert (stats["connections_open"], stats["connections_closed"]) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_limits_and_timeout_from_defaults(self):
+        """Test the client is configured from API_DEFAULTS."""
+        pool = HTTPClientPool(max_connections=7, timeout=12)
+        client = pool.client
+        assert client.timeout.read == 12
+        assert pool.stats()["max_connections"] == 7
+        await pool.aclose()
+        assert pool.client is not client  # reopened on demand after close
+        await pool.aclose()
@@ -0,0 +1,158 @@
+"""
+Tests for the background cache maintenance scheduler.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from neuracollab.cache_pool import NeuralCachePool
+from neuracollab.config.defaults import STORAGE_DEFAULTS
+from neuracollab.maintenance import MaintenanceScheduler
+from neuracollab.models import CacheEntry
+
+OLD = datetime.now() - timedelta(days=7)
+
+def make_entry(parent_id=None, content="content", **kwargs) -> CacheEntry:
+    """Create a cache entry for tests."""
+    return CacheEntry(
+        parent_id=parent_id, content=content, prompt="prompt", author="User:test", **kwargs
+    )
+
+@pytest.fixture
+def pool(tmp_path):
+    """Cache pool on a fresh database; tests close it themselves."""
+    return NeuralCachePool(db_path=str(tmp_path / "maintenance.db"))
+
+def scheduler(pool, **kwargs) -> MaintenanceScheduler:
+    kwargs.setdefault("quiet_period", 0)
+    return MaintenanceScheduler(pool, **kwargs)
+
+class TestMaintenance:
+    """Tests for the individual maintenance tasks."""
+
+    @pytest.mark.asyncio
+    async def test_prunes_detached_branches_after_grace(self, pool):
+        """Test old entries with a missing parent are removed with their descendants."""
+        root = make_entry(content="kept")
+        await pool.add_entry(root)
+        orphan = make_entry(uuid4(), content="orphan", timestamp=OLD)
+        child = make_entry(orphan.entry_id, content="orphan child", timestamp=OLD)
+        recent = make_entry(uuid4(), content="recent orphan")
+        for entry in (orphan, child, recent):
+            await pool.add_entry(entry)
+
+        report = await scheduler(pool).run_once()
+        assert report["pruned"] == 2
+        assert await pool.storage.get(orphan.entry_id) is None
+        assert await pool.storage.get(child.entry_id) is None
+        assert orphan.entry_id not in pool.hot
+        assert await pool.storage.get(recent.entry_id) is not None
+        assert await pool.storage.get(root.entry_id) is not None
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_incremental_vacuum_frees_pages(self, pool):
+        """Test pages freed by pruning are returned to the filesystem."""
+        for _ in range(200):
+            await pool.add_entry(make_entry(uuid4(), content="x" * 4000, timestamp=OLD))
+
+        report = await scheduler(pool).run_once()
+        assert report["pruned"] == 200 and report["pages_freed"] > 0
+        with pool.storage.sync._read_connection() as conn:
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_compresses_cold_entries_only(self, pool):
+        """Test the least recently used half of the hot tier is compressed."""
+        entries = [make_entry(content=f"step {i} " * 200) for i in range(10)]
+        for entry in entries:
+            await pool.add_entry(entry)
+
+        report = await scheduler(pool).run_once()
+        assert report["compressed"] == 5 and pool.hot.compressed_entries == 5
+        assert (await pool.get_entry(entries[0].entry_id)).content == entries[0].content
+        assert pool.get_compression_ratio() < 1.0
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_batches_adapt_to_slice_budget(self, pool):
+        """Test slow slices halve the batch and fast ones grow it."""
+        clock = [0.0]
+        maintenance = scheduler(pool, slice_seconds=1.0, clock=lambda: clock[0])
+        sizes = []
+
+        async def slow_step(batch):
+            sizes.append(batch)
+            clock[0] += 2.0
+            return batch if len(sizes) < 3 else 0
+
+        await maintenance._sliced("slow", slow_step)
+        assert sizes == [64, 32, 16]
+
+        async def fast_step(batch):
+            sizes.append(batch)
+            return batch if len(sizes) < 6 else 0
+
+        await maintenance._sliced("slow", fast_step)
+        assert sizes[3:] == [8, 16, 32]
+        await pool.close()
+
+class TestForeground:
+    """Tests for yielding to foreground traffic."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_quiet_pool(self, pool):
+        """Test slices wait while the pool or the busy signal shows activity."""
+        signals = iter([True, True, False])
+        maintenance = scheduler(pool, quiet_period=0.001, busy=lambda: next(signals, False))
+        await maintenance._wait_for_quiet()
+        assert maintenance.deferrals == 2
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_sustained_load_still_progresses(self, pool):
+        """Test maintenance runs anyway once max_deferral has passed."""
+        maintenance = scheduler(pool, quiet_period=0.001, max_deferral=0.01, busy=lambda: True)
+        report = await maintenance.run_once()
+        assert maintenance.deferrals > 0 and maintenance.runs == 1
+        assert report["pruned"] == 0
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, pool):
+        """Test the periodic loop can be started and cancelled."""
+        maintenance = scheduler(pool, interval=3600)
+        maintenance.start()
+        assert maintenance.stats()["running"]
+        await maintenance.stop()
+        assert not maintenance.stats()["running"]
+        await pool.close()
+
+
+class TestStoredCompression:
+    """Tests for dictionary training and recompression during maintenance."""
+
+    @pytest.mark.asyncio
+    async def test_trains_dictionary_and_recompresses(self, tmp_path, monkeypatch):
+        """Test a dictionary is trained once enough rows exist and old rows are rewritten."""
+        monkeypatch.setitem(STORAGE_DEFAULTS, "dictionary_min_rows", 20)
+        pool = NeuralCachePool(db_path=str(tmp_path / "maintenance.db"), storage_compression="zlib")
+        for i in range(30):
+            content = (
+                f"Step {i}:\nThe keeper climbed the spiral stairs again.\n"
+                "The lamp was still lit.\n"
+            )
+            await pool.add_entry(make_entry(content=content * 2))
+        await pool.flush()
+
+        maintenance = scheduler(pool)
+        report = await maintenance.run_once()
+        assert report["dictionary"] is not None and report["recompressed"] == 30
+        stats = await pool.storage.compression_stats()
+        assert stats["by_codec"]["zlib"]["rows"] == 30
+
+        # Nothing left to rewrite until the dictionary changes
+        assert "recompressed" not in await maintenance.run_once()
+        await pool.close()
@@ -0,0 +1,129 @@
+"""
+Tests for per-adapter rate limiting and fair queueing.
+"""
+import asyncio
+import pytest
+
+from neuracollab.adapters.llm_adapters import LLMAdapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.rate_limiter import RateLimiter, TokenBucket
+from utils import FakeClock
+
+class SlowAdapter(LLMAdapter):
+    """Adapter tracking how many generations run at once."""
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def probe(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return prompt
+
+async def drain():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+class TestTokenBucket:
+    """Tests for the token bucket."""
+
+    def test_refills_at_rate(self):
+        """Test tokens refill continuously up to the capacity."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+        bucket.take()
+        bucket.take()
+        assert bucket.delay() == pytest.approx(0.5)
+        clock.now += 0.5
+        assert bucket.delay() == 0
+        clock.now += 100
+        bucket.take()
+        assert bucket.tokens == pytest.approx(1)
+
+class TestRateLimiter:
+    """Tests for rate, concurrency and fairness."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_spaces_requests(self):
+        """Test requests beyond the burst wait for refilled tokens."""
+        clock = FakeClock()
+        limiter = RateLimiter(
+            rate_limit=60, max_concurrency=100, burst=2, clock=clock, sleep=clock.sleep
+        )
+        started = clock.now
+        for _ in range(5):
+            await limiter.acquire("wf")
+            limiter.release()
+
+        assert clock.now - started == pytest.approx(3.0)  # 2 burst, then one per second
+        stats = limiter.stats()
+        assert stats["granted"] == 5
+        assert stats["throttled"] == 3
+        assert stats["wait_max"] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_fair_across_workflows(self):
+        """Test a workflow with a backlog does not starve another one."""
+        clock = FakeClock()
+        limiter = RateLimiter(rate_limit=None, max_concurrency=1, clock=clock, sleep=clock.sleep)
+        order = []
+
+        async def request(key, i):
+            async with limiter.slot(key):
+                order.append((key, i))
+                await asyncio.sleep(0)
+
+        await limiter.acquire("busy")
+        tasks = [asyncio.create_task(request("busy", i)) for i in range(4)]
+        await drain()
+        tasks.append(asyncio.create_task(request("quiet", 0)))
+        await drain()
+        assert limiter.stats()["queued"] == 5
+        assert limiter.stats()["queued_workflows"] == 2
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order.index(("quiet", 0)) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        """Test cancelling a queued request neither grants nor leaks a slot."""
+        limiter = RateLimiter(rate_limit=None, max_concurrency=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await drain()
+        waiter.cancel()
+        await drain()
+        limiter.release()
+        await asyncio.wait_for(limiter.acquire(), 1)
+        assert limiter.active == 1
+        await limiter.close()
+
+class TestDispatcherLimits:
+    """Tests for limits applied by the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_per_adapter(self):
+        """Test parallel dispatches never exceed the adapter's concurrency cap."""
+        dispatcher = LLMDispatcher()
+        adapter = SlowAdapter()
+        dispatcher.register_adapter("model", adapter, rate_limit=10000, max_concurrency=2)
+        results = await asyncio.gather(*(
+            dispatcher.dispatch(f"p{i}", "model", workflow_id=i % 3) for i in range(10)
+        ))
+
+        assert results == [f"p{i}" for i in range(10)]
+        assert adapter.peak == 2
+        stats = dispatcher.get_rate_limit_stats()["model"]
+        assert stats["granted"] == 10 and stats["active"] == 0
+        assert stats["throttled"] == 8
+        await dispatcher.aclose()
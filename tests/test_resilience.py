@@ -0,0 +1,157 @@
+"""
+Tests for retries, circuit breakers and fallback chains.
+"""
+import asyncio
+import pytest
+
+from neuracollab.adapters.llm_adapters import LLMAdapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.resilience import (
+    CircuitBreaker,
+    GenerationError,
+    RetryPolicy,
+    is_retryable
+)
+from utils import FakeClock
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class ProviderError(Exception):
+    """Error shaped like an openai/httpx status error."""
+    def __init__(self, status_code: int, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+class ScriptedAdapter(LLMAdapter):
+    """Adapter raising the scripted errors in turn, then answering with its name."""
+    def __init__(self, name: str, errors=()):
+        self.name = name
+        self.errors = list(errors)
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def probe(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        if self.errors:
+            error = self.errors.pop(0) if len(self.errors) > 1 else self.errors[0]
+            if error is not None:
+                raise error
+        return self.name
+
+async def no_sleep(seconds: float):
+    await asyncio.sleep(0)
+
+class TestPolicies:
+    """Tests for error classification, backoff and the breaker state machine."""
+
+    def test_retryable_errors(self):
+        """Test rate limits, 5xx and timeouts are retried; client errors are not."""
+        assert is_retryable(ProviderError(429))
+        assert is_retryable(ProviderError(503))
+        assert is_retryable(asyncio.TimeoutError())
+        assert not is_retryable(ProviderError(400))
+        assert not is_retryable(ValueError("bad prompt"))
+
+    def test_backoff_is_exponential_and_capped(self):
+        """Test backoff doubles per attempt, is jittered, capped, and honours Retry-After."""
+        policy = RetryPolicy(base_delay=0.5, max_delay=3, rng=lambda: 1.0)
+        assert [policy.backoff(i) for i in range(4)] == [0.5, 1.0, 2.0, 3]
+        assert RetryPolicy(base_delay=0.5, rng=lambda: 0.25).backoff(2) == 0.5
+        assert policy.backoff(0, ProviderError(429, {"retry-after": "2"})) == 2.0
+        assert policy.backoff(0, ProviderError(429, {"retry-after": "60"})) == 3
+
+    def test_breaker_opens_half_opens_and_closes(self):
+        """Test the closed -> open -> half-open -> closed cycle."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        clock.now += 10
+        assert breaker.allow() and breaker.state == "half_open"
+        assert not breaker.allow()  # one trial at a time
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock.now += 10
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.stats()["times_opened"] == 2
+
+class TestDispatcherResilience:
+    """Tests for the policy layer inside the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self):
+        """Test a provider recovering within the retry budget still answers."""
+        dispatcher = LLMDispatcher(retry=RetryPolicy(max_retries=2, sleep=no_sleep))
+        adapter = ScriptedAdapter("flaky", [ProviderError(503), ProviderError(429), None])
+        dispatcher.register_adapter("flaky", adapter)
+
+        assert await dispatcher.dispatch("p", "flaky") == "flaky"
+        assert adapter.calls == 3
+        assert dispatcher.get_resilience_stats()["retries"] == 2
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_fallback_chain_from_model_defaults(self):
+        """Test gpt-4 falls back to llama3 as listed in MODEL_DEFAULTS."""
+        dispatcher = LLMDispatcher(retry=RetryPolicy(max_retries=2, sleep=no_sleep))
+        primary = ScriptedAdapter("gpt-4", [ProviderError(401)])
+        dispatcher.register_adapter("gpt-4", primary)
+        dispatcher.register_adapter("llama3", ScriptedAdapter("llama3"))
+
+        assert dispatcher.fallback_chain("gpt-4") == ["gpt-4", "llama3"]
+        assert await dispatcher.dispatch("p", "gpt-4") == "llama3"
+        assert primary.calls == 1  # client errors are not retried
+        assert dispatcher.get_resilience_stats()["fallbacks_used"] == 1
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_exhausted_chain_raises_instead_of_placeholder(self):
+        """Test a failed generation raises rather than returning test text."""
+        dispatcher = LLMDispatcher(retry=RetryPolicy(max_retries=1, sleep=no_sleep))
+        dispatcher.register_adapter(
+            "a", ScriptedAdapter("a", [ProviderError(500)]), fallback_models=["b"]
+        )
+        dispatcher.register_adapter(
+            "b", ScriptedAdapter("b", [ProviderError(500)]), fallback_models=[]
+        )
+
+        with pytest.raises(GenerationError) as info:
+            await dispatcher.dispatch("p", "a")
+        assert [name for name, _ in info.value.failures] == ["a", "b"]
+        assert dispatcher.get_resilience_stats()["exhausted"] == 1
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_broken_provider(self):
+        """Test a provider with an open circuit is not called at all."""
+        dispatcher = LLMDispatcher(retry=RetryPolicy(max_retries=0, sleep=no_sleep))
+        broken = ScriptedAdapter("broken", [ConnectionError("refused")])
+        dispatcher.register_adapter(
+            "broken",
+            broken,
+            fallback_models=["healthy"],
+            breaker=CircuitBreaker(failure_threshold=2)
+        )
+        dispatcher.register_adapter("healthy", ScriptedAdapter("healthy"))
+
+        for _ in range(2):
+            assert await dispatcher.dispatch("p", "broken") == "healthy"
+        assert dispatcher.get_resilience_stats()["breakers"]["broken"]["state"] == "open"
+        assert not dispatcher.is_adapter_available("broken")
+
+        assert await dispatcher.dispatch("p", "broken") == "healthy"
+        assert broken.calls == 2
+        await dispatcher.aclose()
@@ -0,0 +1,114 @@
+"""
+Tests for the exact-match LLM response cache.
+"""
+import pytest
+
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.response_cache import ResponseCache, cache_key
+from utils import FakeClock, CountingAdapter
+
+class TestResponseCache:
+    """Tests for keys, tiers, expiry and the size budget."""
+
+    def test_key_normalization(self):
+        """Test whitespace and parameter order do not change the key; content does."""
+        base = cache_key("gpt-4", "hello\nworld", {"temperature": 0, "max_tokens": 5})
+        assert cache_key("gpt-4", "hello  \r\nworld\n", {"max_tokens": 5, "temperature": 0}) == base
+        assert cache_key("gpt-4", "hello world", {"temperature": 0, "max_tokens": 5}) != base
+        assert cache_key("llama3", "hello\nworld", {"temperature": 0, "max_tokens": 5}) != base
+
+    def test_only_deterministic_calls_are_cacheable(self):
+        """Test temperature 0 is cacheable and sampled calls are not."""
+        assert ResponseCache.cacheable("gpt-4", {"temperature": 0})
+        assert not ResponseCache.cacheable("gpt-4", {"temperature": 0.7})
+        assert not ResponseCache.cacheable("gpt-4", {})  # MODEL_DEFAULTS samples
+
+    @pytest.mark.asyncio
+    async def test_memory_hit_and_miss(self):
+        """Test a stored response is returned and counted."""
+        cache = ResponseCache()
+        assert await cache.get("k") is None
+        await cache.put("k", "gpt-4", "response")
+        assert await cache.get("k") == "response"
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """Test a new cache instance answers from the SQLite tier."""
+        db_path = str(tmp_path / "cache.db")
+        cache = ResponseCache(db_path=db_path)
+        await cache.put("k", "gpt-4", "persisted")
+        await cache.close()
+
+        reopened = ResponseCache(db_path=db_path)
+        assert await reopened.get("k") == "persisted"
+        assert reopened.stats()["disk_hits"] == 1
+        assert await reopened.get("k") == "persisted"
+        assert reopened.stats()["disk_hits"] == 1  # promoted into memory
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, tmp_path):
+        """Test entries are not served after their TTL in either tier."""
+        clock = FakeClock()
+        cache = ResponseCache(db_path=str(tmp_path / "cache.db"), ttl=60, clock=clock)
+        await cache.put("k", "gpt-4", "stale soon")
+        clock.now += 59
+        assert await cache.get("k") == "stale soon"
+        clock.now += 1
+        assert await cache.get("k") is None
+        assert cache.stats()["expired"] == 1
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_size_budget_evicts_least_recently_used(self, tmp_path):
+        """Test the SQLite tier stays within budget by dropping the oldest-used rows."""
+        clock = FakeClock()
+        cache = ResponseCache(
+            db_path=str(tmp_path / "cache.db"),
+            max_size_mb=3000 / (1024 * 1024),
+            memory_bytes=0,
+            clock=clock
+        )
+        for key in ("a", "b", "c"):
+            clock.now += 1
+            await cache.put(key, "gpt-4", "x" * 1000)
+        clock.now += 1
+        assert await cache.get("a") is not None  # "b" is now least recently used
+        clock.now += 1
+        await cache.put("d", "gpt-4", "x" * 1000)
+
+        assert await cache.get("b") is None
+        for key in ("a", "c", "d"):
+            assert await cache.get(key) is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1 and stats["disk_bytes"] <= stats["max_bytes"]
+        await cache.close()
+
+class TestDispatcherCaching:
+    """Tests for the response cache inside the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_deterministic_requests_are_served_from_cache(self):
+        """Test temperature 0 requests reach the provider once; others every time."""
+        dispatcher = LLMDispatcher(response_cache=ResponseCache())
+        adapter = CountingAdapter()
+        dispatcher.register_adapter("gpt-4", adapter)
+
+        for _ in range(3):
+            assert await dispatcher.dispatch("p", "gpt-4", temperature=0) == "answer 1"
+        assert await dispatcher.dispatch("p", "gpt-4", temperature=0.7) == "answer 2"
+        assert await dispatcher.dispatch("p", "gpt-4", temperature=0, cache=False) == "answer 3"
+        assert adapter.calls == 3
+        assert dispatcher.get_response_cache_stats()["hits"] == 2
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_placeholder_answers_are_not_cached(self):
+        """Test the fallback answer given without adapters is never stored."""
+        dispatcher = LLMDispatcher(response_cache=ResponseCache())
+        await dispatcher.dispatch("p", temperature=0)
+        assert dispatcher.get_response_cache_stats()["stores"] == 0
+        await dispatcher.aclose()
@@ -0,0 +1,127 @@
+"""
+Tests for latency- and priority-aware routing.
+"""
+import asyncio
+import pytest
+
+from neuracollab.adapters.llm_adapters import LLMAdapter
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.routing import Router
+from utils import FakeClock
+
+class NamedAdapter(LLMAdapter):
+    """Adapter answering with its own name after a delay."""
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+
+    def is_available(self) -> bool:
+        return True
+
+    async def probe(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        await asyncio.sleep(self.delay)
+        return self.name
+
+class TestRouter:
+    """Tests for adapter ranking."""
+
+    def test_priority_orders_untried_adapters(self):
+        """Test configured priority decides before any latency is known."""
+        router = Router()
+        router.track("backup", priority=5)
+        router.track("primary", priority=1)
+        assert router.rank(["backup", "primary"]) == ["primary", "backup"]
+        assert router.choose(["backup", "primary"]) == "primary"
+
+    def test_latency_error_and_load_raise_cost(self):
+        """Test slow, failing or busy adapters rank below a healthy one."""
+        router = Router(alpha=0.5)
+        for name in ("a", "b"):
+            router.track(name)
+            router.observe(name, 1.0)
+
+        router.observe("a", 3.0)
+        assert router.rank(["a", "b"]) == ["b", "a"]
+        router.observe("a", 1.0)
+        router.observe("a", 1.0)
+        router.observe("a", 1.0, failed=True)
+        assert router.rank(["a", "b"]) == ["b", "a"]
+        assert router.stats()["adapters"]["a"]["errors"] == 1
+
+        router = Router()
+        router.track("a")
+        router.track("b")
+        with router.request("a"):
+            assert router.rank(["a", "b"]) == ["b", "a"]
+            assert router.stats()["adapters"]["a"]["in_flight"] == 1
+
+    def test_requested_model_kept_until_much_slower(self):
+        """Test the requested model is only abandoned past the reroute factor."""
+        router = Router(alpha=1.0, reroute_factor=2.0)
+        router.track("requested")
+        router.track("other")
+        router.observe("other", 1.0)
+
+        router.observe("requested", 1.5)
+        assert router.choose(["requested", "other"], "requested") == "requested"
+        router.observe("requested", 5.0)
+        assert router.choose(["requested", "other"], "requested") == "other"
+        assert router.stats()["rerouted"] == 1
+
+    def test_rerouted_model_is_retried(self):
+        """Test a model routed around is periodically tried again."""
+        router = Router(alpha=1.0, explore_every=3)
+        router.track("requested")
+        router.track("other")
+        router.observe("other", 1.0)
+        router.observe("requested", 10.0)
+        choices = [router.choose(["requested", "other"], "requested") for _ in range(6)]
+        assert choices == ["other", "other", "requested"] * 2
+
+    def test_request_records_latency_from_start(self):
+        """Test queueing before start() is excluded from the latency sample."""
+        clock = FakeClock()
+        router = Router(clock=clock)
+        router.track("a")
+        with router.request("a") as timer:
+            clock.now += 10  # waiting for a rate-limit slot
+            timer.start()
+            clock.now += 0.5
+        assert router.metrics("a").latency == pytest.approx(0.5)
+
+        with pytest.raises(RuntimeError):
+            with router.request("a"):
+                raise RuntimeError("boom")
+        assert router.metrics("a").error_rate > 0
+
+class TestDispatcherRouting:
+    """Tests for routing inside the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_routes_around_slow_provider(self):
+        """Test traffic moves off a provider once it slows down."""
+        dispatcher = LLMDispatcher(router=Router(alpha=0.5))
+        dispatcher.register_adapter("slow", NamedAdapter("slow", delay=0.05))
+        dispatcher.register_adapter("fast", NamedAdapter("fast", delay=0.001))
+
+        assert await dispatcher.dispatch("p", "fast") == "fast"
+        answers = [await dispatcher.dispatch("p", "slow") for _ in range(6)]
+        assert answers[0] == "slow"
+        assert answers[-1] == "fast"
+
+        stats = dispatcher.get_routing_stats()
+        assert stats["rerouted"] >= 1
+        assert stats["adapters"]["slow"]["latency_ewma"] > stats["adapters"]["fast"]["latency_ewma"]
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_unknown_model_uses_priority(self):
+        """Test an unregistered model name routes to the preferred adapter."""
+        dispatcher = LLMDispatcher()
+        dispatcher.register_adapter("second", NamedAdapter("second"), priority=10)
+        dispatcher.register_adapter("first", NamedAdapter("first"), priority=1)
+        assert await dispatcher.dispatch("p", "gpt-4") == "first"
+        await dispatcher.aclose()
@@ -0,0 +1,102 @@
+"""
+Tests for the near-duplicate prompt cache.
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.semantic_cache import SemanticCache
+from utils import CountingAdapter
+
+BASE_PROMPT = (
+    "You are continuing a collaborative writing process.\n\n"
+    "Previous content:\nThe lighthouse keeper found a sealed letter washed up on the rocks "
+    "and carried it up the spiral stairs to read by the lamp.\n\n"
+    "Continue in the same style and tone, adding meaningful progress "
+    "while maintaining consistency with the established narrative."
+)
+OTHER_PROMPT = (
+    "You are participating in a structured debate.\n\n"
+    "Previous arguments:\nCities should replace private cars with free public transit "
+    "because congestion costs more than the subsidy.\n\n"
+    "Analyze the arguments presented and provide a well-reasoned response."
+)
+
+class TestSemanticCache:
+    """Tests for similarity search, scoping and instrumentation."""
+
+    def test_near_duplicate_hits_and_unrelated_misses(self):
+        """Test a prompt with one extra sentence is served; a different one is not."""
+        cache = SemanticCache(threshold=0.8)
+        cache.add("gpt-4", BASE_PROMPT, {}, "cached answer")
+        cache.add("gpt-4", OTHER_PROMPT, {}, "debate answer")
+
+        response, similarity = cache.lookup("gpt-4", BASE_PROMPT + " Keep it short.", {})
+        assert response == "cached answer" and 0.8 <= similarity < 1.0
+        unrelated = "Summarize the quarterly sales report for the board."
+        assert cache.lookup("gpt-4", unrelated, {}) is None
+        stats = cache.stats()
+        assert stats["lookups"] == 2 and stats["hits"] == 1 and stats["hit_rate"] == 0.5
+
+    def test_matches_are_scoped_to_model_and_parameters(self):
+        """Test a prompt cached for one model or temperature is not served to another."""
+        cache = SemanticCache(threshold=0.8)
+        cache.add("gpt-4", BASE_PROMPT, {"temperature": 0}, "cached answer")
+        assert cache.lookup("llama3", BASE_PROMPT, {"temperature": 0}) is None
+        assert cache.lookup("gpt-4", BASE_PROMPT, {"temperature": 1}) is None
+        assert cache.lookup("gpt-4", BASE_PROMPT, {"temperature": 0})[0] == "cached answer"
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the index stays within max_entries and keeps recently used prompts."""
+        cache = SemanticCache(threshold=0.9, max_entries=2)
+        cache.add("gpt-4", BASE_PROMPT, {}, "story")
+        cache.add("gpt-4", OTHER_PROMPT, {}, "debate")
+        assert cache.lookup("gpt-4", BASE_PROMPT, {}) is not None
+        recipe = "Translate the following recipe for lemon cake into French."
+        cache.add("gpt-4", recipe, {}, "recette")
+
+        assert len(cache) == 2 and cache.stats()["evictions"] == 1
+        assert cache.lookup("gpt-4", OTHER_PROMPT, {}) is None
+        assert cache.lookup("gpt-4", BASE_PROMPT, {})[0] == "story"
+
+    def test_audits_count_false_hits(self):
+        """Test a fresh answer unlike the cached one is recorded as a false hit."""
+        cache = SemanticCache(audit_rate=1.0)
+        assert cache.should_audit()
+        cached = "the keeper opened the letter"
+        assert not cache.record_audit(cached, cached + " slowly")
+        assert cache.record_audit(cached, "transit subsidies reduce congestion")
+        stats = cache.stats()
+        assert stats["audits"] == 2 and stats["false_hits"] == 1 and stats["false_hit_rate"] == 0.5
+
+class TestDispatcherSemanticCache:
+    """Tests for the semantic tier inside the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_near_duplicates_reuse_answers_when_opted_in(self):
+        """Test semantic=True serves near-duplicates; the default does not."""
+        dispatcher = LLMDispatcher(semantic_cache=SemanticCache(threshold=0.8, audit_rate=0.0))
+        adapter = CountingAdapter()
+        dispatcher.register_adapter("gpt-4", adapter)
+
+        assert await dispatcher.dispatch(BASE_PROMPT, "gpt-4", semantic=True) == "answer 1"
+        similar = BASE_PROMPT + " Keep it short."
+        assert await dispatcher.dispatch(similar, "gpt-4", semantic=True) == "answer 1"
+        assert await dispatcher.dispatch(similar, "gpt-4") == "answer 2"
+        assert adapter.calls == 2
+        assert dispatcher.get_semantic_cache_stats()["hits"] == 1
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_audited_hits_answer_fresh(self):
+        """Test an audited hit calls the provider and records the comparison."""
+        dispatcher = LLMDispatcher(semantic_cache=SemanticCache(threshold=0.8, audit_rate=1.0))
+        adapter = CountingAdapter()
+        dispatcher.register_adapter("gpt-4", adapter)
+
+        await dispatcher.dispatch(BASE_PROMPT, "gpt-4", semantic=True)
+        similar = BASE_PROMPT + " Keep it short."
+        assert await dispatcher.dispatch(similar, "gpt-4", semantic=True) == "answer 2"
+        assert dispatcher.get_semantic_cache_stats()["audits"] == 1
+        await dispatcher.aclose()
@@ -0,0 +1,100 @@
+"""
+Tests for coalescing identical in-flight requests.
+"""
+import asyncio
+import pytest
+
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.single_flight import SingleFlight, request_key
+from utils import CountingAdapter
+
+class TestSingleFlight:
+    """Tests for the single-flight primitive."""
+
+    def test_key_covers_model_prompt_and_kwargs(self):
+        """Test keys differ by model, prompt and kwargs but not kwarg order."""
+        key = request_key("gpt-4", "p", {"temperature": 0.7, "max_tokens": 10})
+        assert key == request_key("gpt-4", "p", {"max_tokens": 10, "temperature": 0.7})
+        assert key != request_key("llama3", "p", {"temperature": 0.7, "max_tokens": 10})
+        assert key != request_key("gpt-4", "q", {"temperature": 0.7, "max_tokens": 10})
+        assert key != request_key("gpt-4", "p", {"temperature": 0.2, "max_tokens": 10})
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """Test a failed shared call raises for all callers and is then forgotten."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_call_cancelled_only_without_waiters(self):
+        """Test one caller leaving keeps the call alive; the last one cancels it."""
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flight.in_flight() == 0
+
+class TestDispatcherDedup:
+    """Tests for coalescing inside the dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_identical_prompts_share_one_generation(self):
+        """Test concurrent identical requests reach the provider once."""
+        dispatcher = LLMDispatcher()
+        adapter = CountingAdapter(delay=0.02)
+        dispatcher.register_adapter("model", adapter)
+
+        results = await asyncio.gather(
+            *(dispatcher.dispatch("same", "model", workflow_id=i) for i in range(5))
+        )
+        assert results == ["answer 1"] * 5
+        assert adapter.calls == 1
+        assert dispatcher.get_dedup_stats()["hits"] == 4
+
+        await dispatcher.dispatch("same", "model")
+        assert adapter.calls == 2  # finished requests are not cached
+        await dispatcher.aclose()
+
+    @pytest.mark.asyncio
+    async def test_opt_out_keeps_samples_independent(self):
+        """Test dedupe=False sends every request."""
+        dispatcher = LLMDispatcher()
+        adapter = CountingAdapter(delay=0.02)
+        dispatcher.register_adapter("model", adapter)
+
+        results = await asyncio.gather(
+            *(dispatcher.dispatch("same", "model", dedupe=False) for _ in range(3))
+        )
+        assert sorted(results) == ["answer 1", "answer 2", "answer 3"]
+        assert dispatcher.get_dedup_stats()["hits"] == 0
+        await dispatcher.aclose()
@@ -0,0 +1,298 @@
+"""
+Tests for the SQLite storage layer.
+"""
+import sqlite3
+import threading
+import pytest
+
+from neuracollab import storage as storage_module
+from neuracollab.models import CacheEntry
+from neuracollab.storage import SQLiteConnector, AsyncSQLiteConnector
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create a connector backed by a temporary database."""
+    connector = SQLiteConnector(str(tmp_path / "test.db"), pool_size=2)
+    yield connector
+    connector.close()
+
+def make_entry(parent=None, content="content", **kwargs) -> CacheEntry:
+    """Create a cache entry for tests."""
+    return CacheEntry(
+        parent_id=parent.entry_id if parent else None,
+        content=content,
+        prompt=kwargs.pop("prompt", "prompt"),
+        author=kwargs.pop("author", "User:test"),
+        **kwargs
+    )
+
+class TestConnectionPool:
+    """Tests for the pooled connection manager."""
+
+    def test_wal_and_pragmas(self, storage):
+        """Test connections are opened in WAL mode with tuned pragmas."""
+        with storage._read_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] < 0
+
+    def test_connections_are_reused(self, storage):
+        """Test repeated operations do not open new connections."""
+        opened = storage.pool_stats()["connections_opened"]
+        root = make_entry()
+        storage.insert(root)
+        for _ in range(20):
+            assert storage.get(root.entry_id).content == "content"
+        stats = storage.pool_stats()
+        assert stats["connections_opened"] == opened
+        assert stats["reads"] >= 20
+        assert stats["writes"] >= 1
+        assert stats["idle_readers"] == stats["readers"] == 2
+
+    def test_concurrent_reads_during_writes(self, storage):
+        """Test readers and the writer can be used from several threads."""
+        root = make_entry()
+        storage.insert(root)
+        errors = []
+
+        def write():
+            try:
+                for i in range(25):
+                    storage.insert(make_entry(root, content=f"child {i}"))
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+
+        def read():
+            try:
+                for _ in range(25):
+                    assert storage.get(root.entry_id) is not None
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+
+        threads = [threading.Thread(target=write)]
+        threads += [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert len(storage.get_children(root.entry_id)) == 25
+
+    def test_in_memory_database(self):
+        """Test in-memory databases share the writer connection."""
+        connector = SQLiteConnector(":memory:")
+        entry = make_entry()
+        connector.insert(entry)
+        assert connector.get(entry.entry_id).entry_id == entry.entry_id
+        assert connector.pool_stats()["readers"] == 0
+        connector.close()
+        with pytest.raises(RuntimeError):
+            connector.get(entry.entry_id)
+
+class TestAsyncSQLiteConnector:
+    """Tests for the asyncio storage front-end."""
+
+    @pytest.mark.asyncio
+    async def test_async_interface(self, tmp_path):
+        """Test the async connector mirrors the sync interface."""
+        connector = AsyncSQLiteConnector(str(tmp_path / "async.db"), pool_size=2)
+        root = make_entry()
+        child = make_entry(root, content="child")
+        assert await connector.insert(root) == root.entry_id
+        await connector.insert(child)
+
+        assert (await connector.get(child.entry_id)).content == "child"
+        assert [e.entry_id for e in await connector.get_children(root.entry_id)] == [child.entry_id]
+        assert len(await connector.get_branch(root.entry_id)) == 2
+        await connector.close()
+
+    @pytest.mark.asyncio
+    async def test_io_runs_off_the_event_loop(self, tmp_path):
+        """Test storage calls execute on the dedicated I/O threads."""
+        connector = AsyncSQLiteConnector(str(tmp_path / "async.db"))
+        thread_name = await connector._run(lambda: threading.current_thread().name)
+        assert thread_name.startswith("neuracollab-sqlite")
+        await connector.close()
+
+class TestAncestryIndex:
+    """Tests for the materialized-path ancestry index."""
+
+    def build_chain(self, storage, length: int):
+        entries, parent = [], None
+        for i in range(length):
+            entry = make_entry(parent, content=f"step {i}")
+            storage.insert(entry)
+            entries.append(entry)
+            parent = entry
+        return entries
+
+    def test_get_ancestors(self, storage):
+        """Test ancestor chains are returned oldest first and honour the limit."""
+        chain = self.build_chain(storage, 6)
+        head = chain[-1].entry_id
+        assert [e.content for e in storage.get_ancestors(head, 3)] == ["step 3", "step 4", "step 5"]
+        assert len(storage.get_ancestors(head)) == 6
+        assert storage.get_ancestors(chain[0].entry_id) == [chain[0]]
+
+    def test_get_subtree(self, storage):
+        """Test subtrees include the entry and every descendant only."""
+        chain = self.build_chain(storage, 4)
+        sibling = make_entry(chain[1], content="sibling")
+        storage.insert(sibling)
+        unrelated = make_entry(content="other root")
+        storage.insert(unrelated)
+
+        subtree = storage.get_subtree(chain[1].entry_id)
+        assert {e.content for e in subtree} == {"step 1", "step 2", "step 3", "sibling"}
+        assert storage.get_subtree(unrelated.entry_id) == [unrelated]
+
+    def test_batch_insert_resolves_parents_in_batch(self, storage):
+        """Test insert_many indexes children whose parent is in the same batch."""
+        root = make_entry()
+        child = make_entry(root)
+        grandchild = make_entry(child)
+        storage.insert_many([root, child, grandchild])
+        assert [e.entry_id for e in storage.get_ancestors(grandchild.entry_id)] == [
+            root.entry_id, child.entry_id, grandchild.entry_id
+        ]
+
+    def test_deep_chain_read_in_batches(self, storage, monkeypatch):
+        """Test chains longer than the bound-variable limit are fetched in batches."""
+        monkeypatch.setattr(storage_module, "MAX_VARIABLES", 4)
+        chain = [make_entry()]
+        for _ in range(9):
+            chain.append(make_entry(chain[-1]))
+        storage.insert_many(chain)
+        assert storage.get_ancestors(chain[-1].entry_id) == chain
+
+    def test_backfill_legacy_database(self, tmp_path):
+        """Test databases created without the index are migrated on open."""
+        db_path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE cache_entries (
+                entry_id TEXT PRIMARY KEY, parent_id TEXT, content TEXT NOT NULL,
+                prompt TEXT NOT NULL, author TEXT NOT NULL, timestamp DATETIME NOT NULL,
+                metadata TEXT
+            )
+        """)
+        root = make_entry()
+        child = make_entry(root)
+        grandchild = make_entry(child)
+        for entry in (root, child, grandchild):
+            conn.execute(
+                "INSERT INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(entry.entry_id),
+                    str(entry.parent_id) if entry.parent_id else None,
+                    entry.content, entry.prompt, entry.author,
+                    entry.timestamp.isoformat(), "{}"
+                )
+            )
+        conn.commit()
+        conn.close()
+
+        connector = SQLiteConnector(db_path)
+        assert connector.backfilled == 3
+        assert len(connector.get_ancestors(grandchild.entry_id)) == 3
+        assert len(connector.get_subtree(root.entry_id)) == 3
+        connector.close()
+
+class TestCompression:
+    """Tests for transparent compression of stored entry text."""
+
+    @staticmethod
+    def raw(connector, entry):
+        with connector._read_connection() as conn:
+            return conn.execute(
+                "SELECT content, codec, dict_id FROM cache_entries WHERE entry_id = ?",
+                (str(entry.entry_id),)
+            ).fetchone()
+
+    def test_plain_text_by_default(self, storage):
+        """Test compression is opt-in, so the default row format is unchanged."""
+        entry = make_entry(content="The keeper climbed the stairs. " * 50)
+        storage.insert(entry)
+        row = self.raw(storage, entry)
+        assert row["codec"] is None and row["content"] == entry.content
+
+    def test_large_text_stored_compressed(self, tmp_path):
+        """Test long entries are stored as BLOBs and read back unchanged."""
+        connector = SQLiteConnector(str(tmp_path / "compress.db"), compression="zlib")
+        long_entry = make_entry(content="The keeper climbed the stairs. " * 50)
+        short_entry = make_entry(content="short")
+        connector.insert_many([long_entry, short_entry])
+
+        row = self.raw(connector, long_entry)
+        assert row["codec"] == "zlib" and isinstance(row["content"], bytes)
+        assert self.raw(connector, short_entry)["codec"] is None
+        assert connector.get(long_entry.entry_id).content == long_entry.content
+        subtree = connector.get_subtree(long_entry.entry_id)
+        assert [e.content for e in subtree] == [long_entry.content]
+        connector.close()
+
+    def test_dictionary_and_recompress_rewrite_old_rows(self, tmp_path):
+        """Test plain rows and rows from an older dictionary are rewritten and stay readable."""
+        db_path = str(tmp_path / "compress.db")
+        plain = SQLiteConnector(db_path)
+        entries = []
+        parent = None
+        for i in range(40):
+            parent = make_entry(
+                parent,
+                content=f"Step {i}: the keeper climbed the spiral stairs to the lamp room.",
+                prompt=(
+                    "You are continuing a collaborative writing process.\n"
+                    "Continue in the same style."
+                )
+            )
+            entries.append(parent)
+        plain.insert_many(entries)
+        plain.close()
+
+        connector = SQLiteConnector(db_path, compression="zlib")
+        assert connector.get_ancestors(entries[-1].entry_id)[0].content == entries[0].content
+        dict_id = connector.train_dictionary()
+        assert dict_id is not None and connector.dict_id == dict_id
+
+        examined, cursor = connector.recompress(25)
+        assert examined == 25
+        assert connector.recompress(25, cursor)[0] == 15
+        assert connector.recompress(25, connector.recompress(25, cursor)[1])[0] == 0
+        row = self.raw(connector, entries[0])
+        assert row["codec"] == "zlib" and row["dict_id"] == dict_id
+        ancestors = connector.get_ancestors(entries[-1].entry_id)
+        assert [e.content for e in ancestors] == [e.content for e in entries]
+        stats = connector.compression_stats()
+        assert stats["by_codec"]["zlib"]["rows"] == 40
+        connector.close()
+
+        # Reopening picks the stored dictionary back up
+        reopened = SQLiteConnector(db_path, compression="zlib")
+        assert reopened.dict_id == dict_id
+        assert reopened.get(entries[5].entry_id).content == entries[5].content
+        reopened.close()
+
+    def test_migrate_compress_and_decompress(self, tmp_path):
+        """Test the migration command compresses a plain database and can undo it."""
+        from neuracollab.migrate import compress_database
+
+        db_path = str(tmp_path / "migrate.db")
+        connector = SQLiteConnector(db_path, compression=None)
+        entries = [
+            make_entry(content=f"Round {i}: the committee debated transit subsidies again. " * 5)
+            for i in range(30)
+        ]
+        connector.insert_many(entries)
+        connector.close()
+
+        stats = compress_database(db_path, "zlib")
+        assert stats["rows"] == 30 and stats["by_codec"]["zlib"]["rows"] == 30
+        stats = compress_database(db_path, None)
+        assert list(stats["by_codec"]) == ["plain"]
+
+        connector = SQLiteConnector(db_path, compression=None)
+        assert self.raw(connector, entries[0])["codec"] is None
+        assert connector.get(entries[0].entry_id).content == entries[0].content
+        connector.close()
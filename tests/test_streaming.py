@@ -0,0 +1,85 @@
+"""
+Tests for streaming step output.
+"""
+import asyncio
+import time
+import pytest
+
+from neuracollab.adapters.llm_adapters import LLMAdapter
+from neuracollab.cache_pool import NeuralCachePool
+from neuracollab.dispatcher import LLMDispatcher
+from neuracollab.engine import CollaborationEngine
+from neuracollab.models import WorkflowConfig
+from neuracollab.streaming import DeltaCoalescer
+
+class StreamingAdapter(LLMAdapter):
+    """Adapter yielding one token every few milliseconds."""
+    def __init__(self, tokens, delay: float = 0.005):
+        self.tokens = tokens
+        self.delay = delay
+
+    def is_available(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        return "".join(self.tokens)
+
+    async def generate_stream(self, prompt: str, **kwargs):
+        for token in self.tokens:
+            await asyncio.sleep(self.delay)
+            yield token
+
+class TestDeltaCoalescer:
+    """Tests for batching streamed chunks."""
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_immediate_then_batched(self):
+        """Test the first chunk is emitted at once and later ones per interval."""
+        deltas = []
+
+        async def emit(text):
+            deltas.append(text)
+
+        coalescer = DeltaCoalescer(emit, interval=0.05)
+        await coalescer.push("first")
+        assert deltas == ["first"]
+        for i in range(10):
+            await coalescer.push(f" {i}")
+        assert deltas == ["first"]
+        await asyncio.sleep(0.08)  # the timer flushes a stalled buffer
+        assert deltas == ["first", " 0 1 2 3 4 5 6 7 8 9"]
+        await coalescer.aclose()
+        assert coalescer.deltas == 2
+
+class TestStreamingStep:
+    """Tests for streaming execute_step."""
+
+    @pytest.mark.asyncio
+    async def test_execute_step_streams_and_persists_once(self, tmp_path):
+        """Test deltas reassemble the response and the entry is stored once."""
+        tokens = [f"token{i} " for i in range(60)]
+        dispatcher = LLMDispatcher()
+        dispatcher.register_adapter("gpt-4", StreamingAdapter(tokens))
+        pool = NeuralCachePool(db_path=str(tmp_path / "stream.db"))
+        engine = CollaborationEngine(pool, dispatcher)
+        config = WorkflowConfig(mode="relay", prompt_template="{context}")
+        root_id = await engine.start_workflow(config, "Once")
+
+        deltas = []
+        started = time.perf_counter()
+
+        async def on_delta(entry_id, text):
+            deltas.append((entry_id, text, time.perf_counter() - started))
+
+        writes = pool.storage.pool_stats()["writes"]
+        entry = await engine.execute_step(root_id, "gpt-4", on_delta=on_delta)
+        elapsed = time.perf_counter() - started
+
+        assert "".join(text for _, text, _ in deltas) == entry.content == "".join(tokens)
+        assert {entry_id for entry_id, _, _ in deltas} == {entry.entry_id}
+        assert len(deltas) < len(tokens) / 3
+        assert deltas[0][2] < elapsed / 4
+        assert pool.storage.pool_stats()["writes"] - writes == 1
+        assert (await pool.get_entry(entry.entry_id)).content == entry.content
+        await pool.close()
+        await dispatcher.aclose()
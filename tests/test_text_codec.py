@@ -0,0 +1,53 @@
+"""
+Tests for the stored-text compression codecs.
+"""
+import pytest
+
+from neuracollab.text_codec import CodecRegistry, TextCodec, available_codecs, train_dictionary
+
+TEMPLATE = (
+    "You are continuing a collaborative writing process.\n"
+    "Continue in the same style and tone, adding meaningful progress.\n"
+    "Step {i}: the keeper climbed the stairs for the {i}th time.\n"
+)
+
+class TestTextCodec:
+    """Tests for encoding, dictionaries and the codec registry."""
+
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_roundtrip(self, name):
+        """Test text including non-ASCII characters survives encode and decode."""
+        codec = TextCodec(name)
+        text = "Le gardien du phare — 灯塔 — " * 20
+        blob = codec.encode(text)
+        assert isinstance(blob, bytes) and len(blob) < len(text.encode("utf-8"))
+        assert codec.decode(blob) == text
+
+    def test_dictionary_shrinks_short_rows(self):
+        """Test a dictionary of repeated lines helps rows too short to compress alone."""
+        samples = [TEMPLATE.format(i=i) for i in range(50)]
+        dictionary = train_dictionary(samples, "zlib")
+        assert b"collaborative writing process" in dictionary
+
+        text = TEMPLATE.format(i=99)
+        plain, primed = TextCodec("zlib"), TextCodec("zlib", dictionary=dictionary)
+        assert len(primed.encode(text)) < len(plain.encode(text)) / 2
+        assert primed.decode(primed.encode(text)) == text
+
+    def test_nothing_repeated_gives_empty_dictionary(self):
+        """Test samples without shared lines produce no dictionary."""
+        assert train_dictionary(["alpha beta gamma delta", "epsilon zeta eta theta"], "zlib") == b""
+
+    def test_registry_decodes_older_dictionaries(self):
+        """Test rows written with any known dictionary can be decoded."""
+        registry = CodecRegistry()
+        registry.add_dictionary(1, b"the keeper climbed the stairs\n")
+        blob = registry.get("zlib", 1).encode("the keeper climbed the stairs again")
+        registry.add_dictionary(2, b"something else entirely\n")
+        assert registry.get("zlib", 1).decode(blob) == "the keeper climbed the stairs again"
+        with pytest.raises(KeyError):
+            registry.get("zlib", 3)
+
+    def test_unknown_codec_rejected(self):
+        with pytest.raises(ValueError):
+            TextCodec("lz4")
@@ -0,0 +1,219 @@
+"""
+Tests for the WebSocket pub/sub hub.
+"""
+import asyncio
+import json
+import pytest
+from uuid import uuid4
+
+from neuracollab.cache_pool import NeuralCachePool
+from neuracollab.models import CacheEntry
+from neuracollab.websocket_controller import WebSocketManager
+from neuracollab.ws_codec import Frame, JSONCodec, get_codec, negotiate
+
+class FakeWebSocket:
+    """In-memory WebSocket recording sent frames."""
+    def __init__(self, delay: float = 0.0, subprotocols=(), query_params=None):
+        self.delay = delay
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.query_params = query_params or {}
+        self.subprotocol = None
+        self.sent = []
+        self.raw = []
+        self.closed_with = None
+        self.gate = None  # set to an Event to block sends until released
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def _send(self, data):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.raw.append(data)
+
+    async def send_text(self, data):
+        await self._send(data)
+        self.sent.append(json.loads(data))
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+def delta(entry_id, seq, text):
+    return {"type": "step_delta", "data": {"entry_id": entry_id, "seq": seq, "delta": text}}
+
+async def drain():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+class TestWebSocketHub:
+    """Tests for fan-out, ordering and slow consumers."""
+
+    @pytest.mark.asyncio
+    async def test_many_subscribers_per_workflow(self):
+        """Test every viewer of a workflow receives messages in order."""
+        manager = WebSocketManager(cache_pool=None, engine=None)
+        workflow_id, other = uuid4(), uuid4()
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for socket in sockets:
+            await manager.connect(socket, workflow_id)
+        bystander = FakeWebSocket()
+        await manager.connect(bystander, other)
+
+        for i in range(5):
+            assert await manager.broadcast(workflow_id, {"type": "step_complete", "n": i}) == 3
+        await drain()
+
+        for socket in sockets:
+            assert [m["n"] for m in socket.sent] == list(range(5))
+        assert bystander.sent == []
+        assert manager.connection_count() == 4
+        await manager.close()
+        assert manager.connection_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_does_not_block_others(self):
+        """Test a stalled socket has its deltas coalesced while others keep up."""
+        manager = WebSocketManager(cache_pool=None, engine=None, queue_size=4)
+        workflow_id = uuid4()
+        fast, slow = FakeWebSocket(), FakeWebSocket()
+        slow.gate = asyncio.Event()
+        await manager.connect(fast, workflow_id)
+        await manager.connect(slow, workflow_id)
+
+        for i in range(50):
+            await manager.broadcast(workflow_id, delta("e1", i, str(i % 10)))
+            await drain()
+        assert len(fast.sent) == 50
+
+        slow.gate.set()
+        await drain()
+        expected = "".join(str(i % 10) for i in range(50))
+        assert "".join(m["data"]["delta"] for m in slow.sent) == expected
+        assert len(slow.sent) < 5
+        assert slow.sent[-1]["data"]["seq"] == 49
+        assert manager.stats()["coalesced"] > 0
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_consumer(self):
+        """Test a consumer is disconnected once uncoalescable frames overflow its queue."""
+        manager = WebSocketManager(cache_pool=None, engine=None, queue_size=2, policy="drop")
+        workflow_id = uuid4()
+        stuck = FakeWebSocket()
+        stuck.gate = asyncio.Event()
+        await manager.connect(stuck, workflow_id)
+
+        for i in range(4):
+            await manager.broadcast(workflow_id, {"type": "step_complete", "n": i})
+        assert stuck.closed_with == 1013
+        assert manager.connection_count() == 0
+        assert manager.stats()["dropped"] == 1
+
+    def test_rejects_unknown_policy(self):
+        """Test invalid slow-consumer policies are rejected."""
+        with pytest.raises(ValueError):
+            WebSocketManager(cache_pool=None, engine=None, policy="buffer-forever")
+
+class CountingCodec(JSONCodec):
+    """JSON codec counting how many times it serialises a message."""
+    name = "counting"
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, message):
+        self.encoded += 1
+        return super().encode(message)
+
+class TestFrameEncoding:
+    """Tests for negotiated frame encodings and history cursors."""
+
+    def test_negotiate_falls_back_to_json(self):
+        """Test unknown or missing encodings negotiate JSON text frames."""
+        assert negotiate(["neuracollab.protobuf", "xml"]).name == "json"
+        assert negotiate([]).name == "json"
+        assert negotiate(["neuracollab.json"]).binary is False
+
+    @pytest.mark.asyncio
+    async def test_subprotocol_selects_binary_codec(self):
+        """Test a msgpack subprotocol is accepted and frames are sent as bytes."""
+        msgpack = pytest.importorskip("msgpack")
+        manager = WebSocketManager(cache_pool=None, engine=None)
+        workflow_id = uuid4()
+        socket = FakeWebSocket(subprotocols=["neuracollab.msgpack", "neuracollab.json"])
+        await manager.connect(socket, workflow_id)
+        message = {"type": "step_complete", "data": {"entry_id": workflow_id}}
+        await manager.broadcast(workflow_id, message)
+        await drain()
+
+        assert socket.subprotocol == "neuracollab.msgpack"
+        assert isinstance(socket.raw[0], bytes)
+        assert msgpack.unpackb(socket.raw[0]) == {
+            "type": "step_complete", "data": {"entry_id": str(workflow_id)}
+        }
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_unservable_subprotocol_not_echoed(self):
+        """Test a client offering only unsupported encodings gets JSON and no subprotocol."""
+        manager = WebSocketManager(cache_pool=None, engine=None)
+        socket = FakeWebSocket(subprotocols=["neuracollab.avro"])
+        subscriber = await manager.connect(socket, uuid4())
+        assert subscriber.codec is get_codec("json")
+        assert socket.subprotocol is None
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_query_param_selects_codec(self):
+        """Test clients without subprotocol support pick an encoding by query parameter."""
+        pytest.importorskip("cbor2")
+        manager = WebSocketManager(cache_pool=None, engine=None)
+        socket = FakeWebSocket(query_params={"encoding": "cbor"})
+        subscriber = await manager.connect(socket, uuid4())
+        assert subscriber.codec is get_codec("cbor")
+        assert socket.subprotocol is None
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_once_per_codec(self):
+        """Test a broadcast is serialised once however many subscribers share a codec."""
+        manager = WebSocketManager(cache_pool=None, engine=None)
+        codec = CountingCodec()
+        workflow_id = uuid4()
+        sockets = [FakeWebSocket() for _ in range(10)]
+        for socket in sockets:
+            manager.subscribe(socket, workflow_id, codec)
+        await manager.broadcast(workflow_id, {"type": "step_complete", "n": 1})
+        await drain()
+
+        assert codec.encoded == 1
+        assert all(socket.sent == [{"type": "step_complete", "n": 1}] for socket in sockets)
+        frame = Frame({"type": "pong"})
+        assert frame.encode(codec) is frame.encode(codec)
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_history_delta_after_cursor(self, tmp_path):
+        """Test a known cursor yields a delta and an unknown one the full history."""
+        pool = NeuralCachePool(db_path=str(tmp_path / "ws.db"))
+        manager = WebSocketManager(cache_pool=pool, engine=None)
+        root = CacheEntry(content="root", prompt="p", author="User:test")
+        child = CacheEntry(parent_id=root.entry_id, content="child", prompt="p", author="User:test")
+        await pool.add_entry(root)
+        await pool.add_entry(child)
+
+        reply = await manager.history_message(root.entry_id, after=str(root.entry_id))
+        assert reply["type"] == "history_delta"
+        assert [e["content"] for e in reply["data"]["entries"]] == ["child"]
+        assert reply["data"]["cursor"] == str(child.entry_id)
+
+        reply = await manager.history_message(root.entry_id, after=str(uuid4()))
+        assert reply["type"] == "history_update"
+        assert [e["content"] for e in reply["data"]["entries"]] == ["root", "child"]
+        await manager.close()
+        await pool.close()
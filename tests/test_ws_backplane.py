@@ -0,0 +1,116 @@
+"""
+Tests for cross-process WebSocket backplanes.
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from uuid import uuid4
+
+from neuracollab.websocket_controller import WebSocketManager
+from neuracollab.ws_backplane import LocalBackplane, SQLiteBackplane, create_backplane
+
+class RecordingSocket:
+    """In-memory WebSocket recording sent frames."""
+    def __init__(self):
+        self.scope = {}
+        self.query_params = {}
+        self.sent = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def wait_for(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+class TestSQLiteBackplane:
+    """Tests for fan-out between workers sharing a SQLite backplane."""
+
+    @pytest.mark.asyncio
+    async def test_messages_reach_other_workers_once(self, tmp_path):
+        """Test a step published in one worker reaches sockets held by another."""
+        db_path = str(tmp_path / "backplane.db")
+        workers = [
+            WebSocketManager(None, None, backplane=SQLiteBackplane(db_path, poll_interval=0.01))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            await worker.start()
+        workflow_id = uuid4()
+        local, remote = RecordingSocket(), RecordingSocket()
+        await workers[0].connect(local, workflow_id)
+        await workers[1].connect(remote, workflow_id)
+
+        for i in range(3):
+            assert await workers[0].broadcast(workflow_id, {"type": "step_complete", "n": i}) == 1
+        await wait_for(lambda: len(remote.sent) == 3)
+        await asyncio.sleep(0.05)
+
+        assert [m["n"] for m in remote.sent] == [0, 1, 2]
+        assert [m["n"] for m in local.sent] == [0, 1, 2]  # not echoed back from the table
+        assert workers[1].stats()["backplane"]["received"] == 3
+        for worker in workers:
+            await worker.close()
+
+    @pytest.mark.asyncio
+    async def test_messages_with_uuids_are_published(self, tmp_path):
+        """Test UUIDs and datetimes are encoded, and unencodable messages reach nobody."""
+        db_path = str(tmp_path / "backplane.db")
+        workers = [
+            WebSocketManager(None, None, backplane=SQLiteBackplane(db_path, poll_interval=0.01))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            await worker.start()
+        workflow_id = uuid4()
+        local, remote = RecordingSocket(), RecordingSocket()
+        await workers[0].connect(local, workflow_id)
+        await workers[1].connect(remote, workflow_id)
+
+        entry_id, created = uuid4(), datetime(2024, 1, 2, 3, 4, 5)
+        await workers[0].backplane.publish(workflow_id, {"entry_id": entry_id, "created": created})
+        await wait_for(lambda: len(remote.sent) == 1)
+        assert remote.sent == [{"entry_id": str(entry_id), "created": created.isoformat()}]
+
+        with pytest.raises(TypeError):
+            await workers[0].backplane.publish(workflow_id, {"payload": object()})
+        assert len(local.sent) == 1 and workers[0].backplane.published == 1
+        for worker in workers:
+            await worker.close()
+
+    @pytest.mark.asyncio
+    async def test_late_worker_skips_old_messages(self, tmp_path):
+        """Test a worker that starts later does not replay earlier messages."""
+        db_path = str(tmp_path / "backplane.db")
+        first = WebSocketManager(None, None, backplane=SQLiteBackplane(db_path, poll_interval=0.01))
+        await first.start()
+        workflow_id = uuid4()
+        await first.broadcast(workflow_id, {"type": "step_complete"})
+
+        second = WebSocketManager(
+            None, None, backplane=SQLiteBackplane(db_path, poll_interval=0.01)
+        )
+        await second.start()
+        socket = RecordingSocket()
+        await second.connect(socket, workflow_id)
+        assert await second.backplane.poll() == 0
+        assert socket.sent == []
+        await first.close()
+        await second.close()
+
+def test_create_backplane():
+    """Test backplanes are created from URLs."""
+    assert isinstance(create_backplane("local"), LocalBackplane)
+    sqlite = create_backplane("sqlite:///tmp/ws.db")
+    assert isinstance(sqlite, SQLiteBackplane) and sqlite.db_path == "tmp/ws.db"
+    with pytest.raises(ValueError):
+        create_backplane("carrier-pigeon://coop")
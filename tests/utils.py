@@ -7,6 +7,8 @@ from typing import Any, Dict, Optional, List
 from pathlib import Path
 from uuid import UUID
 
+from neuracollab.adapters.llm_adapters import LLMAdapter
+
 def load_test_data(name: str) -> Dict[str, Any]:
     """Load test data from JSON files."""
     data_path = Path(__file__).parent / "data" / f"{name}.json"
@@ -90,6 +92,39 @@ def create_test_branch_config(
         }
     }
 
+class FakeClock:
+    """Manually advanced monotonic clock whose sleep() advances it instead of waiting."""
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+class CountingAdapter(LLMAdapter):
+    """Adapter answering "answer <n>" for its n-th generation, after an optional delay."""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def probe(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        call = self.calls
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return f"answer {call}"
+
 class AsyncTestContext:
     """Context manager for async tests."""
     def __init__(self):